@@ -27,5 +27,9 @@ setuptools.setup(
         "pydantic",
         "setuptools",
         "urllib3"
-    ]
+    ],
+    extras_require={
+        "orjson": ["orjson"],
+        "ujson": ["ujson"]
+    }
 )
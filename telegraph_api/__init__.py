@@ -1,3 +1,10 @@
 from telegraph_api.api import Telegraph
-from telegraph_api.exceptions import MethodIsNotAllowed, TelegraphError
+from telegraph_api.token_pool import TelegraphPool
+from telegraph_api.sync import SyncTelegraph
+from telegraph_api.exceptions import MethodIsNotAllowed, TelegraphError, FloodWaitError, ContentTooBig
 from telegraph_api.html_transform import middlewares
+from telegraph_api.pipeline import Pipeline, Stage
+from telegraph_api.cache import ResponseCache
+from telegraph_api.upload_cache import UploadCache
+from telegraph_api.rate_limit import RateLimiter, RetryPolicy
+from telegraph_api.instrumentation import Instrumentation, MetricsSink
@@ -0,0 +1,165 @@
+import json
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from telegraph_api.bulk import run_bulk
+
+GRANULARITIES = ("year", "month", "day", "hour")
+""" Periods, supported by getViews. Every granularity requires all previous fields """
+
+
+def truncate(moment: datetime, granularity: str) -> datetime:
+    """
+    :return: Start of period of given granularity, that contains moment
+    """
+    moment = moment.replace(minute=0, second=0, microsecond=0)
+    if granularity in ("day", "month", "year"):
+        moment = moment.replace(hour=0)
+    if granularity in ("month", "year"):
+        moment = moment.replace(day=1)
+    if granularity == "year":
+        moment = moment.replace(month=1)
+    return moment
+
+
+def next_period(period: datetime, granularity: str) -> datetime:
+    """
+    :param period: Start of period
+    :return: Start of next period
+    """
+    if granularity == "hour":
+        return period + timedelta(hours=1)
+    if granularity == "day":
+        return period + timedelta(days=1)
+    if granularity == "month":
+        return period.replace(year=period.year + period.month // 12, month=period.month % 12 + 1)
+    return period.replace(year=period.year + 1)
+
+
+def period_range(start: datetime, end: datetime, granularity: str) -> List[datetime]:
+    """
+    :return: Starts of all periods between start and end inclusive
+    """
+    if granularity not in GRANULARITIES:
+        raise ValueError(f"Unknown granularity {granularity!r}")
+    periods = []
+    period = truncate(start, granularity)
+    while period <= end:
+        periods.append(period)
+        period = next_period(period, granularity)
+    return periods
+
+
+def period_params(period: datetime, granularity: str) -> dict:
+    """
+    :return: get_views keyword arguments for period, e.g. {"year": 2021, "month": 7}
+    """
+    fields = GRANULARITIES[:GRANULARITIES.index(granularity) + 1]
+    return {field: getattr(period, field) for field in fields}
+
+
+class ViewsSeries:
+    """ Columnar time series of views: one list of periods, shared by per-path lists of values """
+
+    def __init__(self, granularity: str, periods: List[datetime], views: Dict[str, List[Optional[int]]],
+                 errors: Dict[Tuple[str, datetime], BaseException] = None):
+        self.granularity = granularity
+        self.periods = periods
+        self.views = views
+        """ Views of every path in every period. None, if request failed """
+        self.errors = errors or {}
+        """ Exceptions of failed requests by path and period """
+
+    def __repr__(self):
+        return f"ViewsSeries({self.granularity!r}, {len(self.views)} paths, {len(self.periods)} periods)"
+
+    def total(self, path: str) -> int:
+        """ :return: Sum of views of path in all periods with known views """
+        return sum(views for views in self.views[path] if views is not None)
+
+    def to_dict(self) -> dict:
+        """ :return: JSON serializable representation """
+        return {
+            "granularity": self.granularity,
+            "periods": [period.isoformat() for period in self.periods],
+            "views": self.views,
+        }
+
+
+class ViewsAnalytics:
+    """
+    Fetches views of many pages over time range with bounded concurrency. Views of finished periods can't change,
+    so they are cached forever; only current period is requested again
+    """
+
+    def __init__(self, telegraph, concurrency: int = 20, settle_time: timedelta = timedelta(minutes=10)):
+        """
+        :param telegraph: Telegraph object
+        :param concurrency: Maximal number of simultaneous getViews requests
+        :param settle_time: Time after period end, during which its views are not cached yet
+        """
+        self.telegraph = telegraph
+        self.concurrency = concurrency
+        self.settle_time = settle_time
+        self.cache: Dict[Tuple[str, str, str], int] = {}
+        """ Views of finished periods by path, granularity and period start in ISO format """
+
+    @staticmethod
+    def _now(period: datetime) -> datetime:
+        if period.tzinfo is not None:
+            return datetime.now(period.tzinfo)
+        # Naive datetimes are treated as UTC
+        return datetime.now(timezone.utc).replace(tzinfo=None)
+
+    def _is_final(self, period: datetime, granularity: str) -> bool:
+        return next_period(period, granularity) + self.settle_time <= self._now(period)
+
+    async def get_views(self, paths: Iterable[str], start: datetime, end: datetime,
+                        granularity: str = "day") -> ViewsSeries:
+        """
+        Fetches views of every path in every period between start and end
+
+        :param paths: Paths to Telegraph pages
+        :param start: Start of time range. Naive datetimes are treated as UTC
+        :param end: End of time range (inclusive)
+        :param granularity: "year", "month", "day" or "hour"
+        :return: ViewsSeries object. Periods in future have 0 views
+        """
+        periods = period_range(start, end, granularity)
+        paths = list(paths)
+        views = {path: [0] * len(periods) for path in paths}
+        requests = []
+        for path in paths:
+            for index, period in enumerate(periods):
+                key = (path, granularity, period.isoformat())
+                if key in self.cache:
+                    views[path][index] = self.cache[key]
+                elif period <= self._now(period):
+                    requests.append((path, index))
+
+        async def fetch(request: Tuple[str, int]) -> int:
+            path, index = request
+            return await self.telegraph.get_views(path, **period_params(periods[index], granularity))
+
+        errors = {}
+        async for result in run_bulk(fetch, requests, self.concurrency):
+            path, index = result.spec
+            if not result.ok:
+                views[path][index] = None
+                errors[(path, periods[index])] = result.error
+                continue
+            views[path][index] = result.result
+            if self._is_final(periods[index], granularity):
+                self.cache[(path, granularity, periods[index].isoformat())] = result.result
+        return ViewsSeries(granularity, periods, views, errors)
+
+    def save_cache(self, file_path: str):
+        """ Writes views of finished periods into JSON file """
+        with open(file_path, "w") as file:
+            json.dump([[*key, views] for key, views in self.cache.items()], file)
+
+    def load_cache(self, file_path: str):
+        """ Restores views of finished periods, written by save_cache """
+        with open(file_path) as file:
+            for path, granularity, period, views in json.load(file):
+                self.cache[(path, granularity, period)] = views
@@ -1,23 +1,47 @@
+import asyncio
 import logging
-from json import dumps
-from typing import List
+import time
+from collections import deque
+from concurrent.futures import Executor
+from contextlib import nullcontext
+from copy import deepcopy
+from typing import AsyncIterator, List, Optional, Union
 
 import aiohttp
 from aiohttp import ContentTypeError
 from pydantic import parse_obj_as
 from typing.io import IO
 
-from telegraph_api.exceptions import MethodIsNotAllowed, TelegraphError, FileIsNotPresented, InvalidFileExtension
-from telegraph_api.html_transform import html2nodes
+from telegraph_api.bulk import BulkResult, PageSpecs, run_bulk, spec_to_kwargs
+from telegraph_api.cache import ResponseCache, invalidated_paths
+from telegraph_api.content_diff import ContentJSON, ContentTracker, content_hash, diff_content, normalize_content
+from telegraph_api.content_size import MAX_CONTENT_SIZE, NAVIGATION_RESERVE, block_sizes, content_size, \
+    navigation_node, split_content
+from telegraph_api.endpoints import EndpointConfig, Mirror
+from telegraph_api.exceptions import MethodIsNotAllowed, TelegraphError, InvalidFileExtension, FloodWaitError, \
+    ContentTooBig, parse_error
+from telegraph_api.instrumentation import Instrumentation, error_code
+from telegraph_api.json_backend import JSONBackend, RawJSON, get_json_backend
+from telegraph_api.lazy import RESPONSE_MODES, LazyContent, lazy_construct
 from telegraph_api.models import Account, Page
-from telegraph_api.models import Node
+from telegraph_api.models import LightNode, Node
 from telegraph_api.models.page import PagesList
 from telegraph_api.models.uploaded_file import UploadedFile
-from telegraph_api.utils import normalize_locals, serialize_nodes
+from telegraph_api.markdown_transform import markdown2content
+from telegraph_api.offload import html2content, html2content_async, markdown2content_async
+from telegraph_api.pipeline import Pipeline
+from telegraph_api.rate_limit import RateLimiter, RetryPolicy
+from telegraph_api.upload import UploadPart, UploadSource, build_form, close_uploads, open_upload, open_uploads
+from telegraph_api.upload_cache import UploadCache
+from telegraph_api.rehost import MediaRehoster
+from telegraph_api.utils import endpoint_name, endpoint_path, normalize_locals, serialize_nodes
 
 
 class APIEndpoints:
-    """Class with endpoints of telegraph api"""
+    """
+    Class with default endpoints of telegraph api. Telegraph objects read base_uri and UPLOAD only when created,
+    so changing them affects clients created afterwards. Use EndpointConfig to route requests of one client
+    """
 
     base_uri = "https://api.telegra.ph"
     CREATE_ACCOUNT = f"{base_uri}/createAccount"
@@ -41,17 +65,133 @@ class APIEndpoints:
         return f"{APIEndpoints.base_uri}/getViews/{page_name}"
 
 
+_PAGE_FIELDS = ("title", "content", "author_name", "author_url")
+MAX_PAGE_LIST_LIMIT = 200
+""" Maximal number of pages, returned by one getPageList request """
+
+
+def _describe_error(error: BaseException) -> str:
+    """ Describes error for logs. repr of aiohttp errors contains request url with access token, so it isn't used """
+    status = getattr(error, "status", None)
+    return f"{error_code(error)} ({status})" if status else error_code(error)
+
+
 class Telegraph:
     """Telegraph API class"""
 
-    def __init__(self, access_token=None):
+    def __init__(self, access_token=None, session: aiohttp.ClientSession = None, connection_limit: int = 100,
+                 connection_limit_per_host: int = 0, keepalive_timeout: float = 15, dns_cache_ttl: int = 10,
+                 rate_limiter: RateLimiter = None, retry_policy: RetryPolicy = None, cache: ResponseCache = None,
+                 json_backend: Union[str, JSONBackend] = None, endpoints: EndpointConfig = None,
+                 content_tracker: ContentTracker = None, conversion_executor: Executor = None,
+                 max_content_size: Optional[int] = MAX_CONTENT_SIZE, instrumentation: Instrumentation = None,
+                 response_mode: str = "model", upload_cache: UploadCache = None,
+                 media_rehoster: MediaRehoster = None, pipeline: Pipeline = None):
         """
         Constructor of Class
 
         :param access_token: Access token. If not specified, limited quanity of methods will be availible, until you create account
+        :param session: Externally owned aiohttp session. If passed, it is shared with other clients and never closed by this object
+        :param connection_limit: Total number of simultaneous connections in the pool (0 for no limit)
+        :param connection_limit_per_host: Number of simultaneous connections to one host (0 for no limit)
+        :param keepalive_timeout: Seconds, during which idle connection is kept open for reuse
+        :param dns_cache_ttl: Seconds, during which resolved DNS records are cached (None caches forever)
+        :param rate_limiter: Client-side rate limiter, applied per access token and endpoint
+        :param retry_policy: Policy for retrying failed requests (e.g. FLOOD_WAIT errors). Requests are not retried if not set
+        :param cache: Cache for responses of read-only methods (getPage, getViews, getAccountInfo, getPageList)
+        :param json_backend: JSON backend or its name ("orjson", "ujson", "json"). Fastest installed one by default
+        :param endpoints: API and upload uris with optional mirrors. APIEndpoints uris are used by default
+        :param content_tracker: Storage of last known page contents, used by update_page. If set, pages are
+            remembered on every create, edit and get with content. Otherwise only pages, passed to update_page,
+            are remembered
+        :param conversion_executor: Thread or process pool for content_html conversion. If set, html is converted
+            outside of event loop, so other requests are not stalled by parsing of big documents
+        :param max_content_size: Pages with bigger serialized content are rejected before sending. None disables check
+        :param instrumentation: Collector of request metrics and spans. Nothing is measured if not set
+        :param response_mode: "model" validates responses with pydantic, "lazy" creates models without validation
+            and converts page content into nodes only on access. Use "lazy" for trusted API hosts
+        :param upload_cache: Cache of uploaded files by contents hash. Files, which were already uploaded, are not sent again
+        :param media_rehoster: If set, external images and videos of content_html and content_markdown are uploaded
+            to telegra.ph before publishing
+        :param pipeline: Pipeline for content_html conversion. html2nodes defaults are used if not set.
+            Stage of media_rehoster is added into it
         """
         self.access_token = access_token
         self.logger = logging.getLogger("Telegraph")
+        self._session = session
+        self._owns_session = session is None
+        self._connector_options = {
+            "limit": connection_limit,
+            "limit_per_host": connection_limit_per_host,
+            "keepalive_timeout": keepalive_timeout,
+            "ttl_dns_cache": dns_cache_ttl,
+        }
+        self.rate_limiter = rate_limiter
+        self.retry_policy = retry_policy
+        self.cache = cache
+        if not isinstance(json_backend, JSONBackend):
+            json_backend = get_json_backend(json_backend)
+        self.json_backend = json_backend
+        self.endpoints = endpoints or EndpointConfig(APIEndpoints.base_uri, APIEndpoints.UPLOAD)
+        self.content_tracker = content_tracker
+        self._update_tracker: Optional[ContentTracker] = None
+        self.conversion_executor = conversion_executor
+        self.max_content_size = max_content_size
+        self.instrumentation = instrumentation
+        if response_mode not in ("model", "lazy"):
+            raise ValueError(f"Unknown response mode {response_mode!r}")
+        self.response_mode = response_mode
+        self.upload_cache = upload_cache
+        self.media_rehoster = media_rehoster
+        if media_rehoster is not None:
+            pipeline = media_rehoster.install(pipeline)
+        self.pipeline = pipeline
+
+    async def __aenter__(self):
+        _ = self.session
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        """
+        Pooled aiohttp session, used for all requests of this object. Created on first access.
+        Owned session is created again, if it was bound to other event loop (e.g. previous asyncio.run call)
+        """
+        self._drop_stale_session()
+        if self._session is None or (self._owns_session and self._session.closed):
+            connector = aiohttp.TCPConnector(**self._connector_options)
+            self._session = aiohttp.ClientSession(connector=connector)
+            self._owns_session = True
+        return self._session
+
+    def _drop_stale_session(self):
+        """ Forgets owned session, that is bound to event loop other than running one """
+        if self._session is None or not self._owns_session or self._session.closed:
+            return
+        session_loop = self._session._loop
+        try:
+            running_loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        if session_loop is not running_loop:
+            if session_loop.is_closed():
+                # Connections of closed loop can't be closed gracefully, so connector is only marked closed
+                # (public close() schedules it on its loop)
+                self._session.connector._close()
+            self._session = None
+
+    async def close(self):
+        """
+        Closes pooled session, if it was created by this object. Shared sessions are left open
+        """
+        self._drop_stale_session()
+        if self._owns_session and self._session is not None and not self._session.closed:
+            await self._session.close()
+        if self._owns_session:
+            self._session = None
 
     async def create_account(self, short_name: str, author_name: str = None, author_url: str = None,
                              renew_token: bool = True):
@@ -64,64 +204,239 @@ class Telegraph:
         :param renew_token: Specifies, should be Telegraph object token renewed on method execution
         :return: Account object with access_token field
         """
-        account: Account = await self.make_request(APIEndpoints.CREATE_ACCOUNT,
+        account: Account = await self.make_request("createAccount",
                                                    normalize_locals(locals(), "renew_token"),
                                                    model=Account)
         if renew_token:
-            self.logger.debug(f"Token changed from {self.access_token} to {account.access_token}")
+            self.logger.debug("Access token changed")
             self.access_token = account.access_token
         return account
 
-    async def create_page(self, title: str, content: List[Node] = None, author_name: str = None, author_url: str = None,
-                          return_content: bool = False, content_html: str = None) -> Page:
+    async def create_page(self, title: str, content: List[Union[Node, LightNode, dict]] = None,
+                          author_name: str = None, author_url: str = None, return_content: bool = False,
+                          content_html: str = None, content_markdown: str = None) -> Page:
         """
         Create new telegraph page
 
         :param title: Page title
-        :param content: Content of the page
+        :param content: Content of the page. Nodes or already serialized nodes (e.g. result of html2content)
         :param author_name: Author name, displayed below the article's title
         :param author_url: Profile link, opened when users click on the author's name below the title
         :param return_content: If true, content will be returned in content field
         :param content_html: Html Content, that will be converted into list of nodes
+        :param content_markdown: Markdown Content, that will be converted into list of nodes
         :return: Page object, contains content if return_content is set to True
         """
-        if content_html:
-            content_json = serialize_nodes(html2nodes(content_html))
-        elif not content:
-            content_json = [""]
-        else:
-            content_json = serialize_nodes(content)
-
-        params = normalize_locals(locals(), "content", "content_html", "content_json")
-        params["content"] = dumps(content_json)
-        page: Page = await self.make_request(APIEndpoints.CREATE_PAGE, json=params, method="post", model=Page)
+        content_json = await self._serialize_content(content, content_html, content_markdown)
+        params = normalize_locals(locals(), "content", "content_html", "content_markdown", "content_json")
+        return await self._create_page(params, content_json)
+
+    async def _create_page(self, params: dict, content_json: ContentJSON) -> Page:
+        params["content"] = self._encode_content(content_json)
+        page: Page = await self.make_request("createPage", json=params, method="post", model=Page)
+        self._remember_page(page, content_json)
         return page
 
-    async def edit_page(self, path: str, title: str, content: List[Node] = None, content_html: str = None,
-                        author_name: str = None, author_url: str = None, return_content: bool = False) -> Page:
+    async def create_linked_pages(self, title: str, content: List[Union[Node, LightNode, dict]] = None,
+                                  content_html: str = None, author_name: str = None, author_url: str = None,
+                                  max_size: int = None, content_markdown: str = None) -> List[Page]:
+        """
+        Publishes content, that is too big for one page, as several pages with links to previous and next parts.
+        Content is split between top-level nodes. Parts are created concurrently and then edited to add navigation
+
+        :param title: Page title. Part number is appended to it, if content is split
+        :param content: Content of the page
+        :param content_html: Html Content, that will be converted into list of nodes
+        :param author_name: Author name, displayed below the article's title
+        :param author_url: Profile link, opened when users click on the author's name below the title
+        :param max_size: Maximal serialized size of one part. max_content_size of this object by default
+        :param content_markdown: Markdown Content, that will be converted into list of nodes
+        :return: list of Page objects in content order
+        :raises ContentTooBig: If one top-level node doesn't fit into page
+        """
+        content_json = await self._serialize_content(content, content_html, content_markdown)
+        max_size = max_size or self.max_content_size or MAX_CONTENT_SIZE
+        sizes = block_sizes(content_json, self.json_backend.dumps)
+        params = normalize_locals(locals(), "content", "content_html", "content_markdown", "content_json", "max_size",
+                                  "sizes", "title")
+        if content_size(sizes) <= max_size:
+            return [await self._create_page(dict(params, title=title), content_json)]
+
+        parts = split_content(content_json, sizes, max_size - NAVIGATION_RESERVE)
+        titles = [f"{title} ({index}/{len(parts)})" for index in range(1, len(parts) + 1)]
+        pages = await asyncio.gather(*[self._create_page(dict(params, title=part_title), part)
+                                       for part_title, part in zip(titles, parts)])
+        return list(await asyncio.gather(*[
+            self._edit_page(page.path, dict(params, title=part_title), part + [navigation_node(
+                pages[index - 1].url if index > 0 else None,
+                pages[index + 1].url if index + 1 < len(pages) else None
+            )])
+            for index, (page, part_title, part) in enumerate(zip(pages, titles, parts))
+        ]))
+
+    async def edit_page(self, path: str, title: str, content: List[Union[Node, LightNode, dict]] = None,
+                        content_html: str = None, author_name: str = None, author_url: str = None,
+                        return_content: bool = False, content_markdown: str = None) -> Page:
         """
         Edit existing telegraph page
 
         :param path: Path to page
         :param title: Page title
-        :param content: Content of the page
+        :param content: Content of the page. Nodes or already serialized nodes (e.g. result of html2content)
         :param author_name: Author name, displayed below the article's title
         :param author_url: Profile link, opened when users click on the author's name below the title
         :param return_content: If true, content will be returned in content field
         :param content_html: Html Content, that will be converted into list of nodes
+        :param content_markdown: Markdown Content, that will be converted into list of nodes
         :return: Page object, contains content if return_content is set to True
         """
-        if content_html:
-            content_json = serialize_nodes(html2nodes(content_html))
-        elif not content:
-            content_json = [""]
-        else:
-            content_json = serialize_nodes(content)
-        params = normalize_locals(locals(), "content", "content_html", "path")
-        params["content"] = dumps(content_json)
-        page: Page = await self.make_request(APIEndpoints.edit_page(path), json=params, method="post", model=Page)
+        content_json = await self._serialize_content(content, content_html, content_markdown)
+        params = normalize_locals(locals(), "content", "content_html", "content_markdown", "content_json", "path")
+        return await self._edit_page(path, params, content_json)
+
+    async def _edit_page(self, path: str, params: dict, content_json: ContentJSON,
+                         tracker: ContentTracker = None) -> Page:
+        params["content"] = self._encode_content(content_json)
+        page: Page = await self.make_request(f"editPage/{path}", json=params, method="post", model=Page)
+        self._remember_page(page, content_json, tracker)
         return page
 
+    async def update_page(self, path: str, title: str, content: List[Union[Node, LightNode, dict]] = None,
+                          content_html: str = None, author_name: str = None, author_url: str = None,
+                          return_content: bool = False, force: bool = False,
+                          content_markdown: str = None) -> Optional[Page]:
+        """
+        Edits page only if its title, author or content differ from last known state. Unknown pages are fetched
+        with get_page first. Arguments are the same as in edit_page
+
+        :param force: If true, page is edited even if nothing changed
+        :return: Page object or None, if page is unchanged and request was skipped
+        """
+        content_json = await self._serialize_content(content, content_html, content_markdown)
+        params = normalize_locals(locals(), "content", "content_html", "content_markdown", "content_json", "path",
+                                  "force")
+        tracker = self.content_tracker
+        if tracker is None:
+            if self._update_tracker is None:
+                self._update_tracker = ContentTracker()
+            tracker = self._update_tracker
+        known = tracker.get(path)
+        if known is None and not force:
+            page = await self.get_page(path, return_content=True)
+            if tracker is not self.content_tracker:
+                self._remember_fetched_page(page, tracker)
+            known = tracker.get(path)
+        if known is not None and not force:
+            normalized = normalize_content(content_json)
+            unchanged = known.title == title \
+                and author_name in (None, known.author_name) and author_url in (None, known.author_url) \
+                and content_hash(normalized) == known.content_hash
+            if unchanged:
+                self.logger.debug(f"Page {path} is unchanged. Skipping edit")
+                return None
+            if self.logger.isEnabledFor(logging.DEBUG):
+                self.logger.debug(f"Page {path}: {len(diff_content(known.content, normalized))} nodes changed")
+        return await self._edit_page(path, params, content_json, tracker)
+
+    async def _serialize_content(self, content: Optional[List[Union[Node, LightNode, dict]]],
+                                 content_html: Optional[str], content_markdown: str = None) -> ContentJSON:
+        if content_html or content_markdown:
+            if content_html:
+                with self._span("html2nodes"):
+                    if self.conversion_executor is not None:
+                        content_json = await html2content_async(content_html, self.conversion_executor,
+                                                                self.pipeline)
+                    else:
+                        content_json = html2content(content_html, self.pipeline)
+            else:
+                with self._span("markdown2nodes"):
+                    if self.conversion_executor is not None:
+                        content_json = await markdown2content_async(content_markdown, self.conversion_executor)
+                    else:
+                        content_json = markdown2content(content_markdown)
+            if self.media_rehoster is not None:
+                with self._span("rehost"):
+                    content_json = await self.media_rehoster.rehost(self, content_json)
+            return content_json
+        if not content:
+            return [""]
+        return serialize_nodes(content)
+
+    def _encode_content(self, content_json: ContentJSON) -> RawJSON:
+        """
+        Encodes content once: encoded content is measured and then inserted into request body as is
+
+        :raises ContentTooBig: If encoded content is bigger than max_content_size
+        """
+        encoded = RawJSON(self.json_backend.dumps(content_json))
+        if self.max_content_size is not None:
+            size = len(encoded.encode())
+            if size > self.max_content_size:
+                raise ContentTooBig(size, self.max_content_size)
+        return encoded
+
+    def _remember_page(self, page: Page, content_json: ContentJSON, tracker: ContentTracker = None):
+        """ Remembers page in tracker or in content_tracker, if it is configured """
+        if tracker is None:
+            tracker = self.content_tracker
+        if tracker is not None:
+            tracker.remember(page.path, page.title, content_json, page.author_name, page.author_url)
+
+    def _remember_fetched_page(self, page: Page, tracker: ContentTracker = None):
+        if isinstance(page.content, LazyContent):
+            self._remember_page(page, page.content.raw, tracker)
+        elif page.content is not None:
+            self._remember_page(page, serialize_nodes(page.content), tracker)
+
+    async def create_pages(self, pages: PageSpecs, concurrency: int = 10,
+                           ordered: bool = False) -> AsyncIterator[BulkResult]:
+        """
+        Creates many pages with bounded concurrency. Failed pages don't abort the batch
+
+        :param pages: Iterable or async iterable of page specs. Spec is a dict with create_page arguments or Page object
+        :param concurrency: Maximal number of simultaneous requests
+        :param ordered: If true, results are yielded in input order, else as soon as they are completed
+        :return: async iterator of BulkResult objects, that contain Page object or raised exception
+        """
+        async def create(spec) -> Page:
+            return await self.create_page(**spec_to_kwargs(spec, _PAGE_FIELDS))
+
+        async for result in run_bulk(create, pages, concurrency, ordered):
+            yield result
+
+    async def edit_pages(self, pages: PageSpecs, concurrency: int = 10,
+                         ordered: bool = False) -> AsyncIterator[BulkResult]:
+        """
+        Edits many pages with bounded concurrency. Failed pages don't abort the batch
+
+        :param pages: Iterable or async iterable of page specs. Spec is a dict with edit_page arguments or Page object
+        :param concurrency: Maximal number of simultaneous requests
+        :param ordered: If true, results are yielded in input order, else as soon as they are completed
+        :return: async iterator of BulkResult objects, that contain Page object or raised exception
+        """
+        async def edit(spec) -> Page:
+            return await self.edit_page(**spec_to_kwargs(spec, ("path",) + _PAGE_FIELDS))
+
+        async for result in run_bulk(edit, pages, concurrency, ordered):
+            yield result
+
+    async def update_pages(self, pages: PageSpecs, concurrency: int = 10,
+                           ordered: bool = False) -> AsyncIterator[BulkResult]:
+        """
+        Updates many pages with bounded concurrency. Only pages, which content differs from last known one, are edited
+
+        :param pages: Iterable or async iterable of page specs. Spec is a dict with update_page arguments or Page object
+        :param concurrency: Maximal number of simultaneous requests
+        :param ordered: If true, results are yielded in input order, else as soon as they are completed
+        :return: async iterator of BulkResult objects, that contain Page object (None for skipped pages)
+            or raised exception
+        """
+        async def update(spec) -> Optional[Page]:
+            return await self.update_page(**spec_to_kwargs(spec, ("path",) + _PAGE_FIELDS))
+
+        async for result in run_bulk(update, pages, concurrency, ordered):
+            yield result
+
     async def get_account_info(self, fields: List[str] = None):
         """
         Use this method to get information about a Telegraph account
@@ -129,7 +444,7 @@ class Telegraph:
         :param fields: List of account fields to return. Available fields: short_name, author_name, author_url, auth_url, page_count
         :return: an Account object
         """
-        account_info = await self.make_request(APIEndpoints.GET_ACCOUNT_INFO, normalize_locals(locals()))
+        account_info = await self.make_request("getAccountInfo", normalize_locals(locals()))
         return account_info
 
     async def revoke_access_token(self) -> dict:
@@ -138,35 +453,93 @@ class Telegraph:
 
         :return: Account object with access token field
         """
-        account: dict = await self.make_request(APIEndpoints.REVOKE_ACCESS_TOKEN)
-        self.logger.debug(f"Token changed from {self.access_token} to {account['access_token']}")
+        account: dict = await self.make_request("revokeAccessToken")
+        self.logger.debug("Access token changed")
         self.access_token = account["access_token"]
         return account
 
-    async def get_page(self, path: str, return_content: bool = False) -> Page:
+    async def get_page(self, path: str, return_content: bool = False,
+                       response_mode: str = None) -> Union[Page, dict]:
         """
-        Use this method to revoke access_token and generate a new one
+        Use this method to get a Telegraph page
 
         :param path: Path to the Telegraph page
         :param return_content: If true, content field will be returned
-        :return: Page object
+        :param response_mode: "model", "lazy" or "raw" (dict without any conversion). Client's mode by default
+        :return: Page object or dict in raw mode
         """
-        page: Page = await self.make_request(APIEndpoints.get_page(path), params=normalize_locals(locals(), "path"),
-                                             model=Page)
+        page: Page = await self.make_request(f"getPage/{path}",
+                                             params=normalize_locals(locals(), "path", "response_mode"),
+                                             model=Page, response_mode=response_mode)
+        if response_mode == "raw":
+            return page
+        if self.content_tracker is not None:
+            self._remember_fetched_page(page)
         return page
 
-    async def get_page_list(self, limit: int = 50, offset: int = 0) -> PagesList:
+    async def get_page_list(self, limit: int = 50, offset: int = 0,
+                            response_mode: str = None) -> Union[PagesList, dict]:
         """
         Use this method to get a list of pages belonging to a Telegraph account
 
         :param limit: Limits the number of pages to be retrieved
         :param offset: Sequential number of the first page to be returned
+        :param response_mode: "model", "lazy" or "raw" (dict without any conversion). Client's mode by default
         :return: list of pages, sorted by most recently created pages first
         """
-        pages: PagesList = await self.make_request(APIEndpoints.GET_PAGE_LIST, params=normalize_locals(locals()),
-                                                   model=PagesList)
+        pages: PagesList = await self.make_request("getPageList", params=normalize_locals(locals(), "response_mode"),
+                                                   model=PagesList, response_mode=response_mode)
         return pages
 
+    async def iter_pages(self, limit: int = 200, offset: int = 0, concurrency: int = 1) -> AsyncIterator[Page]:
+        """
+        Lazily iterates over all pages belonging to a Telegraph account. Next windows of pages are fetched
+        while caller processes current one
+
+        :param limit: Number of pages in one get_page_list request (1-200)
+        :param offset: Sequential number of the first page to be returned
+        :param concurrency: Number of windows, that are fetched simultaneously once total_count is known
+        :return: async iterator of pages, sorted by most recently created pages first
+        :raises ValueError: If limit is out of range
+        """
+        async for page in self._iter_pages(self.get_page_list, limit, offset, concurrency):
+            yield page
+
+    @staticmethod
+    async def _iter_pages(get_page_list, limit: int, offset: int, concurrency: int) -> AsyncIterator[Page]:
+        """
+        Iterates over windows of pages, returned by get_page_list. See iter_pages for arguments
+
+        :param get_page_list: Coroutine function with limit and offset arguments, that returns PagesList
+        """
+        if not 1 <= limit <= MAX_PAGE_LIST_LIMIT:
+            raise ValueError(f"limit must be between 1 and {MAX_PAGE_LIST_LIMIT}")
+        first_window = await get_page_list(limit=limit, offset=offset)
+        offsets = iter(range(offset + limit, first_window.total_count, limit))
+        windows = deque()
+
+        def schedule():
+            while len(windows) < max(concurrency, 1):
+                window_offset = next(offsets, None)
+                if window_offset is None:
+                    return
+                windows.append(asyncio.ensure_future(get_page_list(limit=limit, offset=window_offset)))
+
+        try:
+            schedule()
+            for page in first_window.pages:
+                yield page
+            while windows:
+                window = await windows.popleft()
+                if not window.pages:
+                    break
+                schedule()
+                for page in window.pages:
+                    yield page
+        finally:
+            for task in windows:
+                task.cancel()
+
     async def get_views(self, path: str, year: int = None, month: int = None, day: int = None, hour: int = None) -> int:
         """
         Use this method to get the number of views for a Telegraph article.
@@ -178,7 +551,7 @@ class Telegraph:
         :param hour: If passed, the number of page views for the requested hour will be returned.
         :return: By default, the total number of page views will be returned.
         """
-        views_dict = await self.make_request(APIEndpoints.get_views(path), params=normalize_locals(locals(), "path"))
+        views_dict = await self.make_request(f"getViews/{path}", params=normalize_locals(locals(), "path"))
         return views_dict["views"]
 
     async def edit_account_info(self, short_name: str = None, author_name: str = None,
@@ -191,78 +564,242 @@ class Telegraph:
         :param author_url: New default profile link, opened when users click on the author's name below the title
         :return: an Account object with the default fields
         """
-        account = await self.make_request(APIEndpoints.EDIT_ACCOUNT_INFO, params=normalize_locals(locals()))
+        account = await self.make_request("editAccountInfo", params=normalize_locals(locals()))
         return account
 
-    async def upload_file(self, file_path: str = None, file_stream: IO = None):
+    async def upload_file(self, file_path: str = None, file_stream: IO = None, file_name: str = None) -> UploadedFile:
         """
         Uploads file to telegra.ph servers
         (only gif, jpg, jpe, jpeg, jfif, png, mp4, m4v, mp4v files allowed)
 
         :param file_path: Path to file in local filesystem
         :param file_stream: IO object for example can be occurred from open() function
+        :param file_name: Name of the file, if it can't be taken from path or stream
         :return: UploadedFile object
         :raises FileIsNotPresented: If no files were passed into function
         :raises InvalidFileExtension: If file extension is not supported by telegra.ph
+        :raises FileIsTooBig: If file is bigger, than telegra.ph allows
+        """
+        part = await open_upload(file_path or file_stream, file_name)
+        uploaded_files = await self._upload_cached([part])
+        return uploaded_files[0]
+
+    async def upload_files(self, files: List[UploadSource]) -> List[UploadedFile]:
+        """
+        Uploads several files to telegra.ph servers in one request. All files are validated before uploading
+
+        :param files: Paths to files in local filesystem or opened binary streams
+        :return: list of UploadedFile objects in the same order
+        :raises FileIsNotPresented: If no files were passed into function
+        :raises InvalidFileExtension: If extension of one of files is not supported by telegra.ph
+        :raises FileIsTooBig: If one of files is bigger, than telegra.ph allows
+        """
+        parts = await open_uploads(files)
+        return await self._upload_cached(parts)
+
+    async def _upload_cached(self, parts: List[UploadPart]) -> List[UploadedFile]:
+        """
+        Uploads files, which are not in upload cache. Files are sent as is, if there is no cache
+        or some of streams are not seekable
+
+        :param parts: Opened files
+        :return: list of UploadedFile objects
+        """
+        if self.upload_cache is None:
+            return await self._upload(parts)
+        try:
+            digests = await asyncio.gather(*(part.digest() for part in parts))
+        except BaseException:
+            close_uploads(parts)
+            raise
+        if None in digests:
+            return await self._upload(parts)
+
+        async def upload(indexes: List[int]) -> List[str]:
+            uploaded_files = await self._upload([parts[index] for index in indexes])
+            return [uploaded_file.src for uploaded_file in uploaded_files]
+
+        try:
+            sources = await self.upload_cache.get_or_upload(digests, upload)
+        finally:
+            close_uploads(parts)
+        return [UploadedFile(src=src) for src in sources]
+
+    async def _upload(self, parts: List[UploadPart]) -> List[UploadedFile]:
+        """
+        Sends opened files in one multipart request and closes them
+
+        :param parts: Opened files
+        :return: list of UploadedFile objects
         """
-        if file_path:
-            stream = open(file_path, "rb")
-        elif file_stream:
-            stream = file_stream
-        else:
-            raise FileIsNotPresented
-        data = {"file": stream}
-        self.logger.debug("Uploading file. ")
+        self.logger.debug(f"Uploading {len(parts)} file(s). ")
         try:
-            response_text = await self.post(APIEndpoints.UPLOAD, data=data, params=None)
-            path_value = response_text[0]
-            stream.close()
-            return parse_obj_as(UploadedFile, path_value)
+            result = await self.post(self.endpoints.upload_uri, data=build_form(parts), params=None)
         except ContentTypeError:
             raise InvalidFileExtension
+        finally:
+            close_uploads(parts)
+        if isinstance(result, dict) and "error" in result:
+            raise TelegraphError(result["error"])
+        return parse_obj_as(List[UploadedFile], result)
 
     async def make_request(self, endpoint: str, params: dict = None, method: str = "get", model=None,
-                           use_token: bool = True, json=None, **extra_params):
+                           use_token: bool = True, json=None, access_token: str = None, response_mode: str = None,
+                           **extra_params):
         """
-        Function for making requests to API
+        Function for making requests to API. Passed params and json dicts are not modified
 
-        :param endpoint: Telegraph API endpoints
+        :param endpoint: Telegraph API endpoint path (e.g. getPage/Sample-Page-12-15) or absolute url
         :param params: Params for request queries
         :param method: Request Method. Only "get" or "post" are allowed
         :param model: PyDantic model for after request transformation
         :param use_token: Specifies, should token be passed in params, or not
+        :param json: Request body for POST requests
+        :param access_token: Token, used instead of access_token of this object
+        :param response_mode: "model", "lazy" or "raw". Overrides response_mode of this object
         :param extra_params: Extra options, that will be passed into request function (e.g. file)
         :return: json dict, if model is not set, else BaseModel object
         :raises: MethodIsNotAllowed: if method param is invalid
+        :raises: FloodWaitError: if requests are throttled by telegra.ph and retry policy gave up
+        :raises: TelegraphError: if API returned an error
         """
-        # OMG this looks so scary, I think it should be fixed
-        if params is None:
-            params = {}
-
-        if self.access_token and use_token:
+        params = dict(params or {})
+        access_token = access_token or self.access_token
+        if access_token and use_token:
             if json is not None:
-                json["access_token"] = self.access_token
+                json = dict(json, access_token=access_token)
             else:
-                params["access_token"] = self.access_token
+                params["access_token"] = access_token
 
-        self.logger.debug(f"Making request to {endpoint}. Params - {params}")
-        if method == "get":
-            result = await self.get(endpoint, params=params, **extra_params)
-        elif method == "post":
-            result = await self.post(endpoint, params=params, json=json, **extra_params)
-        else:
+        if method not in ("get", "post"):
             raise MethodIsNotAllowed
+        response_mode = response_mode or self.response_mode
+        if response_mode not in RESPONSE_MODES:
+            raise ValueError(f"Unknown response mode {response_mode!r}")
+        if response_mode == "raw":
+            model = None
+
+        path = endpoint_path(endpoint)
+        name = endpoint_name(endpoint)
+        ttl = self.cache.get_ttl(name) if self.cache is not None and method == "get" else None
+        with self._span("request", endpoint=name):
+            if ttl:
+                data = await self.cache.get_or_fetch(
+                    self.cache.make_key(path, params), ttl,
+                    lambda: self._send_request(endpoint, params, method, json, access_token, **extra_params)
+                )
+                if not model:
+                    data = deepcopy(data)
+            else:
+                data = await self._send_request(endpoint, params, method, json, access_token, **extra_params)
 
-        if not result["ok"]:
-            raise TelegraphError(result["error"])
+        if self.cache is not None:
+            for outdated_path in invalidated_paths(path):
+                self.cache.invalidate(outdated_path)
 
-        data = result["result"]
         if model:
-            return parse_obj_as(model, data)
+            with self._span("parse", endpoint=name):
+                if response_mode == "lazy":
+                    return lazy_construct(model, data)
+                return parse_obj_as(model, data)
         return data
 
-    @staticmethod
-    async def get(url: str, params: dict = None, raw=False, encoding="utf-8", **extra_params):
+    def _span(self, name: str, **tags: str):
+        """ Returns span of instrumentation or dummy context manager, if instrumentation is not set """
+        if self.instrumentation is None:
+            return nullcontext()
+        return self.instrumentation.span(name, **tags)
+
+    def _increment(self, name: str, value: float = 1, **tags: str):
+        if self.instrumentation is not None:
+            self.instrumentation.increment(name, value, **tags)
+
+    async def _send_request(self, endpoint: str, params: dict, method: str, json=None, access_token: str = None,
+                            **extra_params):
+        """
+        Sends request, applying rate limiter and retry policy of access token
+
+        :return: result field of API response
+        """
+        name = endpoint_name(endpoint)
+        attempt = 0
+        while True:
+            attempt += 1
+            try:
+                if self.rate_limiter is not None:
+                    await self.rate_limiter.acquire(access_token, name)
+                self._increment("requests", endpoint=name)
+                result = await self._call_endpoint(endpoint, params, method, json, **extra_params)
+                if not result["ok"]:
+                    raise parse_error(result["error"])
+                return result["result"]
+            except Exception as e:
+                self._increment("errors", endpoint=name, code=error_code(e))
+                if isinstance(e, FloodWaitError) and self.rate_limiter is not None:
+                    self.rate_limiter.block(access_token, name, e.retry_after)
+                if self.retry_policy is None or not self.retry_policy.should_retry(e, attempt, name):
+                    raise
+                self._increment("retries", endpoint=name)
+                delay = self.retry_policy.get_delay(e, attempt)
+                self.logger.debug(f"Request to {name} failed with {_describe_error(e)}. Retrying in {delay:.2f}s")
+                await asyncio.sleep(delay)
+
+    async def _call_endpoint(self, endpoint: str, params: dict, method: str, json=None, **extra_params) -> dict:
+        """
+        Makes one HTTP request. Relative endpoints are sent to the fastest healthy mirror,
+        falling over to next mirror on connection errors. POST requests fall over only if connection to mirror
+        couldn't be established
+
+        :return: decoded API response
+        """
+        if "://" in endpoint:
+            return await self._http_request(endpoint, params, method, json, **extra_params)
+        failed_mirrors: List[Mirror] = []
+        while True:
+            mirror = self.endpoints.select(failed_mirrors)
+            started = time.monotonic()
+            try:
+                result = await self._http_request(mirror.url(endpoint), params, method, json, **extra_params)
+            except (aiohttp.ClientConnectionError, aiohttp.ClientResponseError, asyncio.TimeoutError) as e:
+                if isinstance(e, aiohttp.ClientResponseError) and e.status < 500:
+                    raise
+                if method == "post" and not isinstance(e, aiohttp.ClientConnectorError):
+                    # POST may be already handled by mirror, so it is resent only if connection wasn't established
+                    self.endpoints.report_failure(mirror)
+                    raise
+                self.endpoints.report_failure(mirror)
+                failed_mirrors.append(mirror)
+                if not self.endpoints.has_alternative(failed_mirrors):
+                    raise
+                self.logger.debug(f"Mirror {mirror.uri} failed with {_describe_error(e)}. Falling over to next mirror")
+                continue
+            self.endpoints.report_success(mirror, time.monotonic() - started)
+            return result
+
+    async def _http_request(self, url: str, params: dict, method: str, json=None, **extra_params) -> dict:
+        if self.logger.isEnabledFor(logging.DEBUG):
+            logged_params = {key: value for key, value in params.items() if key != "access_token"}
+            self.logger.debug(f"Making request to {url}. Params - {logged_params}")
+        if method == "get":
+            return await self.get(url, params=params, **extra_params)
+        if json is not None:
+            data = self.json_backend.encode_body(json)
+            if self.instrumentation is not None:
+                self._increment("bytes_sent", len(data.encode()), endpoint=endpoint_name(url))
+            return await self.post(url, params=params, data=data,
+                                   headers={"Content-Type": "application/json"}, **extra_params)
+        return await self.post(url, params=params, **extra_params)
+
+    async def _read_response(self, response: aiohttp.ClientResponse, url: str, raw: bool, encoding: str):
+        """ Reads response body once: its length is counted as received bytes and then it is decoded """
+        body = await response.read()
+        if self.instrumentation is not None:
+            self._increment("bytes_received", len(body), endpoint=endpoint_name(url))
+        if raw:
+            return body.decode(encoding=encoding)
+        return await response.json(loads=self.json_backend.loads)
+
+    async def get(self, url: str, params: dict = None, raw=False, encoding="utf-8", **extra_params):
         """
         Make asynchronus GET request
 
@@ -273,14 +810,10 @@ class Telegraph:
         :param extra_params: Extra request params, passed into session.get function
         :return: Dict or Str, depending on raw flag
         """
-        async with aiohttp.request("get", url, params=params, **extra_params) as response:
-            if raw:
-                return (await response.read()).decode(encoding=encoding)
-            else:
-                return await response.json()
+        async with self.session.request("get", url, params=params, **extra_params) as response:
+            return await self._read_response(response, url, raw, encoding)
 
-    @staticmethod
-    async def post(url: str, params: dict, raw=False, encoding="utf-8", **extra_params):
+    async def post(self, url: str, params: dict, raw=False, encoding="utf-8", **extra_params):
         """
         Make asynchronus POST request
 
@@ -291,8 +824,5 @@ class Telegraph:
         :param extra_params: Extra request params, passed into session.get function
         :return: Dict or Str, depending on raw flag
         """
-        async with aiohttp.request("post", url, params=params, **extra_params) as response:
-            if raw:
-                return (await response.read()).decode(encoding=encoding)
-            else:
-                return await response.json()
+        async with self.session.request("post", url, params=params, **extra_params) as response:
+            return await self._read_response(response, url, raw, encoding)
@@ -0,0 +1,164 @@
+import json
+import sqlite3
+import time
+from typing import List, NamedTuple, Optional
+
+from telegraph_api.bulk import run_bulk
+from telegraph_api.lazy import construct_page
+from telegraph_api.models import Page
+
+_COLUMNS = ("path", "url", "title", "description", "author_name", "author_url", "image_url", "views")
+""" Page fields, that are returned by getPageList and stored in separate columns """
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS pages (
+    path TEXT PRIMARY KEY,
+    url TEXT NOT NULL,
+    title TEXT NOT NULL,
+    description TEXT NOT NULL,
+    author_name TEXT,
+    author_url TEXT,
+    image_url TEXT,
+    views INTEGER NOT NULL,
+    content TEXT,
+    synced_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS pages_title ON pages (title COLLATE NOCASE);
+CREATE INDEX IF NOT EXISTS pages_author_name ON pages (author_name);
+"""
+
+
+class SyncReport(NamedTuple):
+    """ Result of PageArchive.sync """
+    new: List[str]
+    """ Paths of pages, that were not archived before """
+    changed: List[str]
+    """ Paths of archived pages, which title, description, author or image changed """
+    unchanged: int
+    """ Number of pages, which content was not fetched """
+    failed: List[str]
+    """ Paths of pages, which content couldn't be fetched. They are fetched again on next sync """
+
+
+class PageArchive:
+    """
+    Local copy of account pages in SQLite database. Archive is updated by sync and answers queries without network
+    """
+
+    def __init__(self, database: str = ":memory:"):
+        """
+        :param database: Path to SQLite database file. Archive is kept in memory by default
+        """
+        self.connection = sqlite3.connect(database)
+        self.connection.row_factory = sqlite3.Row
+        self.connection.executescript(_SCHEMA)
+
+    def __len__(self):
+        return self.connection.execute("SELECT COUNT(*) FROM pages").fetchone()[0]
+
+    def __contains__(self, path: str):
+        return self.connection.execute("SELECT 1 FROM pages WHERE path = ?", (path,)).fetchone() is not None
+
+    def close(self):
+        self.connection.close()
+
+    @staticmethod
+    def _to_page(row: sqlite3.Row) -> Page:
+        data = {column: row[column] for column in _COLUMNS}
+        if row["content"] is not None:
+            data["content"] = json.loads(row["content"])
+        return construct_page(data)
+
+    def get(self, path: str) -> Optional[Page]:
+        """
+        :param path: Path to the Telegraph page
+        :return: archived Page object with content or None
+        """
+        row = self.connection.execute("SELECT * FROM pages WHERE path = ?", (path,)).fetchone()
+        return self._to_page(row) if row is not None else None
+
+    def find(self, title: str = None, author_name: str = None, author_url: str = None,
+             limit: int = None) -> List[Page]:
+        """
+        Searches archived pages. All passed conditions must match
+
+        :param title: Substring of page title, case insensitive
+        :param author_name: Exact author name
+        :param author_url: Exact author url
+        :param limit: Maximal number of pages to return
+        :return: list of Page objects, sorted by title
+        """
+        conditions, arguments = [], []
+        if title is not None:
+            conditions.append("title LIKE ? ESCAPE '\\'")
+            arguments.append("%" + title.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%")
+        if author_name is not None:
+            conditions.append("author_name = ?")
+            arguments.append(author_name)
+        if author_url is not None:
+            conditions.append("author_url = ?")
+            arguments.append(author_url)
+        query = "SELECT * FROM pages"
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        query += " ORDER BY title COLLATE NOCASE, path"
+        if limit is not None:
+            query += " LIMIT ?"
+            arguments.append(limit)
+        return [self._to_page(row) for row in self.connection.execute(query, arguments)]
+
+    def paths(self) -> List[str]:
+        return [row[0] for row in self.connection.execute("SELECT path FROM pages ORDER BY path")]
+
+    def _summaries(self) -> dict:
+        rows = self.connection.execute(
+            "SELECT path, title, description, author_name, author_url, image_url FROM pages"
+        )
+        return {row[0]: tuple(row[1:]) for row in rows}
+
+    async def sync(self, telegraph, concurrency: int = 10, full: bool = False,
+                   page_list_limit: int = 200) -> SyncReport:
+        """
+        Updates archive from account of Telegraph object. Page list is fetched first; content is fetched only
+        for new pages and pages, which title, description, author or image changed. Views are updated for all pages
+
+        :param telegraph: Telegraph object with access token of account
+        :param concurrency: Maximal number of simultaneous get_page requests
+        :param full: Fetch content of all pages
+        :param page_list_limit: Number of pages in one get_page_list request
+        :return: SyncReport object
+        """
+        known = self._summaries()
+        listed = {}
+        new, changed = [], []
+        async for page in telegraph.iter_pages(limit=page_list_limit):
+            listed[page.path] = page
+            summary = known.get(page.path)
+            if summary is None:
+                new.append(page.path)
+            elif full or summary != (page.title, page.description, page.author_name, page.author_url,
+                                     page.image_url):
+                changed.append(page.path)
+
+        synced_at = time.time()
+        self.connection.executemany(
+            "UPDATE pages SET views = ?, synced_at = ? WHERE path = ?",
+            [(page.views, synced_at, path) for path, page in listed.items() if path in known]
+        )
+
+        async def fetch(path: str) -> dict:
+            return await telegraph.get_page(path, return_content=True, response_mode="raw")
+
+        failed = []
+        async for result in run_bulk(fetch, new + changed, concurrency):
+            if not result.ok:
+                failed.append(result.spec)
+                continue
+            page = result.result
+            self.connection.execute(
+                "INSERT OR REPLACE INTO pages VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [page.get(column) for column in _COLUMNS] + [json.dumps(page["content"], ensure_ascii=False),
+                                                            synced_at]
+            )
+        self.connection.commit()
+        return SyncReport(new, changed, len(listed) - len(new) - len(changed), failed)
@@ -0,0 +1,112 @@
+import asyncio
+from typing import Any, AsyncIterable, AsyncIterator, Awaitable, Callable, Iterable, NamedTuple, Optional, Union
+
+from pydantic import BaseModel
+
+PageSpecs = Union[Iterable[Any], AsyncIterable[Any]]
+
+
+class BulkResult(NamedTuple):
+    """ Result of one item of bulk operation """
+    index: int
+    """ Position of the spec in source iterable """
+    spec: Any
+    """ Source spec of the item """
+    result: Any = None
+    """ Result of the call (e.g. Page object). None if call failed """
+    error: Optional[BaseException] = None
+    """ Exception, raised by the call. None if call succeeded """
+
+    @property
+    def ok(self) -> bool:
+        """ True, if call succeeded """
+        return self.error is None
+
+
+def spec_to_kwargs(spec: Any, fields: Iterable[str]) -> dict:
+    """
+    Converts page spec into keyword arguments of API method
+
+    :param spec: dict with method arguments or pydantic model (e.g. Page) with same named fields
+    :param fields: Names of arguments, that will be taken from model
+    :return: keyword arguments
+    """
+    if isinstance(spec, BaseModel):
+        return {field: getattr(spec, field) for field in fields if getattr(spec, field, None) is not None}
+    return dict(spec)
+
+
+async def _iterate(specs: PageSpecs) -> AsyncIterator[Any]:
+    if hasattr(specs, "__aiter__"):
+        async for spec in specs:
+            yield spec
+    else:
+        for spec in specs:
+            yield spec
+
+
+async def run_bulk(function: Callable[[Any], Awaitable[Any]], specs: PageSpecs, concurrency: int = 10,
+                   ordered: bool = False) -> AsyncIterator[BulkResult]:
+    """
+    Runs function for every spec with bounded concurrency and yields results as a stream. Specs are read lazily
+    and slot of a call is freed only when its result is yielded, so at most `concurrency` specs are being processed
+    or waiting to be yielded at once (e.g. behind slow first spec in ordered mode). Failed calls are reported
+    in BulkResult.error and don't abort the batch
+
+    :param function: Coroutine function, that is called with every spec
+    :param specs: Iterable or async iterable with specs
+    :param concurrency: Maximal number of simultaneous calls
+    :param ordered: If true, results are yielded in input order, else in completion order
+    :return: async iterator of BulkResult
+    """
+    if concurrency < 1:
+        raise ValueError("concurrency must be positive")
+    semaphore = asyncio.Semaphore(concurrency)
+    results: asyncio.Queue = asyncio.Queue()
+    tasks = set()
+    finished = object()
+
+    async def call(index: int, spec: Any):
+        try:
+            results.put_nowait(BulkResult(index, spec, result=await function(spec)))
+        except Exception as e:
+            results.put_nowait(BulkResult(index, spec, error=e))
+
+    async def produce():
+        try:
+            index = 0
+            async for spec in _iterate(specs):
+                await semaphore.acquire()
+                task = asyncio.ensure_future(call(index, spec))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+                index += 1
+            if tasks:
+                await asyncio.wait(set(tasks))
+            results.put_nowait(finished)
+        except Exception as e:
+            results.put_nowait(e)
+
+    producer = asyncio.ensure_future(produce())
+    pending = {}
+    next_index = 0
+    try:
+        while True:
+            item = await results.get()
+            if item is finished:
+                break
+            if isinstance(item, Exception):
+                raise item
+            if not ordered:
+                semaphore.release()
+                yield item
+                continue
+            pending[item.index] = item
+            while next_index in pending:
+                semaphore.release()
+                yield pending.pop(next_index)
+                next_index += 1
+    finally:
+        producer.cancel()
+        for task in list(tasks):
+            task.cancel()
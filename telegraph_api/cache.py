@@ -0,0 +1,164 @@
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional
+
+DEFAULT_TTLS = {
+    "getPage": 60,
+    "getViews": 30,
+    "getAccountInfo": 60,
+    "getPageList": 30,
+}
+""" Default seconds, during which responses of read-only endpoints are cached """
+
+INVALIDATED_BY = {
+    "createPage": ("getPageList",),
+    "editPage": ("getPageList",),
+    "editAccountInfo": ("getAccountInfo",),
+    "revokeAccessToken": ("getAccountInfo",),
+}
+""" Cached endpoints, that become outdated after successful call of modifying method """
+
+
+def invalidated_paths(endpoint_path: str) -> List[str]:
+    """
+    :param endpoint_path: Path of successfully called endpoint, e.g. editPage/Sample-Page-12-15
+    :return: Paths of cached endpoints, that became outdated, e.g. getPage/Sample-Page-12-15
+    """
+    method_name, _, page_path = endpoint_path.partition("/")
+    paths = list(INVALIDATED_BY.get(method_name, ()))
+    if method_name == "editPage":
+        paths.append(f"getPage/{page_path}")
+    return paths
+
+
+class FetchAbandoned(Exception):
+    """ Set into future of coalesced request, when caller, that made the request, was cancelled """
+
+
+class ResponseCache:
+    """
+    TTL + LRU cache for responses of read-only API methods. Concurrent identical requests are coalesced,
+    so only one of them reaches the network
+    """
+
+    def __init__(self, max_size: int = 1024, ttls: Dict[str, float] = None):
+        """
+        :param max_size: Maximal number of cached responses. Least recently used responses are evicted first
+        :param ttls: Seconds to cache responses for, by API method name. Methods, that are not listed, are not cached
+        """
+        self.max_size = max_size
+        self.ttls = dict(DEFAULT_TTLS if ttls is None else ttls)
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._in_flight: Dict[Hashable, asyncio.Future] = {}
+        self._stale = set()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get_ttl(self, method_name: str) -> Optional[float]:
+        """
+        :param method_name: API method name, e.g. getPage
+        :return: TTL of method responses or None, if they are not cached
+        """
+        return self.ttls.get(method_name)
+
+    @staticmethod
+    def make_key(endpoint_path: str, params: Optional[dict]) -> tuple:
+        """
+        Builds cache key from endpoint and normalized query params
+
+        :param endpoint_path: Endpoint path without host, e.g. getPage/Sample-Page-12-15
+        :param params: Query params of request
+        :return: hashable key
+        """
+        return endpoint_path, tuple(sorted((params or {}).items()))
+
+    def get(self, key: Hashable) -> Any:
+        """
+        :param key: Cache key
+        :return: Cached value or KeyError, if it is absent or expired
+        """
+        expires_at, value = self._entries[key]
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            raise KeyError(key)
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: Hashable, value: Any, ttl: float):
+        """
+        Stores value in cache, evicting least recently used entries if cache is full
+        """
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    async def get_or_fetch(self, key: Hashable, ttl: float, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Returns cached value or fetches it. If same key is already being fetched, waits for that request instead
+
+        :param key: Cache key
+        :param ttl: Seconds to cache fetched value for
+        :param fetch: Coroutine function, that fetches value
+        :return: cached or fetched value
+        """
+        while True:
+            try:
+                value = self.get(key)
+                self.hits += 1
+                return value
+            except KeyError:
+                pass
+            future = self._in_flight.get(key)
+            if future is None:
+                break
+            try:
+                value = await asyncio.shield(future)
+            except FetchAbandoned:
+                # Caller, that was fetching value, was cancelled. One of waiters fetches it again
+                continue
+            self.hits += 1
+            return value
+
+        self.misses += 1
+        future = asyncio.get_event_loop().create_future()
+        self._in_flight[key] = future
+        try:
+            value = await fetch()
+        except Exception as e:
+            future.set_exception(e)
+            # Exception is re-raised here, so it shouldn't be reported as never retrieved
+            future.exception()
+            raise
+        except BaseException:
+            future.set_exception(FetchAbandoned())
+            future.exception()
+            raise
+        else:
+            if key not in self._stale:
+                self.set(key, value, ttl)
+            future.set_result(value)
+            return value
+        finally:
+            del self._in_flight[key]
+            self._stale.discard(key)
+
+    def invalidate(self, endpoint_path: str):
+        """
+        Removes all cached responses of endpoint
+
+        :param endpoint_path: Endpoint path without host, e.g. getPage/Sample-Page-12-15
+        """
+        for key in [key for key in self._entries if key[0] == endpoint_path]:
+            del self._entries[key]
+        # Responses, that are being fetched right now, may be already outdated
+        self._stale.update(key for key in self._in_flight if key[0] == endpoint_path)
+
+    def clear(self):
+        """ Removes all cached responses """
+        self._entries.clear()
+        self._stale.update(self._in_flight)
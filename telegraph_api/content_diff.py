@@ -0,0 +1,130 @@
+import hashlib
+import json
+from collections import OrderedDict
+from typing import Any, List, NamedTuple, Optional, Tuple, Union
+
+ContentJSON = List[Union[dict, str]]
+
+
+class ContentChange(NamedTuple):
+    """ Node, that differs between two versions of page content """
+    path: Tuple[int, ...]
+    """ Indexes of node in content and in children of its ancestors """
+    old: Any
+    """ Previous node. None, if node was inserted """
+    new: Any
+    """ New node. None, if node was removed """
+
+
+class KnownPage(NamedTuple):
+    """ Last known state of page, that was published, edited or fetched with content """
+    title: str
+    author_name: Optional[str]
+    author_url: Optional[str]
+    content: ContentJSON
+    content_hash: str
+
+
+def normalize_content(content: ContentJSON) -> ContentJSON:
+    """
+    Converts serialized nodes into canonical form: empty attrs and children are omitted, empty strings are dropped
+
+    :param content: Serialized nodes, e.g. result of serialize_nodes
+    :return: normalized copy of content
+    """
+    result = []
+    for node in content:
+        if isinstance(node, str):
+            if node:
+                result.append(node)
+            continue
+        normalized = {"tag": node["tag"]}
+        if node.get("attrs"):
+            normalized["attrs"] = node["attrs"]
+        children = normalize_content(node.get("children") or [])
+        if children:
+            normalized["children"] = children
+        result.append(normalized)
+    return result
+
+
+def content_hash(content: ContentJSON) -> str:
+    """
+    :param content: Normalized serialized nodes
+    :return: SHA-256 hex digest of canonical JSON representation of content
+    """
+    encoded = json.dumps(content, ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(encoded.encode()).hexdigest()
+
+
+def diff_content(old: ContentJSON, new: ContentJSON, path: Tuple[int, ...] = ()) -> List[ContentChange]:
+    """
+    Compares two versions of normalized content. Children of nodes with same tag and attrs are compared
+    recursively, so change of one word is reported for the text node, that contains it
+
+    :param old: Previous content
+    :param new: New content
+    :param path: Path of compared nodes' parent
+    :return: list of changed nodes, empty if contents are equal
+    """
+    changes = []
+    for index in range(max(len(old), len(new))):
+        old_node = old[index] if index < len(old) else None
+        new_node = new[index] if index < len(new) else None
+        if old_node == new_node:
+            continue
+        if isinstance(old_node, dict) and isinstance(new_node, dict) and old_node["tag"] == new_node["tag"] \
+                and old_node.get("attrs") == new_node.get("attrs"):
+            changes.extend(diff_content(old_node.get("children", []), new_node.get("children", []), path + (index,)))
+        else:
+            changes.append(ContentChange(path + (index,), old_node, new_node))
+    return changes
+
+
+class ContentTracker:
+    """ LRU storage of last known page states, used by Telegraph.update_page to skip unchanged pages """
+
+    def __init__(self, max_size: int = 4096):
+        """
+        :param max_size: Maximal number of remembered pages. Least recently used pages are forgotten first
+        """
+        self.max_size = max_size
+        self._pages: "OrderedDict[str, KnownPage]" = OrderedDict()
+
+    def __len__(self):
+        return len(self._pages)
+
+    def __contains__(self, path: str):
+        return path in self._pages
+
+    def get(self, path: str) -> Optional[KnownPage]:
+        """
+        :param path: Path to the Telegraph page
+        :return: Last known page state or None
+        """
+        page = self._pages.get(path)
+        if page is not None:
+            self._pages.move_to_end(path)
+        return page
+
+    def remember(self, path: str, title: str, content: ContentJSON, author_name: str = None,
+                 author_url: str = None) -> KnownPage:
+        """
+        Stores page state
+
+        :param content: Serialized nodes of page content
+        :return: stored KnownPage object
+        """
+        content = normalize_content(content)
+        page = KnownPage(title, author_name, author_url, content, content_hash(content))
+        self._pages[path] = page
+        self._pages.move_to_end(path)
+        while len(self._pages) > self.max_size:
+            self._pages.popitem(last=False)
+        return page
+
+    def forget(self, path: str):
+        self._pages.pop(path, None)
+
+    def clear(self):
+        self._pages.clear()
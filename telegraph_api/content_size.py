@@ -0,0 +1,69 @@
+from typing import Any, Callable, List
+
+from telegraph_api.content_diff import ContentJSON
+from telegraph_api.exceptions import ContentTooBig
+
+MAX_CONTENT_SIZE = 64 * 1024
+""" Maximal size of serialized page content in bytes, accepted by telegra.ph """
+NAVIGATION_RESERVE = 1024
+""" Bytes, reserved in every part of split content for navigation links """
+
+
+def block_sizes(content: ContentJSON, dumps: Callable[[Any], str]) -> List[int]:
+    """
+    :param content: Serialized nodes
+    :param dumps: JSON encoder, that is used for request bodies
+    :return: Size of every top-level node in bytes, as it is encoded in request body
+    """
+    return [len(dumps(block).encode()) for block in content]
+
+
+def content_size(sizes: List[int]) -> int:
+    """
+    :param sizes: Sizes of top-level nodes, returned by block_sizes
+    :return: Size of JSON array with these nodes in bytes
+    """
+    return sum(sizes) + max(len(sizes) - 1, 0) + 2
+
+
+def split_content(content: ContentJSON, sizes: List[int], max_size: int) -> List[ContentJSON]:
+    """
+    Splits content at top-level node boundaries into parts, which serialized size doesn't exceed max_size
+
+    :param content: Serialized nodes
+    :param sizes: Sizes of top-level nodes, returned by block_sizes
+    :param max_size: Maximal size of one part in bytes
+    :return: list of content parts
+    :raises ContentTooBig: If one of top-level nodes is bigger than max_size
+    """
+    parts = []
+    part = []
+    part_size = 2
+    for block, size in zip(content, sizes):
+        if size + 2 > max_size:
+            raise ContentTooBig(size + 2, max_size)
+        added_size = size + 1 if part else size
+        if part_size + added_size > max_size:
+            parts.append(part)
+            part, part_size, added_size = [], 2, size
+        part.append(block)
+        part_size += added_size
+    if part or not parts:
+        parts.append(part)
+    return parts
+
+
+def navigation_node(previous_url: str = None, next_url: str = None) -> dict:
+    """
+    :param previous_url: Url of previous part
+    :param next_url: Url of next part
+    :return: Serialized paragraph with links to neighbour parts
+    """
+    links = []
+    if previous_url:
+        links.append({"tag": "a", "attrs": {"href": previous_url}, "children": ["← Previous part"]})
+    if next_url:
+        if links:
+            links.append(" | ")
+        links.append({"tag": "a", "attrs": {"href": next_url}, "children": ["Next part →"]})
+    return {"tag": "p", "children": links}
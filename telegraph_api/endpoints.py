@@ -0,0 +1,98 @@
+import time
+from typing import List, Optional
+
+DEFAULT_API_URI = "https://api.telegra.ph"
+DEFAULT_UPLOAD_URI = "https://telegra.ph/upload"
+
+
+class Mirror:
+    """ One API host with client-side health statistics """
+
+    def __init__(self, uri: str):
+        """
+        :param uri: Base uri of API host, e.g. https://api.telegra.ph
+        """
+        self.uri = uri.rstrip("/")
+        self.latency: Optional[float] = None
+        """ Exponentially weighted average of successful requests latency in seconds """
+        self.failures = 0
+        """ Number of consecutive failed requests """
+        self.unhealthy_until = 0.0
+
+    def __repr__(self):
+        return f"Mirror({self.uri!r}, latency={self.latency}, failures={self.failures})"
+
+    @property
+    def healthy(self) -> bool:
+        return time.monotonic() >= self.unhealthy_until
+
+    def url(self, path: str) -> str:
+        """
+        :param path: Endpoint path, e.g. getPage/Sample-Page-12-15
+        :return: Absolute endpoint url
+        """
+        return f"{self.uri}/{path}"
+
+
+class EndpointConfig:
+    """
+    Per-client endpoints configuration. Requests are routed to the fastest healthy mirror.
+    Mirror, that failed on connection level, is skipped during cooldown, that grows with every consecutive failure
+    """
+
+    def __init__(self, base_uri: str = DEFAULT_API_URI, upload_uri: str = DEFAULT_UPLOAD_URI,
+                 mirrors: List[str] = None, failure_cooldown: float = 5, max_failure_cooldown: float = 300,
+                 latency_smoothing: float = 0.3):
+        """
+        :param base_uri: Base uri of API, e.g. https://api.telegra.ph or uri of caching gateway
+        :param upload_uri: Uri of upload endpoint
+        :param mirrors: Base uris of additional API hosts, that are used on failover
+        :param failure_cooldown: Seconds, during which mirror is not used after first failure
+        :param max_failure_cooldown: Maximal cooldown after many consecutive failures
+        :param latency_smoothing: Weight of the last request in average mirror latency
+        """
+        self.upload_uri = upload_uri
+        self.mirrors = [Mirror(uri) for uri in [base_uri] + list(mirrors or [])]
+        self.failure_cooldown = failure_cooldown
+        self.max_failure_cooldown = max_failure_cooldown
+        self.latency_smoothing = latency_smoothing
+
+    @property
+    def base_uri(self) -> str:
+        """ Base uri of primary API host """
+        return self.mirrors[0].uri
+
+    def select(self, exclude: List[Mirror] = ()) -> Mirror:
+        """
+        Chooses mirror for next request. Mirrors, which latency is not known yet, are tried first
+
+        :param exclude: Mirrors, that already failed during current request
+        :return: healthy mirror with the lowest latency or mirror, which cooldown ends first, if all are unhealthy
+        """
+        candidates = [mirror for mirror in self.mirrors if mirror not in exclude] or self.mirrors
+        healthy = [mirror for mirror in candidates if mirror.healthy]
+        if not healthy:
+            return min(candidates, key=lambda mirror: mirror.unhealthy_until)
+        return min(healthy, key=lambda mirror: mirror.latency or 0)
+
+    def report_success(self, mirror: Mirror, latency: float):
+        """ Updates mirror statistics after successful request """
+        mirror.failures = 0
+        mirror.unhealthy_until = 0.0
+        if mirror.latency is None:
+            mirror.latency = latency
+        else:
+            mirror.latency += self.latency_smoothing * (latency - mirror.latency)
+
+    def report_failure(self, mirror: Mirror):
+        """ Marks mirror as unhealthy after connection failure """
+        mirror.failures += 1
+        cooldown = min(self.max_failure_cooldown, self.failure_cooldown * 2 ** (mirror.failures - 1))
+        mirror.unhealthy_until = time.monotonic() + cooldown
+
+    def has_alternative(self, exclude: List[Mirror]) -> bool:
+        """
+        :param exclude: Mirrors, that already failed during current request
+        :return: True, if there is healthy mirror, that was not tried yet
+        """
+        return any(mirror.healthy and mirror not in exclude for mirror in self.mirrors)
@@ -1,3 +1,6 @@
+import re
+
+
 class MethodIsNotAllowed(Exception):
     def __str__(self):
         return "Method is not allowed"
@@ -19,3 +22,63 @@ class FileIsNotPresented(Exception):
 class InvalidFileExtension(Exception):
     def __str__(self):
         return "File extension is not supported by telegraph!"
+
+
+class FileIsTooBig(Exception):
+    def __init__(self, size: int):
+        self.size = size
+
+    def __str__(self):
+        return f"File is too big ({self.size} bytes), so it can't be uploaded!"
+
+
+class ForbiddenMediaHost(Exception):
+    """ Raised, when media url points to loopback, private or other non-public address """
+
+    def __init__(self, url: str):
+        self.url = url
+
+    def __str__(self):
+        return f"Host of {self.url} is not public, so file isn't downloaded!"
+
+
+class FloodWaitError(TelegraphError):
+    """ Raised, when telegra.ph throttles requests with FLOOD_WAIT_<n> error """
+
+    def __init__(self, description, retry_after: int):
+        super().__init__(description)
+        self.retry_after = retry_after
+        """ Seconds, that should be waited before next request """
+
+    def __str__(self):
+        return f"Telegraph Error: {self.description}. Retry after {self.retry_after} seconds"
+
+
+class ContentTooBig(TelegraphError):
+    """ Raised, when serialized page content exceeds telegra.ph limit """
+
+    def __init__(self, size: int = None, limit: int = None):
+        super().__init__("CONTENT_TOO_BIG")
+        self.size = size
+        """ Size of serialized content in bytes. None, if error was returned by telegra.ph """
+        self.limit = limit
+
+    def __str__(self):
+        if self.size is None:
+            return f"Telegraph Error: {self.description}"
+        return f"Telegraph Error: {self.description}. Content size is {self.size} bytes, limit is {self.limit} bytes"
+
+
+def parse_error(description: str) -> TelegraphError:
+    """
+    Converts error description from telegra.ph response into typed exception
+
+    :param description: error field of API response
+    :return: FloodWaitError for FLOOD_WAIT_<n> errors, ContentTooBig for CONTENT_TOO_BIG, TelegraphError otherwise
+    """
+    match = re.fullmatch(r"FLOOD_WAIT_(\d+)", description or "")
+    if match:
+        return FloodWaitError(description, int(match.group(1)))
+    if description == "CONTENT_TOO_BIG":
+        return ContentTooBig()
+    return TelegraphError(description)
@@ -0,0 +1,135 @@
+import re
+from collections import OrderedDict
+from html import escape
+from typing import Iterable, Iterator, List, Union
+
+from telegraph_api.content_diff import content_hash
+from telegraph_api.html_transform import VOID_TAGS
+from telegraph_api.lazy import LazyContent
+from telegraph_api.models import LightNode, Node, Page
+from telegraph_api.utils import serialize_nodes
+
+RENDER_CHUNK_SIZE = 64 * 1024
+""" Approximate size of chunks, yielded by iter_html """
+TAG_NAME_REGEX = re.compile(r"[a-zA-Z][a-zA-Z0-9-]*\Z")
+ATTR_NAME_REGEX = re.compile(r"[^\s\"'>/=\x00-\x1f]+\Z")
+
+RenderableNodes = Iterable[Union[Node, LightNode, dict, str]]
+
+
+class _Markup(str):
+    """ Already rendered markup (closing tag), that is pushed onto stack between nodes """
+    __slots__ = ()
+
+
+def _fields(node) -> tuple:
+    if type(node) == dict:
+        return node["tag"], node.get("attrs"), node.get("children")
+    return node.tag, node.attrs, node.children
+
+
+def _start_tag(tag: str, attrs: dict) -> str:
+    if not TAG_NAME_REGEX.match(tag):
+        raise ValueError(f"Invalid tag name {tag!r}")
+    if not attrs:
+        return f"<{tag}>"
+    parts = [f"<{tag}"]
+    for name, value in attrs.items():
+        if not ATTR_NAME_REGEX.match(name):
+            raise ValueError(f"Invalid attribute name {name!r}")
+        parts.append(f" {name}" if value is None else f' {name}="{escape(str(value))}"')
+    parts.append(">")
+    return "".join(parts)
+
+
+def iter_html(nodes: RenderableNodes, chunk_size: int = RENDER_CHUNK_SIZE) -> Iterator[str]:
+    """
+    Renders nodes into html. Tree is walked with explicit stack, so deeply nested content doesn't hit recursion limit
+
+    :param nodes: Node, LightNode objects, serialized nodes and strings, e.g. content of Page or LazyContent
+    :param chunk_size: Approximate size of yielded chunks
+    :return: iterator of html chunks
+    :raises ValueError: If tag or attribute name can't be rendered safely
+    """
+    if isinstance(nodes, LazyContent):
+        nodes = nodes.raw
+    stack = list(reversed(nodes))
+    parts = []
+    size = 0
+    while stack:
+        item = stack.pop()
+        if type(item) == _Markup:
+            part = item
+        elif isinstance(item, str):
+            part = escape(item, quote=False)
+        else:
+            tag, attrs, children = _fields(item)
+            part = _start_tag(tag, attrs)
+            if tag not in VOID_TAGS:
+                stack.append(_Markup(f"</{tag}>"))
+                if children:
+                    stack.extend(reversed(children))
+        parts.append(part)
+        size += len(part)
+        if size >= chunk_size:
+            yield "".join(parts)
+            parts = []
+            size = 0
+    if parts:
+        yield "".join(parts)
+
+
+def nodes2html(nodes: RenderableNodes) -> str:
+    """
+    Renders nodes into html string. Text and attribute values are escaped
+
+    :param nodes: Node, LightNode objects, serialized nodes and strings, e.g. content of Page or LazyContent
+    :return: html
+    """
+    return "".join(iter_html(nodes))
+
+
+class RenderCache:
+    """ LRU cache of rendered html, keyed by page path and content hash """
+
+    def __init__(self, max_size: int = 256):
+        """
+        :param max_size: Maximal number of rendered pages. Least recently used pages are evicted first
+        """
+        self.max_size = max_size
+        self._entries: "OrderedDict[tuple, str]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def render(self, path: str, content: RenderableNodes) -> str:
+        """
+        Renders content or returns html, rendered for the same path and content before
+
+        :param path: Path to the Telegraph page
+        :param content: Page content
+        :return: html
+        """
+        content_json: List[Union[dict, str]] = content.raw if isinstance(content, LazyContent) \
+            else serialize_nodes(list(content))
+        key = (path, content_hash(content_json))
+        html = self._entries.get(key)
+        if html is not None:
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return html
+        self.misses += 1
+        html = nodes2html(content_json)
+        self._entries[key] = html
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+        return html
+
+    def render_page(self, page: Page) -> str:
+        """
+        :param page: Page object, fetched with content
+        :return: html of page content
+        """
+        return self.render(page.path, page.content or [])
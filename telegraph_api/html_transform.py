@@ -1,7 +1,9 @@
-from typing import List
+from html.parser import HTMLParser
+from typing import Callable, List, Union
 
 from telegraph_api.html_transform_middlewares import *
-from telegraph_api.models import Node
+from telegraph_api.models import LightNode, Node
+from telegraph_api.pipeline import Element, Pipeline, UnsupportedAttrsStage, UnsupportedTagsStage, YouTubeEmbedStage
 
 middlewares = [
     handle_youtube_tags,
@@ -10,33 +12,183 @@ middlewares = [
     str.strip
 ]
 
+BUILTIN_MIDDLEWARES = tuple(middlewares)
+""" Middlewares, that are applied by built-in pipeline stages instead of re-parsing html.
+Built-in middleware, removed from middlewares list, disables its stage in html2nodes """
 
-def html2nodes(html: str, use_middlewares: bool = True) -> List[Node]:
+VOID_TAGS = frozenset(["area", "base", "br", "col", "embed", "hr", "img", "input", "keygen", "link", "menuitem",
+                       "meta", "param", "source", "track", "wbr"])
+ASCII_SPACES = "\x20\x0a\x09\x0c\x0d"
+PRESERVE_WHITESPACE_TAGS = frozenset(["pre", "textarea"])
+
+
+def _collapse_whitespace(text: str) -> str:
+    """ Collapses whitespace-only strings the same way as BeautifulSoup does it """
+    if text.strip(ASCII_SPACES):
+        return text
+    return "\n" if "\n" in text else " "
+
+
+class HTMLToNodesParser(HTMLParser):
+    """
+    Single pass html to nodes converter. Pipeline stages (tags whitelisting, attrs stripping,
+    YouTube iframes rewriting and user-registered ones) are applied while nodes are emitted,
+    so html is parsed exactly once
+    """
+
+    def __init__(self, filter_tags: bool = True, filter_attrs: bool = True, embed_youtube: bool = True,
+                 node_factory: Callable[[str, dict, list], Union[Node, LightNode]] = None,
+                 pipeline: Pipeline = None):
+        """
+        :param filter_tags: Unwrap tags, that are not supported by telegra.ph
+        :param filter_attrs: Remove attrs, that are not supported by telegra.ph
+        :param embed_youtube: Rewrite YouTube iframes into telegra.ph embeds
+        :param node_factory: Function, that creates node from tag, attrs and children. Creates Node by default
+        :param pipeline: Stages to apply. If set, filter_tags, filter_attrs and embed_youtube are ignored
+        """
+        super().__init__(convert_charrefs=True)
+        self.node_factory = node_factory or _make_node
+        if pipeline is None:
+            pipeline = _default_pipeline(filter_tags, filter_attrs, embed_youtube)
+        self.pipeline = pipeline
+        self.root = Element(None, None)
+        self.stack = [self.root]
+        self.preserve_whitespace = 0
+
+    def _target(self) -> Element:
+        """ Returns nearest opened element, which will hold emitted children """
+        for element in reversed(self.stack):
+            if element.supported:
+                return element
+        return self.root
+
+    @staticmethod
+    def _flush_text(element: Element):
+        if element.text:
+            element.children.append(_collapse_whitespace("".join(element.text)).strip("\n"))
+            element.text = []
+
+    def handle_starttag(self, tag: str, attrs: list):
+        element = Element(tag, {name: value if value is not None else "" for name, value in attrs})
+        self.pipeline.start(element)
+        if element.supported:
+            self._flush_text(self._target())
+        if tag in VOID_TAGS:
+            self._close(element)
+        else:
+            self._push(element)
+
+    def handle_endtag(self, tag: str):
+        for index in range(len(self.stack) - 1, 0, -1):
+            if self.stack[index].source_tag == tag:
+                while len(self.stack) > index:
+                    self._close(self._pop())
+                return
+
+    def handle_data(self, data: str):
+        self._target().text.append(data if self.preserve_whitespace else _collapse_whitespace(data))
+
+    def _push(self, element: Element):
+        if element.source_tag in PRESERVE_WHITESPACE_TAGS:
+            self.preserve_whitespace += 1
+        self.stack.append(element)
+
+    def _pop(self) -> Element:
+        element = self.stack.pop()
+        if element.source_tag in PRESERVE_WHITESPACE_TAGS:
+            self.preserve_whitespace -= 1
+        return element
+
+    def _close(self, element: Element):
+        if not element.supported:
+            return
+        self._flush_text(element)
+        parent = self._target()
+        node = self.pipeline.end(self.node_factory(element.tag, element.attrs, element.children), element, parent,
+                                 self)
+        self._flush_text(parent)
+        if node is not None:
+            parent.children.append(node)
+
+    def get_nodes(self) -> List[Union[Node, LightNode, str]]:
+        """
+        Closes all unclosed elements and returns converted nodes
+
+        :return: list of nodes
+        """
+        self.close()
+        while len(self.stack) > 1:
+            self._close(self._pop())
+        self._flush_text(self.root)
+        return self.root.children
+
+
+DEFAULT_PIPELINE = Pipeline()
+""" Pipeline with built-in stages, used by html2nodes if no pipeline is passed and middlewares list isn't changed """
+_EMPTY_PIPELINE = Pipeline([])
+
+
+def _default_pipeline(filter_tags: bool, filter_attrs: bool, embed_youtube: bool) -> Pipeline:
+    if filter_tags and filter_attrs and embed_youtube:
+        return DEFAULT_PIPELINE
+    stages = [UnsupportedTagsStage()] if filter_tags else []
+    if embed_youtube:
+        stages.append(YouTubeEmbedStage())
+    if filter_attrs:
+        stages.append(UnsupportedAttrsStage())
+    return Pipeline(stages)
+
+
+def _make_node(tag: str, attrs: dict, children: list) -> Node:
+    # Tree is built by parser, so there is nothing to validate
+    return Node.construct(tag=tag, attrs=attrs, children=children)
+
+
+def html2nodes(html: str, use_middlewares: bool = True, light: bool = False,
+               pipeline: Pipeline = None) -> List[Union[Node, LightNode, str]]:
     """
     Converts html to list of nodes. Passes it through middlewares and converts
     :param use_middlewares: Flag, that shows, should I use middleware in this function
     :param html: Source html
+    :param light: If true, LightNode objects are emitted instead of pydantic Node objects
+    :param pipeline: Pipeline with custom stages. If not set, stages of built-in middlewares, that are
+        in middlewares list, are applied
     :return:  list of nodes, that is suitable for sending in telegraph api
     """
-    result = []
     if use_middlewares:
-        html = pass_through_middlewares(html)
-    bs_object = BeautifulSoup(html, features="html.parser")
-    for child in bs_object.contents:
-        if child.name is None:
-            result.append(str(child.string).strip("\n"))
-        else:
-            tag = Node(tag=child.name, attrs=child.attrs, children=html2nodes("".join(map(str, child.contents)), False))
-            result.append(tag)
+        html = pass_through_middlewares(html, skip_builtin=True)
+    if pipeline is None:
+        pipeline = _default_pipeline(remove_unsupported_tags in middlewares, remove_unsupported_attrs in middlewares,
+                                     handle_youtube_tags in middlewares) if use_middlewares else _EMPTY_PIPELINE
+    parser = HTMLToNodesParser(node_factory=LightNode if light else None, pipeline=pipeline)
+    parser.feed(html)
+    result = parser.get_nodes()
+    if use_middlewares and str.strip in middlewares:
+        _strip_edges(result)
     return result
 
 
-def pass_through_middlewares(html: str) -> str:
+def _strip_edges(nodes: list):
+    """ Strips whitespaces around the document, that may appear after unwrapping unsupported tags """
+    if nodes and type(nodes[0]) == str:
+        nodes[0] = nodes[0].lstrip()
+        if not nodes[0]:
+            del nodes[0]
+    if nodes and type(nodes[-1]) == str:
+        nodes[-1] = nodes[-1].rstrip()
+        if not nodes[-1]:
+            del nodes[-1]
+
+
+def pass_through_middlewares(html: str, skip_builtin: bool = False) -> str:
     """
     Passes html code through all special middlewares for normalizing it
     :param html: Source html
+    :param skip_builtin: Skip built-in middlewares, that are already applied by HTMLToNodesParser
     :return: normalized html
     """
     for middleware in middlewares:
+        if skip_builtin and middleware in BUILTIN_MIDDLEWARES:
+            continue
         html = middleware(html)
     return html
@@ -0,0 +1,178 @@
+import bisect
+import re
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+""" Upper bounds of latency histogram buckets in seconds """
+
+
+def metric_key(name: str, tags: Dict[str, str]) -> str:
+    """
+    :return: Metric name with sorted tags, e.g. requests{endpoint=getPage}
+    """
+    if not tags:
+        return name
+    return name + "{" + ",".join(f"{key}={value}" for key, value in sorted(tags.items())) + "}"
+
+
+def error_code(error: BaseException) -> str:
+    """
+    :return: Error code of telegra.ph error without variable part (e.g. FLOOD_WAIT) or exception class name
+    """
+    description = getattr(error, "description", None)
+    if isinstance(description, str):
+        return re.sub(r"_\d+$", "", description)
+    return type(error).__name__
+
+
+class Span:
+    """ Timed operation, e.g. one API method call """
+    __slots__ = ("name", "tags", "started", "duration", "error", "_instrumentation")
+
+    def __init__(self, instrumentation: "Instrumentation", name: str, tags: Dict[str, str]):
+        self._instrumentation = instrumentation
+        self.name = name
+        self.tags = tags
+        """ Span attributes, e.g. endpoint name. Hooks may add their own """
+        self.started: Optional[float] = None
+        self.duration: Optional[float] = None
+        """ Duration in seconds. None, until span is finished """
+        self.error: Optional[str] = None
+        """ Error code, if operation failed """
+
+    def __repr__(self):
+        return f"Span({self.name!r}, {self.tags}, duration={self.duration}, error={self.error!r})"
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        self._instrumentation._span_started(self)
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.duration = time.perf_counter() - self.started
+        if exc_val is not None:
+            self.error = error_code(exc_val)
+        self._instrumentation._span_finished(self)
+
+
+class MetricsSink:
+    """ Receiver of metrics and spans. Override methods to export them (e.g. into StatsD or tracing system) """
+
+    def increment(self, name: str, value: float, tags: Dict[str, str]):
+        """ Increments counter """
+
+    def observe(self, name: str, value: float, tags: Dict[str, str]):
+        """ Records value in histogram """
+
+    def span_started(self, span: Span):
+        pass
+
+    def span_finished(self, span: Span):
+        pass
+
+
+class Histogram:
+    """ Histogram with fixed buckets """
+    __slots__ = ("buckets", "counts", "count", "sum")
+
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def snapshot(self) -> dict:
+        buckets = {str(bound): count for bound, count in zip(self.buckets, self.counts)}
+        buckets["inf"] = self.counts[-1]
+        return {"count": self.count, "sum": self.sum, "buckets": buckets}
+
+
+class InMemoryMetrics(MetricsSink):
+    """ Sink, that aggregates counters and histograms in memory """
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.counters: Dict[str, float] = {}
+        self.histograms: Dict[str, Histogram] = {}
+
+    def increment(self, name: str, value: float, tags: Dict[str, str]):
+        key = metric_key(name, tags)
+        self.counters[key] = self.counters.get(key, 0) + value
+
+    def observe(self, name: str, value: float, tags: Dict[str, str]):
+        key = metric_key(name, tags)
+        histogram = self.histograms.get(key)
+        if histogram is None:
+            histogram = self.histograms[key] = Histogram(self.buckets)
+        histogram.observe(value)
+
+    def snapshot(self) -> dict:
+        """
+        :return: dict with counters and histograms, e.g.
+            {"counters": {"requests{endpoint=getPage}": 2}, "histograms": {"request.duration{endpoint=getPage}": {...}}}
+        """
+        return {
+            "counters": dict(self.counters),
+            "histograms": {key: histogram.snapshot() for key, histogram in self.histograms.items()},
+        }
+
+    def reset(self):
+        self.counters.clear()
+        self.histograms.clear()
+
+
+class Instrumentation:
+    """
+    Collects metrics of Telegraph client: requests, errors by code, retries and bytes sent/received counters,
+    durations of API calls (request span), html conversion (html2nodes span) and response validation (parse span)
+    """
+
+    def __init__(self, sinks: List[MetricsSink] = None, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        """
+        :param sinks: Additional metrics receivers. Metrics are always aggregated in self.metrics
+        :param buckets: Upper bounds of duration histograms buckets in seconds
+        """
+        self.metrics = InMemoryMetrics(buckets)
+        self.sinks: List[MetricsSink] = [self.metrics] + list(sinks or [])
+        self.before_request: List[Callable[[Span], None]] = []
+        """ Hooks, that are called with request span before API method call """
+        self.after_request: List[Callable[[Span], None]] = []
+        """ Hooks, that are called with finished request span """
+
+    def span(self, name: str, **tags: str) -> Span:
+        """
+        Creates span, that should be used as context manager. Its duration is recorded in <name>.duration histogram
+
+        :param name: Operation name
+        :param tags: Span attributes
+        """
+        return Span(self, name, tags)
+
+    def _span_started(self, span: Span):
+        if span.name == "request":
+            for hook in self.before_request:
+                hook(span)
+        for sink in self.sinks:
+            sink.span_started(span)
+
+    def _span_finished(self, span: Span):
+        for sink in self.sinks:
+            sink.observe(f"{span.name}.duration", span.duration, span.tags)
+            sink.span_finished(span)
+        if span.name == "request":
+            for hook in self.after_request:
+                hook(span)
+
+    def increment(self, name: str, value: float = 1, **tags: str):
+        for sink in self.sinks:
+            sink.increment(name, value, tags)
+
+    def snapshot(self) -> dict:
+        """ :return: Plain dict with aggregated metrics """
+        return self.metrics.snapshot()
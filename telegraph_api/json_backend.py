@@ -0,0 +1,87 @@
+import json
+from typing import Any, Callable
+
+BACKENDS_PRIORITY = ("orjson", "ujson", "json")
+""" Backends, that are tried by get_json_backend, if backend name is not specified """
+
+
+class RawJSON(str):
+    """ Already encoded JSON value. Body values of this type are inserted into request body as is """
+    __slots__ = ()
+
+
+class JSONBackend:
+    """ JSON encoder and decoder, used for request bodies, page contents and responses """
+
+    def __init__(self, name: str, dumps: Callable[[Any], str], loads: Callable[[str], Any]):
+        """
+        :param name: Name of the backend
+        :param dumps: Function, that encodes object into JSON string
+        :param loads: Function, that decodes JSON string or bytes
+        """
+        self.name = name
+        self.dumps = dumps
+        self.loads = loads
+
+    def __repr__(self):
+        return f"JSONBackend({self.name!r})"
+
+    def encode_body(self, body: dict) -> str:
+        """
+        Encodes request body. RawJSON values (e.g. page content, that was encoded to measure its size)
+        are not encoded again
+
+        :param body: Request body
+        :return: JSON string
+        """
+        raw = [(key, value) for key, value in body.items() if isinstance(value, RawJSON)]
+        if not raw:
+            return self.dumps(body)
+        encoded = self.dumps({key: value for key, value in body.items() if not isinstance(value, RawJSON)}).rstrip()
+        parts = [f"{self.dumps(key)}:{value}" for key, value in raw]
+        if encoded[1:-1].strip():
+            parts.insert(0, encoded[1:-1])
+        return "{" + ",".join(parts) + "}"
+
+
+def _stdlib_backend() -> JSONBackend:
+    return JSONBackend("json", lambda obj: json.dumps(obj, ensure_ascii=False, separators=(",", ":")), json.loads)
+
+
+def _orjson_backend() -> JSONBackend:
+    import orjson
+
+    return JSONBackend("orjson", lambda obj: orjson.dumps(obj).decode(), orjson.loads)
+
+
+def _ujson_backend() -> JSONBackend:
+    import ujson
+
+    return JSONBackend("ujson", lambda obj: ujson.dumps(obj, ensure_ascii=False, escape_forward_slashes=False),
+                       ujson.loads)
+
+
+_FACTORIES = {
+    "json": _stdlib_backend,
+    "orjson": _orjson_backend,
+    "ujson": _ujson_backend,
+}
+
+
+def get_json_backend(name: str = None) -> JSONBackend:
+    """
+    Returns JSON backend by name. If name is not specified, the fastest installed backend is used
+
+    :param name: "orjson", "ujson" or "json"
+    :return: JSONBackend object
+    :raises ImportError: If requested backend is not installed
+    """
+    if name is not None:
+        if name not in _FACTORIES:
+            raise ValueError(f"Unknown JSON backend {name!r}")
+        return _FACTORIES[name]()
+    for backend_name in BACKENDS_PRIORITY:
+        try:
+            return _FACTORIES[backend_name]()
+        except ImportError:
+            continue
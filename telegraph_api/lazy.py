@@ -0,0 +1,113 @@
+from copy import deepcopy
+from typing import Any, Iterator, List, Optional, Sequence, Union
+
+from pydantic import BaseModel, parse_obj_as
+
+from telegraph_api.models import Node, Page, PagesList
+
+RESPONSE_MODES = ("model", "lazy", "raw")
+"""
+How responses are returned: "model" - validated pydantic models, "lazy" - models, created without validation,
+"raw" - decoded JSON as is
+"""
+
+
+def construct_nodes(content: List[Union[dict, str]]) -> List[Union[Node, str]]:
+    """
+    Creates Node objects from serialized nodes without validation
+
+    :param content: Serialized nodes from API response
+    :return: list of Node objects and strings
+    """
+    nodes = []
+    for node in content:
+        if isinstance(node, dict):
+            children = node.get("children")
+            nodes.append(Node.construct(tag=node["tag"], attrs=node.get("attrs"),
+                                        children=construct_nodes(children) if children is not None else None))
+        else:
+            nodes.append(node)
+    return nodes
+
+
+class LazyContent(Sequence):
+    """
+    Page content, that is converted into Node objects on first access. Until then it is kept as decoded JSON
+    """
+    __slots__ = ("_raw", "_nodes")
+
+    def __init__(self, raw: List[Union[dict, str]]):
+        self._raw = raw
+        self._nodes: Optional[List[Union[Node, str]]] = None
+
+    @property
+    def raw(self) -> List[Union[dict, str]]:
+        """ Content as serialized nodes. Doesn't materialize nodes """
+        return self._raw
+
+    @property
+    def materialized(self) -> bool:
+        return self._nodes is not None
+
+    def _materialize(self) -> List[Union[Node, str]]:
+        if self._nodes is None:
+            self._nodes = construct_nodes(self._raw)
+        return self._nodes
+
+    def __getitem__(self, index):
+        return self._materialize()[index]
+
+    def __len__(self) -> int:
+        return len(self._raw)
+
+    def __iter__(self) -> Iterator[Union[Node, str]]:
+        return iter(self._materialize())
+
+    def __eq__(self, other):
+        if isinstance(other, LazyContent):
+            return self._raw == other._raw
+        return self._materialize() == other
+
+    def __repr__(self):
+        return f"LazyContent({len(self._raw)} nodes)"
+
+
+class LazyPage(Page):
+    """ Page, created without validation. LazyContent is serialized as raw nodes by dict and json """
+
+    class Config:
+        json_encoders = {LazyContent: lambda content: content.raw}
+
+    def dict(self, **kwargs) -> dict:
+        result = super().dict(**kwargs)
+        if isinstance(result.get("content"), LazyContent):
+            result["content"] = deepcopy(result["content"].raw)
+        return result
+
+
+def construct_page(data: dict) -> Page:
+    """
+    Creates Page object without validation. Content is wrapped into LazyContent
+    """
+    page = LazyPage.construct(**data)
+    if data.get("content") is not None:
+        page.content = LazyContent(data["content"])
+    return page
+
+
+def lazy_construct(model: Any, data: Any) -> Any:
+    """
+    Creates response model without validation. Models, that are not known, are validated as usual
+
+    :param model: Pydantic model or typing construct (e.g. List[UploadedFile])
+    :param data: Decoded result field of API response
+    :return: model object
+    """
+    if model is Page:
+        return construct_page(data)
+    if model is PagesList:
+        return PagesList.construct(total_count=data["total_count"],
+                                   pages=[construct_page(page) for page in data["pages"]])
+    if isinstance(model, type) and issubclass(model, BaseModel):
+        return model.construct(**data)
+    return parse_obj_as(model, data)
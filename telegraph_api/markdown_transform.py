@@ -0,0 +1,281 @@
+import re
+from typing import Callable, List, Optional, Union
+
+from telegraph_api.content_diff import ContentJSON
+from telegraph_api.html_transform import _make_node
+from telegraph_api.models import LightNode, Node
+from telegraph_api.utils import serialize_nodes
+
+FENCE_REGEX = re.compile(r" {0,3}(`{3,}|~{3,})(.*)\Z")
+HEADING_REGEX = re.compile(r" {0,3}(#{1,6})(?:[ \t]+(.*?))?(?:[ \t]+#+)?[ \t]*\Z")
+SETEXT_REGEX = re.compile(r" {0,3}(=+|-+)[ \t]*\Z")
+HR_REGEX = re.compile(r" {0,3}([-*_])(?:[ \t]*\1){2,}[ \t]*\Z")
+LIST_ITEM_REGEX = re.compile(r"( *)([-*+]|\d{1,9}[.)])(?:[ \t]+(.*))?\Z")
+QUOTE_REGEX = re.compile(r" {0,3}> ?(.*)\Z")
+IMAGE_REGEX = re.compile(r'!\[(?P<alt>[^\]]*)\]\(\s*(?P<src>[^)\s]+)(?:\s+"(?P<title>[^"]*)")?\s*\)')
+INLINE_REGEX = re.compile(r"""
+    (?P<escape>\\(?P<escaped>[\\`*_{}\[\]()#+\-.!~<>|]))
+    |(?P<br>(?:[ ]{2,}|\\)\n)
+    |(?P<code>(?P<ticks>`+)(?P<code_text>.+?)(?<!`)(?P=ticks)(?!`))
+    |(?P<image>""" + IMAGE_REGEX.pattern + r""")
+    |(?P<link>\[(?P<link_text>(?:[^\[\]]|\[[^\]]*\])*)\]\(\s*(?P<href>[^)\s]+)(?:\s+"[^"]*")?\s*\))
+    |(?P<autolink><(?P<autolink_href>(?:https?|mailto):[^>\s]+)>)
+    |(?P<strong>\*\*(?P<strong_text>\S(?:.*?\S)?)\*\*(?!\*)|__(?P<strong_text_>\S(?:.*?\S)?)__(?!\w))
+    |(?P<em>\*(?P<em_text>[^\s*](?:.*?[^\s*])?)\*|(?<!\w)_(?P<em_text_>[^\s_](?:.*?[^\s_])?)_(?!\w))
+    |(?P<strike>~~(?P<strike_text>\S(?:.*?\S)?)~~)
+""", re.VERBOSE | re.DOTALL)
+HEADING_TAGS = {1: "h3", 2: "h3"}
+""" Telegraph supports only h3 and h4, so # and ## become h3 and all smaller headings become h4 """
+VIDEO_EXTENSIONS = frozenset(["mp4", "m4v", "mp4v"])
+
+
+class MarkdownToNodesParser:
+    """
+    Markdown to nodes converter. Document is read line by line once: blocks (headings, code fences, quotes, lists,
+    rules and paragraphs) are recognized as lines arrive, inline markup is converted when block is finished
+    """
+
+    def __init__(self, node_factory: Callable[[str, dict, list], Union[Node, LightNode]] = None):
+        """
+        :param node_factory: Function, that creates node from tag, attrs and children. Creates Node by default
+        """
+        self.node_factory = node_factory or _make_node
+        self.nodes = []
+        self.paragraph: List[str] = []
+        self.quote: List[str] = []
+        self.code: List[str] = []
+        self.fence: Optional[str] = None
+        self.lists: List[dict] = []
+        """ Opened lists from outermost one: indent, tag and items. Item is list of lines and list of nested nodes """
+        self.blank = False
+
+    def feed(self, markdown: str):
+        for line in markdown.expandtabs(4).splitlines():
+            self.handle_line(line)
+
+    def get_nodes(self) -> List[Union[Node, LightNode, str]]:
+        """
+        Closes all unfinished blocks and returns converted nodes
+
+        :return: list of nodes
+        """
+        if self.fence is not None:
+            self._emit("pre", self._code_children(self.code))
+            self.fence = None
+            self.code = []
+        self._close_blocks()
+        return self.nodes
+
+    def handle_line(self, line: str):
+        if self.fence is not None:
+            stripped = line.strip()
+            if stripped.startswith(self.fence) and not stripped.strip(self.fence[0]):
+                self._emit("pre", self._code_children(self.code))
+                self.fence = None
+                self.code = []
+            else:
+                self.code.append(line)
+            return
+
+        if not line.strip():
+            self._flush_paragraph()
+            self._flush_quote()
+            if self.code:
+                self.code.append("")
+            self.blank = True
+            return
+
+        if self.code and line.startswith("    "):
+            self.code.append(line[4:])
+            return
+        self._flush_code()
+        blank, self.blank = self.blank, False
+
+        match = FENCE_REGEX.match(line)
+        if match and not (match.group(1)[0] == "`" and "`" in match.group(2)):
+            self._close_blocks()
+            self.fence = match.group(1)
+            return
+
+        match = HEADING_REGEX.match(line)
+        if match:
+            self._close_blocks()
+            self._emit(HEADING_TAGS.get(len(match.group(1)), "h4"), self.parse_inline(match.group(2) or ""))
+            return
+
+        match = SETEXT_REGEX.match(line)
+        if match and self.paragraph and not self.lists:
+            text = "\n".join(self.paragraph)
+            self.paragraph = []
+            self._emit("h3" if match.group(1)[0] == "=" else "h4", self.parse_inline(text.strip()))
+            return
+
+        if HR_REGEX.match(line):
+            self._close_blocks()
+            self._emit("hr", [])
+            return
+
+        match = QUOTE_REGEX.match(line)
+        if match:
+            self._flush_paragraph()
+            self._close_lists()
+            self.quote.append(match.group(1))
+            return
+
+        match = LIST_ITEM_REGEX.match(line)
+        if match:
+            self._flush_paragraph()
+            self._flush_quote()
+            self._add_list_item(len(match.group(1)), "ol" if match.group(2)[0].isdigit() else "ul",
+                                match.group(3) or "")
+            return
+
+        if self.lists and (not blank or line.startswith("  ")):
+            self.lists[-1]["items"][-1][0].append(line.strip())
+            return
+        self._close_lists()
+
+        if self.quote:
+            self.quote.append(line)
+        elif not self.paragraph and line.startswith("    "):
+            self.code.append(line[4:])
+        else:
+            self.paragraph.append(line.lstrip())
+
+    def _emit(self, tag: str, children: list, attrs: dict = None):
+        self.nodes.append(self.node_factory(tag, attrs or {}, children))
+
+    @staticmethod
+    def _code_children(lines: List[str]) -> list:
+        text = "\n".join(lines).strip("\n")
+        return [text] if text else []
+
+    def _close_blocks(self):
+        self._flush_paragraph()
+        self._flush_quote()
+        self._flush_code()
+        self._close_lists()
+
+    def _flush_paragraph(self):
+        if not self.paragraph:
+            return
+        text = "\n".join(self.paragraph).rstrip()
+        self.paragraph = []
+        match = IMAGE_REGEX.fullmatch(text)
+        if match:
+            src = match.group("src")
+            media_tag = "video" if src.rsplit(".", 1)[-1].lower() in VIDEO_EXTENSIONS else "img"
+            caption = match.group("title") or match.group("alt")
+            self._emit("figure", [self.node_factory(media_tag, {"src": src}, []),
+                                  self.node_factory("figcaption", {}, [caption] if caption else [])])
+            return
+        self._emit("p", self.parse_inline(text))
+
+    def _flush_quote(self):
+        if self.quote:
+            self._emit("blockquote", self.parse_inline("\n".join(self.quote).strip()))
+            self.quote = []
+
+    def _flush_code(self):
+        if self.code:
+            self._emit("pre", self._code_children(self.code))
+            self.code = []
+
+    def _add_list_item(self, indent: int, tag: str, text: str):
+        while self.lists and indent < self.lists[-1]["indent"]:
+            self._close_list()
+        if self.lists and indent >= self.lists[-1]["indent"] + 2:
+            self.lists.append({"indent": indent, "tag": tag, "items": []})
+        elif self.lists and self.lists[-1]["tag"] != tag:
+            self._close_list()
+            self.lists.append({"indent": indent, "tag": tag, "items": []})
+        elif not self.lists:
+            self.lists.append({"indent": indent, "tag": tag, "items": []})
+        self.lists[-1]["items"].append(([text] if text else [], []))
+
+    def _close_list(self):
+        opened = self.lists.pop()
+        node = self.node_factory(opened["tag"], {}, [
+            self.node_factory("li", {}, self.parse_inline("\n".join(lines)) + nested)
+            for lines, nested in opened["items"]
+        ])
+        if self.lists:
+            self.lists[-1]["items"][-1][1].append(node)
+        else:
+            self.nodes.append(node)
+
+    def _close_lists(self):
+        while self.lists:
+            self._close_list()
+
+    def parse_inline(self, text: str) -> list:
+        """
+        Converts inline markup (emphasis, code, links, images, line breaks) into nodes
+
+        :param text: Text of one block
+        :return: list of nodes and strings
+        """
+        children = []
+        position = 0
+        for match in INLINE_REGEX.finditer(text):
+            self._append_text(children, text[position:match.start()])
+            position = match.end()
+            # Outer group of alternative is closed last
+            kind = match.lastgroup
+            if kind == "escape":
+                self._append_text(children, match.group("escaped"))
+            elif kind == "br":
+                children.append(self.node_factory("br", {}, []))
+            elif kind == "code":
+                children.append(self.node_factory("code", {}, [match.group("code_text").strip(" ") or " "]))
+            elif kind == "image":
+                children.append(self.node_factory("img", {"src": match.group("src")}, []))
+            elif kind == "link":
+                children.append(self.node_factory("a", {"href": match.group("href")},
+                                                  self.parse_inline(match.group("link_text"))))
+            elif kind == "autolink":
+                href = match.group("autolink_href")
+                children.append(self.node_factory("a", {"href": href}, [href]))
+            elif kind == "strong":
+                inner = match.group("strong_text") or match.group("strong_text_")
+                children.append(self.node_factory("strong", {}, self.parse_inline(inner)))
+            elif kind == "em":
+                inner = match.group("em_text") or match.group("em_text_")
+                children.append(self.node_factory("em", {}, self.parse_inline(inner)))
+            else:
+                children.append(self.node_factory("s", {}, self.parse_inline(match.group("strike_text"))))
+        self._append_text(children, text[position:])
+        return children
+
+    @staticmethod
+    def _append_text(children: list, text: str):
+        if not text:
+            return
+        if children and type(children[-1]) == str:
+            children[-1] += text
+        else:
+            children.append(text)
+
+
+def markdown2nodes(markdown: str, light: bool = False) -> List[Union[Node, LightNode, str]]:
+    """
+    Converts markdown into Telegraph nodes without intermediate html. Headings become h3 and h4,
+    code blocks become pre, standalone images become figure
+
+    :param markdown: Source markdown
+    :param light: If true, LightNode objects are emitted instead of pydantic Node objects
+    :return: list of nodes, that is suitable for sending in telegraph api
+    """
+    parser = MarkdownToNodesParser(node_factory=LightNode if light else None)
+    parser.feed(markdown)
+    return parser.get_nodes()
+
+
+def markdown2content(markdown: str) -> ContentJSON:
+    """
+    Converts markdown into serialized nodes, that can be sent to telegra.ph as is
+
+    :param markdown: Source markdown
+    :return: list of dicts and strings
+    """
+    return serialize_nodes(markdown2nodes(markdown, light=True))
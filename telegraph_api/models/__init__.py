@@ -1,4 +1,5 @@
 from .account import Account
 from .node import Node
+from .light_node import LightNode
 from .page import Page, PagesList
 from .uploaded_file import UploadedFile
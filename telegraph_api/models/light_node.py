@@ -0,0 +1,75 @@
+from typing import List, Optional, Union
+
+from telegraph_api.models.node import Node
+
+
+class LightNode:
+    """
+    Compact DOM Node without pydantic validation. Can be used instead of Node on hot paths (e.g. conversion
+    of big html documents), where validation and copying of every node is too expensive
+    """
+    __slots__ = ("tag", "attrs", "children")
+
+    def __init__(self, tag: str, attrs: Optional[dict] = None, children: Optional[List[Union[str, "LightNode"]]] = None):
+        self.tag = tag
+        """ Name of the DOM element. """
+        self.attrs = attrs
+        """ Optional. Attributes of the DOM element """
+        self.children = children
+        """ Optional. List of child nodes for the DOM element. """
+
+    def __eq__(self, other):
+        if not isinstance(other, LightNode):
+            return NotImplemented
+        return self.tag == other.tag and self.attrs == other.attrs and self.children == other.children
+
+    def __repr__(self):
+        return f"LightNode(tag={self.tag!r}, attrs={self.attrs!r}, children={self.children!r})"
+
+    def to_dict(self) -> dict:
+        """
+        Converts node into json-serializable dict. Empty attrs and children are omitted
+
+        :return: dict in telegra.ph Node format
+        """
+        result = {"tag": self.tag}
+        if self.attrs:
+            result["attrs"] = self.attrs
+        if self.children:
+            result["children"] = [child if type(child) == str else child.to_dict() for child in self.children]
+        return result
+
+    def to_node(self) -> Node:
+        """
+        Converts node into pydantic Node. Tree is trusted, so it is not validated again
+
+        :return: Node object
+        """
+        return Node.construct(tag=self.tag, attrs=self.attrs, children=None if self.children is None else [
+            child if type(child) == str else child.to_node() for child in self.children
+        ])
+
+    @classmethod
+    def from_node(cls, node: Node) -> "LightNode":
+        """
+        Converts pydantic Node into LightNode
+
+        :param node: Node object
+        :return: LightNode object
+        """
+        return cls(node.tag, node.attrs, None if node.children is None else [
+            child if type(child) == str else cls.from_node(child) for child in node.children
+        ])
+
+    @classmethod
+    def from_dict(cls, node: dict) -> "LightNode":
+        """
+        Converts dict in telegra.ph Node format (e.g. from raw API response) into LightNode
+
+        :param node: dict with tag, attrs and children keys
+        :return: LightNode object
+        """
+        children = node.get("children")
+        return cls(node["tag"], node.get("attrs"), None if children is None else [
+            child if type(child) == str else cls.from_dict(child) for child in children
+        ])
@@ -3,6 +3,7 @@ from pydantic import BaseModel
 from telegraph_api.models import Node
 
 ALLOWED_EXTENSIONS = ['gif', 'jpg', 'jpe', 'jpeg', 'jfif', 'png', 'mp4', 'm4v', 'mp4v']
+MAX_FILE_SIZE = 5 * 1024 * 1024
 
 
 class UploadedFile(BaseModel):
@@ -0,0 +1,94 @@
+import asyncio
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import Iterable, List, Union
+
+from telegraph_api.content_diff import ContentJSON
+from telegraph_api.html_transform import html2nodes
+from telegraph_api.markdown_transform import markdown2content
+from telegraph_api.models import LightNode, Node
+from telegraph_api.pipeline import Pipeline
+from telegraph_api.utils import serialize_nodes
+
+
+def html2content(html: str, pipeline: Pipeline = None) -> ContentJSON:
+    """
+    Converts html into serialized nodes, that can be sent to telegra.ph as is.
+    Result is cheap to pickle, so function is suitable for process pools
+
+    :param html: Source html
+    :param pipeline: Pipeline with custom stages. Its stages must be picklable to be used in process pool
+    :return: list of dicts and strings
+    """
+    return serialize_nodes(html2nodes(html, light=True, pipeline=pipeline))
+
+
+def _html2content_chunk(documents: List[str], pipeline: Pipeline = None) -> List[ContentJSON]:
+    return [html2content(html, pipeline) for html in documents]
+
+
+async def html2nodes_async(html: str, executor: Executor = None, light: bool = True,
+                           pipeline: Pipeline = None) -> List[Union[Node, LightNode, str]]:
+    """
+    Converts html to list of nodes in executor, so event loop is not blocked by parsing
+
+    :param html: Source html
+    :param executor: Thread or process pool. Default executor of event loop is used if not set
+    :param light: If true, LightNode objects are emitted instead of pydantic Node objects
+    :param pipeline: Pipeline with custom stages
+    :return: list of nodes
+    """
+    loop = asyncio.get_event_loop()
+    return await loop.run_in_executor(executor, html2nodes, html, True, light, pipeline)
+
+
+async def html2content_async(html: str, executor: Executor = None, pipeline: Pipeline = None) -> ContentJSON:
+    """
+    Converts html into serialized nodes in executor
+
+    :param html: Source html
+    :param executor: Thread or process pool. Default executor of event loop is used if not set
+    :param pipeline: Pipeline with custom stages
+    :return: list of dicts and strings, ready for create_page or edit_page
+    """
+    loop = asyncio.get_event_loop()
+    return await loop.run_in_executor(executor, html2content, html, pipeline)
+
+
+async def markdown2content_async(markdown: str, executor: Executor = None) -> ContentJSON:
+    """
+    Converts markdown into serialized nodes in executor
+
+    :param markdown: Source markdown
+    :param executor: Thread or process pool. Default executor of event loop is used if not set
+    :return: list of dicts and strings, ready for create_page or edit_page
+    """
+    loop = asyncio.get_event_loop()
+    return await loop.run_in_executor(executor, markdown2content, markdown)
+
+
+async def html2content_batch(documents: Iterable[str], executor: Executor = None, chunk_size: int = 8,
+                             max_workers: int = None, pipeline: Pipeline = None) -> List[ContentJSON]:
+    """
+    Converts many html documents, distributing them across worker processes in chunks
+
+    :param documents: Source html documents
+    :param executor: Executor to use. If not set, process pool is created for the batch and shut down afterwards
+    :param chunk_size: Number of documents, sent to worker at once. Bigger chunks reduce inter-process overhead
+    :param max_workers: Number of processes in pool, created for the batch (number of CPUs by default)
+    :param pipeline: Pipeline with custom stages. Its stages must be picklable
+    :return: serialized nodes of every document in input order
+    """
+    documents = list(documents)
+    chunks = [documents[index:index + chunk_size] for index in range(0, len(documents), max(chunk_size, 1))]
+    owns_executor = executor is None
+    if owns_executor:
+        executor = ProcessPoolExecutor(max_workers=max_workers)
+    loop = asyncio.get_event_loop()
+    try:
+        results = await asyncio.gather(*[
+            loop.run_in_executor(executor, _html2content_chunk, chunk, pipeline) for chunk in chunks
+        ])
+    finally:
+        if owns_executor:
+            executor.shutdown(wait=False)
+    return [content for chunk in results for content in chunk]
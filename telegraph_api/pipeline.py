@@ -0,0 +1,205 @@
+import re
+import time
+from typing import Any, Collection, Dict, List, Optional, Tuple
+
+from urllib3.util import parse_url
+
+SUPPORTED_TAGS = frozenset(["a", "aside", "b", "blockquote", "br", "code", "em", "figcaption", "figure", "h3", "h4",
+                            "hr", "i", "iframe", "img", "li", "ol", "p", "pre", "s", "strong", "u", "ul", "video"])
+SUPPORTED_ATTRS = frozenset(["href", "src"])
+YOUTUBE_EMBED_REGEX = re.compile(r"https:\/\/w?w?w?\.?youtube\.com\/embed\/")
+
+
+class Element:
+    """
+    Element, that is currently opened in parser. Unsupported elements are unwrapped: they are kept only
+    for end tags matching and their children are added to the nearest supported ancestor
+    """
+    __slots__ = ("tag", "source_tag", "attrs", "children", "text", "supported")
+
+    def __init__(self, tag: Optional[str], attrs: Optional[dict], supported: bool = True):
+        self.tag = tag
+        self.source_tag = tag
+        """ Tag name in source html. Stays the same, if stage renames element """
+        self.attrs = attrs
+        self.children = []
+        self.text = []
+        self.supported = supported
+
+
+class Stage:
+    """
+    Step of html to nodes conversion. Stages are called by parser while it walks the document, so html is parsed
+    exactly once no matter how many stages are registered. Override start and/or end hooks
+    """
+    tags: Optional[Collection[str]] = None
+    """ Tags, which elements are passed to stage hooks. Elements with any tag are passed if None """
+
+    @property
+    def name(self) -> str:
+        return type(self).__name__
+
+    def start(self, element: Element):
+        """
+        Called, when start tag is parsed. Stage may change element tag and attrs or unwrap element
+        by setting element.supported to False
+
+        :param element: Opened element
+        """
+
+    def end(self, node: Any, element: Element, parent: Element, parser) -> Any:
+        """
+        Called, when supported element is closed
+
+        :param node: Node, created from element
+        :param element: Closed element with converted children
+        :param parent: Element, which node will be added to
+        :param parser: HTMLToNodesParser object. Use parser.node_factory to create new nodes
+        :return: node to add into parent (e.g. modified or wrapped one) or None to drop element
+        """
+        return node
+
+
+class UnsupportedTagsStage(Stage):
+    """ Unwraps tags, that are not supported by telegra.ph """
+
+    def __init__(self, supported_tags: Collection[str] = SUPPORTED_TAGS):
+        self.supported_tags = supported_tags
+
+    def start(self, element: Element):
+        if element.tag not in self.supported_tags:
+            element.supported = False
+
+
+class UnsupportedAttrsStage(Stage):
+    """ Removes attrs, that are not supported by telegra.ph """
+
+    def __init__(self, supported_attrs: Collection[str] = SUPPORTED_ATTRS):
+        self.supported_attrs = supported_attrs
+
+    def start(self, element: Element):
+        element.attrs = {name: value for name, value in element.attrs.items() if name in self.supported_attrs}
+
+
+class YouTubeEmbedStage(Stage):
+    """ Rewrites YouTube iframes into telegra.ph embeds, wrapped into figure """
+    tags = frozenset(["iframe"])
+
+    def start(self, element: Element):
+        src = element.attrs.get("src", "")
+        if not YOUTUBE_EMBED_REGEX.search(src):
+            return
+        # Last part form embed url
+        video_id = parse_url(src).path.split("/")[-1]
+        element.attrs.update({
+            "src": f"/embed/youtube?url=https://youtube.com/watch?v={video_id}",
+            "width": "640",
+            "height": "360",
+            "allow_transparency": "true",
+            "allow_fullscreen": "true"
+        })
+
+    def end(self, node: Any, element: Element, parent: Element, parser) -> Any:
+        if element.attrs.get("src", "").startswith("/embed/youtube") and parent.tag != "figure":
+            return parser.node_factory("figure", {}, [node, parser.node_factory("figcaption", {}, [])])
+        return node
+
+
+def default_stages() -> List[Stage]:
+    """ :return: New instances of built-in stages, that prepare html for telegra.ph """
+    return [UnsupportedTagsStage(), YouTubeEmbedStage(), UnsupportedAttrsStage()]
+
+
+class StageStats:
+    """ Timing counters of one stage """
+    __slots__ = ("calls", "seconds")
+
+    def __init__(self):
+        self.calls = 0
+        self.seconds = 0.0
+
+    def __repr__(self):
+        return f"StageStats(calls={self.calls}, seconds={self.seconds:.6f})"
+
+
+class Pipeline:
+    """
+    Ordered set of stages, applied by HTMLToNodesParser. Hooks are dispatched only to stages,
+    that are interested in element's tag; dispatch tables are built once per tag
+    """
+
+    def __init__(self, stages: List[Stage] = None, timings: bool = False):
+        """
+        :param stages: Stages in order of application. Built-in stages are used by default, pass [] for no stages
+        :param timings: Collect number of calls and time, spent in every stage (see stats)
+        """
+        self.stages: List[Stage] = default_stages() if stages is None else list(stages)
+        self.timings = timings
+        self.stats: Dict[str, StageStats] = {}
+        self._start_table: Dict[str, Tuple[Stage, ...]] = {}
+        self._end_table: Dict[str, Tuple[Stage, ...]] = {}
+
+    def register(self, stage: Stage, index: int = None):
+        """
+        Adds stage into pipeline
+
+        :param stage: Stage object
+        :param index: Position of stage. Stage is added after all others by default
+        """
+        if index is None:
+            self.stages.append(stage)
+        else:
+            self.stages.insert(index, stage)
+        self._start_table.clear()
+        self._end_table.clear()
+
+    def unregister(self, stage_type: type):
+        """ Removes all stages of given type (e.g. UnsupportedTagsStage) """
+        self.stages = [stage for stage in self.stages if not isinstance(stage, stage_type)]
+        self._start_table.clear()
+        self._end_table.clear()
+
+    def reset_stats(self):
+        self.stats.clear()
+
+    def _stages_for(self, table: Dict[str, Tuple[Stage, ...]], hook: str, tag: str) -> Tuple[Stage, ...]:
+        stages = table.get(tag)
+        if stages is None:
+            base_hook = getattr(Stage, hook)
+            stages = table[tag] = tuple(
+                stage for stage in self.stages
+                if getattr(type(stage), hook) is not base_hook and (stage.tags is None or tag in stage.tags)
+            )
+        return stages
+
+    def _record(self, stage: Stage, started: float):
+        stats = self.stats.get(stage.name)
+        if stats is None:
+            stats = self.stats[stage.name] = StageStats()
+        stats.calls += 1
+        stats.seconds += time.perf_counter() - started
+
+    def start(self, element: Element):
+        """ Passes opened element through interested stages, until one of them unwraps it """
+        for stage in self._stages_for(self._start_table, "start", element.tag):
+            if self.timings:
+                started = time.perf_counter()
+                stage.start(element)
+                self._record(stage, started)
+            else:
+                stage.start(element)
+            if not element.supported:
+                return
+
+    def end(self, node: Any, element: Element, parent: Element, parser) -> Any:
+        """ Passes node of closed element through interested stages, until one of them drops it """
+        for stage in self._stages_for(self._end_table, "end", element.tag):
+            if self.timings:
+                started = time.perf_counter()
+                node = stage.end(node, element, parent, parser)
+                self._record(stage, started)
+            else:
+                node = stage.end(node, element, parent, parser)
+            if node is None:
+                break
+        return node
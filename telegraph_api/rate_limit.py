@@ -0,0 +1,162 @@
+import asyncio
+import random
+import time
+from typing import Collection, Dict, Optional, Tuple, Type
+
+import aiohttp
+
+from telegraph_api.exceptions import FloodWaitError
+
+
+class TokenBucket:
+    """ Token bucket, that allows `rate` requests per second with bursts up to `capacity` requests """
+
+    def __init__(self, rate: float, capacity: float = None):
+        """
+        :param rate: Number of tokens, added to bucket every second
+        :param capacity: Maximal number of tokens in bucket. Equals to rate (but at least 1) by default
+        """
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(rate, 1)
+        self.tokens = self.capacity
+        self.updated_at = time.monotonic()
+        self.blocked_until = 0.0
+        self._lock = None
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    async def acquire(self, tokens: float = 1):
+        """
+        Waits until bucket contains enough tokens and takes them
+
+        :param tokens: Number of tokens to take
+        """
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                if now < self.blocked_until:
+                    await asyncio.sleep(self.blocked_until - now)
+                    continue
+                self._refill(now)
+                if self.tokens >= tokens:
+                    self.tokens -= tokens
+                    return
+                await asyncio.sleep((tokens - self.tokens) / self.rate)
+
+    def block(self, seconds: float):
+        """
+        Forbids taking tokens for given number of seconds (e.g. after FLOOD_WAIT error)
+
+        :param seconds: Block duration
+        """
+        self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+        self.tokens = 0
+
+
+class RateLimiter:
+    """
+    Client-side rate limiter with separate token bucket for every access token and endpoint pair.
+    Any object with the same acquire coroutine and block method can be passed into Telegraph instead
+    """
+
+    def __init__(self, rate: float = 5, capacity: float = None, endpoint_rates: Dict[str, float] = None):
+        """
+        :param rate: Default number of requests per second for one access token and endpoint
+        :param capacity: Burst size of every bucket
+        :param endpoint_rates: Rates for specific endpoints, e.g. {"createPage": 1}
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self.endpoint_rates = endpoint_rates or {}
+        self.buckets: Dict[Tuple[Optional[str], str], TokenBucket] = {}
+
+    def bucket(self, access_token: Optional[str], endpoint: str) -> TokenBucket:
+        """
+        Returns bucket for access token and endpoint, creating it if needed
+
+        :param access_token: Access token of request (None for anonymous requests)
+        :param endpoint: API method name, e.g. createPage
+        :return: TokenBucket object
+        """
+        key = (access_token, endpoint)
+        if key not in self.buckets:
+            self.buckets[key] = TokenBucket(self.endpoint_rates.get(endpoint, self.rate), self.capacity)
+        return self.buckets[key]
+
+    async def acquire(self, access_token: Optional[str], endpoint: str):
+        """ Waits, until request to endpoint with access token is allowed """
+        await self.bucket(access_token, endpoint).acquire()
+
+    def block(self, access_token: Optional[str], endpoint: str, seconds: float):
+        """ Blocks requests to endpoint with access token for given number of seconds """
+        self.bucket(access_token, endpoint).block(seconds)
+
+
+NON_IDEMPOTENT_METHODS = frozenset(["createAccount", "createPage", "revokeAccessToken", "upload"])
+""" Methods, that can't be safely repeated after request was sent: repeated request may create duplicate """
+
+
+class RetryPolicy:
+    """
+    Exponential backoff with jitter for failed requests. Connection errors and timeouts are retried only
+    for idempotent methods, because request, that timed out, may be already handled by server
+    """
+
+    def __init__(self, max_attempts: int = 3, base_delay: float = 0.5, max_delay: float = 60, jitter: float = 0.5,
+                 retry_on: Tuple[Type[BaseException], ...] = (FloodWaitError,),
+                 retry_idempotent_on: Tuple[Type[BaseException], ...] = (aiohttp.ClientConnectionError,
+                                                                         asyncio.TimeoutError),
+                 non_idempotent_methods: Collection[str] = NON_IDEMPOTENT_METHODS,
+                 max_flood_wait: float = 60):
+        """
+        :param max_attempts: Maximal number of attempts, including first one
+        :param base_delay: Delay before second attempt. Every next delay is twice longer
+        :param max_delay: Maximal backoff delay
+        :param jitter: Fraction of delay, that is randomized (0 disables jitter)
+        :param retry_on: Exception classes, that are retried for all methods
+        :param retry_idempotent_on: Exception classes, that are retried only for idempotent methods
+        :param non_idempotent_methods: Names of methods, that are retried only on retry_on exceptions
+        :param max_flood_wait: FLOOD_WAIT errors with longer wait time are not retried
+        """
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.jitter = jitter
+        self.retry_on = retry_on
+        self.retry_idempotent_on = retry_idempotent_on
+        self.non_idempotent_methods = non_idempotent_methods
+        self.max_flood_wait = max_flood_wait
+
+    def should_retry(self, error: BaseException, attempt: int, method: str = None) -> bool:
+        """
+        :param error: Exception, raised by attempt
+        :param attempt: Number of failed attempt, starting from 1
+        :param method: API method name, e.g. createPage. Method is treated as idempotent if not set
+        :return: True, if request should be retried
+        """
+        if attempt >= self.max_attempts:
+            return False
+        if not isinstance(error, self.retry_on) and (method in self.non_idempotent_methods
+                                                     or not isinstance(error, self.retry_idempotent_on)):
+            return False
+        if isinstance(error, FloodWaitError):
+            return error.retry_after <= self.max_flood_wait
+        return True
+
+    def get_delay(self, error: BaseException, attempt: int) -> float:
+        """
+        :param error: Exception, raised by attempt
+        :param attempt: Number of failed attempt, starting from 1
+        :return: Seconds to wait before next attempt
+        """
+        delay = min(self.max_delay, self.base_delay * 2 ** (attempt - 1))
+        delay -= delay * self.jitter * random.random()
+        if isinstance(error, FloodWaitError):
+            delay += error.retry_after
+        return delay
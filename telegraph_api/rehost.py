@@ -0,0 +1,267 @@
+import asyncio
+import ipaddress
+import json
+import mimetypes
+import posixpath
+import socket
+from io import BytesIO
+from typing import Collection, Dict, List, Tuple
+from urllib.parse import urljoin, urlsplit
+
+import aiohttp
+
+from telegraph_api.bulk import run_bulk
+from telegraph_api.content_diff import ContentJSON
+from telegraph_api.exceptions import FileIsTooBig, ForbiddenMediaHost, InvalidFileExtension
+from telegraph_api.models.uploaded_file import ALLOWED_EXTENSIONS, MAX_FILE_SIZE
+from telegraph_api.pipeline import Element, Pipeline, Stage
+from telegraph_api.upload import CHUNK_SIZE
+
+MEDIA_TAGS = frozenset(["img", "video"])
+LOCAL_HOSTS = frozenset(["telegra.ph", "graph.org"])
+""" Hosts, which files are not rehosted """
+MAX_REDIRECTS = 5
+REDIRECT_STATUSES = frozenset([301, 302, 303, 307, 308])
+
+
+def is_external(src: str, local_hosts: Collection[str] = LOCAL_HOSTS) -> bool:
+    """
+    :param src: src attribute of img or video
+    :return: True, if src is absolute http(s) url of other host
+    """
+    parts = urlsplit(src)
+    return parts.scheme in ("http", "https") and parts.hostname is not None and parts.hostname not in local_hosts
+
+
+def external_sources(content: ContentJSON, local_hosts: Collection[str] = LOCAL_HOSTS) -> List[str]:
+    """
+    :param content: Serialized nodes
+    :return: Unique external sources of img and video nodes in document order
+    """
+    sources = {}
+    stack = list(reversed(content))
+    while stack:
+        node = stack.pop()
+        if not isinstance(node, dict):
+            continue
+        src = (node.get("attrs") or {}).get("src")
+        if node["tag"] in MEDIA_TAGS and src and is_external(src, local_hosts):
+            sources[src] = None
+        stack.extend(reversed(node.get("children") or []))
+    return list(sources)
+
+
+def is_public_address(address: str) -> bool:
+    """
+    :param address: IPv4 or IPv6 address
+    :return: False for loopback, private, link-local, reserved and multicast addresses
+    """
+    ip = ipaddress.ip_address(address.split("%", 1)[0])
+    if ip.version == 6 and ip.ipv4_mapped is not None:
+        ip = ip.ipv4_mapped
+    return ip.is_global and not ip.is_multicast
+
+
+def replace_sources(content: ContentJSON, sources: Dict[str, str]) -> ContentJSON:
+    """
+    Replaces src attributes of img and video nodes. Only changed nodes and their ancestors are copied,
+    so passed content is not modified
+
+    :param content: Serialized nodes
+    :param sources: New sources by old ones
+    :return: serialized nodes with replaced sources
+    """
+    result = []
+    for node in content:
+        if isinstance(node, dict):
+            attrs = node.get("attrs")
+            if node["tag"] in MEDIA_TAGS and attrs and attrs.get("src") in sources:
+                node = dict(node, attrs=dict(attrs, src=sources[attrs["src"]]))
+            children = node.get("children")
+            if children:
+                replaced = replace_sources(children, sources)
+                if any(new is not old for new, old in zip(replaced, children)):
+                    node = dict(node, children=replaced)
+        result.append(node)
+    return result
+
+
+def file_name(url: str, content_type: str) -> str:
+    """
+    :param url: Url of downloaded file
+    :param content_type: MIME type from response headers
+    :return: File name with extension, supported by telegra.ph
+    :raises InvalidFileExtension: If neither url nor content type has supported extension
+    """
+    name = posixpath.basename(urlsplit(url).path) or "media"
+    if name.rsplit(".", 1)[-1].lower() in ALLOWED_EXTENSIONS:
+        return name
+    extension = mimetypes.guess_extension(content_type or "") or ""
+    if extension[1:] not in ALLOWED_EXTENSIONS:
+        raise InvalidFileExtension
+    return f"{name.rsplit('.', 1)[0]}{extension}"
+
+
+class MediaRehostStage(Stage):
+    """
+    Rewrites sources of img and video elements, which were already rehosted, while html is parsed.
+    Protocol-relative sources are made absolute. Other external sources are left for MediaRehoster.rehost
+    """
+    tags = MEDIA_TAGS
+
+    def __init__(self, cache: Dict[str, str]):
+        """
+        :param cache: telegra.ph sources by external urls. Shared with MediaRehoster
+        """
+        self.cache = cache
+
+    def start(self, element: Element):
+        src = element.attrs.get("src")
+        if not src:
+            return
+        if src.startswith("//"):
+            src = element.attrs["src"] = "https:" + src
+        if src in self.cache:
+            element.attrs["src"] = self.cache[src]
+
+
+class MediaRehoster:
+    """
+    Uploads external images and videos of page content to telegra.ph. Files are downloaded concurrently
+    through session of Telegraph object. Rehosted urls are cached, so every url is downloaded once;
+    concurrent conversions, that meet the same url, wait for one download
+    """
+
+    def __init__(self, max_file_size: int = MAX_FILE_SIZE, concurrency: int = 8, timeout: float = 30,
+                 local_hosts: Collection[str] = LOCAL_HOSTS, allow_private_hosts: bool = False):
+        """
+        :param max_file_size: Bigger files are not downloaded and keep their external sources
+        :param concurrency: Maximal number of simultaneous downloads of one document
+        :param timeout: Seconds to wait for one download
+        :param local_hosts: Hosts, which files are not rehosted
+        :param allow_private_hosts: Download files from loopback, private and link-local addresses.
+            Downloaded files are published, so enable it only for trusted content
+        """
+        self.max_file_size = max_file_size
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self.local_hosts = local_hosts
+        self.allow_private_hosts = allow_private_hosts
+        self.cache: Dict[str, str] = {}
+        """ telegra.ph sources by external urls """
+        self.errors: Dict[str, BaseException] = {}
+        """ Exceptions of urls, that couldn't be rehosted. They are tried again next time """
+        self.stage = MediaRehostStage(self.cache)
+        self._in_flight: Dict[str, asyncio.Future] = {}
+
+    def install(self, pipeline: Pipeline = None) -> Pipeline:
+        """
+        Adds MediaRehostStage into pipeline, used for content_html conversion
+
+        :param pipeline: Pipeline to extend. New pipeline with built-in stages is created if not set
+        :return: pipeline with MediaRehostStage
+        """
+        if pipeline is None:
+            pipeline = Pipeline()
+        if self.stage not in pipeline.stages:
+            pipeline.register(self.stage)
+        return pipeline
+
+    async def rehost(self, telegraph, content: ContentJSON) -> ContentJSON:
+        """
+        Replaces external sources of img and video nodes with uploaded copies.
+        Sources, that can't be downloaded or uploaded, are left unchanged
+
+        :param telegraph: Telegraph object, which session is used for downloads and upload_file for uploads
+        :param content: Serialized nodes
+        :return: serialized nodes with telegra.ph sources. Passed content is not modified
+        """
+        sources = external_sources(content, self.local_hosts)
+        waiting = [self._in_flight[url] for url in sources if url in self._in_flight]
+        missing = [url for url in sources if url not in self.cache and url not in self._in_flight]
+        loop = asyncio.get_event_loop()
+        for url in missing:
+            self._in_flight[url] = loop.create_future()
+
+        try:
+            async for result in run_bulk(lambda url: self._rehost_url(telegraph, url), missing, self.concurrency):
+                url = result.spec
+                future = self._in_flight.pop(url)
+                if result.ok:
+                    self.cache[url] = result.result
+                    self.errors.pop(url, None)
+                else:
+                    telegraph.logger.warning(f"Couldn't rehost {url}: {result.error!r}")
+                    self.errors[url] = result.error
+                future.set_result(None)
+        finally:
+            for url in missing:
+                future = self._in_flight.pop(url, None)
+                if future is not None:
+                    future.cancel()
+        if waiting:
+            await asyncio.wait(waiting)
+        return replace_sources(content, {url: self.cache[url] for url in sources if url in self.cache})
+
+    async def _rehost_url(self, telegraph, url: str) -> str:
+        data, content_type = await self._download(telegraph.session, url)
+        uploaded_file = await telegraph.upload_file(file_stream=BytesIO(data), file_name=file_name(url, content_type))
+        return uploaded_file.src
+
+    async def _download(self, session: aiohttp.ClientSession, url: str) -> Tuple[bytes, str]:
+        """
+        Downloads file, aborting as soon as it exceeds max_file_size. Redirects are followed manually,
+        so host of every location is checked
+
+        :return: file contents and MIME type
+        :raises FileIsTooBig: If file is bigger, than max_file_size
+        :raises ForbiddenMediaHost: If url or redirect location points to non-public address
+        """
+        for _ in range(MAX_REDIRECTS + 1):
+            await self._check_host(url)
+            async with session.get(url, allow_redirects=False,
+                                   timeout=aiohttp.ClientTimeout(total=self.timeout)) as response:
+                if response.status in REDIRECT_STATUSES and "Location" in response.headers:
+                    url = urljoin(url, response.headers["Location"])
+                    continue
+                response.raise_for_status()
+                if response.content_length is not None and response.content_length > self.max_file_size:
+                    raise FileIsTooBig(response.content_length)
+                data = bytearray()
+                async for chunk in response.content.iter_chunked(CHUNK_SIZE):
+                    data += chunk
+                    if len(data) > self.max_file_size:
+                        raise FileIsTooBig(len(data))
+                return bytes(data), response.content_type
+        raise aiohttp.ClientError(f"More than {MAX_REDIRECTS} redirects")
+
+    async def _check_host(self, url: str):
+        """
+        :raises ForbiddenMediaHost: If url isn't http(s) or its host resolves to non-public address
+        """
+        parts = urlsplit(url)
+        if parts.scheme not in ("http", "https") or not parts.hostname:
+            raise ForbiddenMediaHost(url)
+        if self.allow_private_hosts:
+            return
+        try:
+            addresses = [str(ipaddress.ip_address(parts.hostname))]
+        except ValueError:
+            try:
+                infos = await asyncio.get_event_loop().getaddrinfo(parts.hostname, parts.port,
+                                                                   type=socket.SOCK_STREAM)
+            except OSError:
+                raise ForbiddenMediaHost(url)
+            addresses = [info[4][0] for info in infos]
+        if not addresses or not all(is_public_address(address) for address in addresses):
+            raise ForbiddenMediaHost(url)
+
+    def save_cache(self, file_path: str):
+        """ Writes rehosted sources into JSON file """
+        with open(file_path, "w") as file:
+            json.dump(self.cache, file)
+
+    def load_cache(self, file_path: str):
+        """ Restores rehosted sources, written by save_cache """
+        with open(file_path) as file:
+            self.cache.update(json.load(file))
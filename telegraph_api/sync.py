@@ -0,0 +1,133 @@
+import asyncio
+import inspect
+import threading
+from concurrent.futures import Future
+from typing import Any, Iterable, Iterator, List
+
+from telegraph_api.api import Telegraph
+
+
+class SyncTelegraph:
+    """
+    Synchronous facade of Telegraph. Coroutines are executed in one background event loop thread,
+    so pooled session is reused across calls. Every public coroutine method of Telegraph is available
+    as blocking method, async iterators (e.g. iter_pages, create_pages) become regular iterators
+    """
+
+    def __init__(self, client: Telegraph = None, timeout: float = None, **kwargs):
+        """
+        :param client: Telegraph object (e.g. TelegraphPool) to wrap. Created from kwargs if not set
+        :param timeout: Seconds to wait for result of blocking call. Waits forever by default
+        :param kwargs: Telegraph constructor arguments
+        """
+        self.client = client if client is not None else Telegraph(**kwargs)
+        self.timeout = timeout
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._run_loop, name="SyncTelegraph", daemon=True)
+        self._thread.start()
+
+    def _run_loop(self):
+        asyncio.set_event_loop(self._loop)
+        self._loop.run_forever()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def __getattr__(self, name: str) -> Any:
+        if name == "client":
+            raise AttributeError(name)
+        attribute = getattr(self.client, name)
+        if name.startswith("_"):
+            return attribute
+        if inspect.iscoroutinefunction(attribute):
+            def call(*args, **kwargs):
+                return self.submit(name, *args, **kwargs).result(self.timeout)
+        elif inspect.isasyncgenfunction(attribute):
+            def call(*args, **kwargs):
+                return self._iterate(attribute(*args, **kwargs))
+        else:
+            return attribute
+        call.__name__ = name
+        call.__doc__ = attribute.__doc__
+        return call
+
+    @property
+    def access_token(self) -> str:
+        return self.client.access_token
+
+    @access_token.setter
+    def access_token(self, access_token: str):
+        self.client.access_token = access_token
+
+    def submit(self, method: str, *args, **kwargs) -> Future:
+        """
+        Schedules call of Telegraph coroutine method without waiting for its result
+
+        :param method: Method name, e.g. create_page
+        :param args: Method arguments
+        :return: concurrent.futures.Future with method result
+        """
+        if self._loop.is_closed():
+            raise RuntimeError("SyncTelegraph is closed")
+        return asyncio.run_coroutine_threadsafe(getattr(self.client, method)(*args, **kwargs), self._loop)
+
+    def submit_many(self, method: str, calls: Iterable[Any]) -> List[Future]:
+        """
+        Schedules many concurrent calls of one method
+
+        :param method: Method name, e.g. get_views
+        :param calls: Arguments of calls. Every item is dict with keyword arguments, tuple with positional ones
+            or single positional argument
+        :return: list of futures in the same order
+        """
+        futures = []
+        for arguments in calls:
+            if isinstance(arguments, dict):
+                futures.append(self.submit(method, **arguments))
+            elif isinstance(arguments, tuple):
+                futures.append(self.submit(method, *arguments))
+            else:
+                futures.append(self.submit(method, arguments))
+        return futures
+
+    def gather(self, futures: Iterable[Future], return_exceptions: bool = False) -> List[Any]:
+        """
+        Waits for futures, returned by submit or submit_many
+
+        :param return_exceptions: If true, exceptions are returned in place of results instead of being raised
+        :return: list of results in the same order
+        """
+        results = []
+        for future in futures:
+            try:
+                results.append(future.result(self.timeout))
+            except Exception as e:
+                if not return_exceptions:
+                    raise
+                results.append(e)
+        return results
+
+    def _iterate(self, iterator) -> Iterator[Any]:
+        try:
+            while True:
+                try:
+                    yield asyncio.run_coroutine_threadsafe(iterator.__anext__(), self._loop).result(self.timeout)
+                except StopAsyncIteration:
+                    return
+        finally:
+            if not self._loop.is_closed():
+                asyncio.run_coroutine_threadsafe(iterator.aclose(), self._loop).result(self.timeout)
+
+    def close(self):
+        """
+        Closes session of Telegraph object and stops event loop thread
+        """
+        if self._loop.is_closed():
+            return
+        asyncio.run_coroutine_threadsafe(self.client.close(), self._loop).result(self.timeout)
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
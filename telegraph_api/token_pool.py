@@ -0,0 +1,244 @@
+import asyncio
+import functools
+import json
+import time
+from typing import AsyncIterator, Dict, List, Optional, Union
+
+from telegraph_api.api import Telegraph
+from telegraph_api.exceptions import FloodWaitError
+from telegraph_api.models import Account, Page
+from telegraph_api.models.page import PagesList
+from telegraph_api.utils import endpoint_path, normalize_locals
+
+OWNED_PATH_ENDPOINTS = ("editPage",)
+""" Endpoints, that must be called with access token of page owner """
+ACCOUNT_ENDPOINTS = ("getAccountInfo", "editAccountInfo", "getPageList", "revokeAccessToken")
+""" Endpoints, which result depends on account. They are called with access_token of the pool, unless token is passed """
+
+
+class PoolAccount:
+    """ Access token of the pool with its load and FLOOD_WAIT cooldown """
+
+    def __init__(self, access_token: str):
+        self.access_token = access_token
+        self.in_flight = 0
+        """ Number of requests, that are being sent with this token """
+        self.cooldown_until = 0.0
+        self.requests = 0
+
+    def __repr__(self):
+        return f"PoolAccount(in_flight={self.in_flight}, requests={self.requests})"
+
+    @property
+    def throttled(self) -> bool:
+        return time.monotonic() < self.cooldown_until
+
+    def cooldown(self, seconds: float):
+        """ Excludes account from selection for given number of seconds (e.g. after FLOOD_WAIT error) """
+        self.cooldown_until = max(self.cooldown_until, time.monotonic() + seconds)
+
+
+class TelegraphPool(Telegraph):
+    """
+    Telegraph client, that spreads requests over several accounts. Every request is sent with token of the least
+    loaded account, that is not throttled by telegra.ph. Pages are edited with token of account, that created them
+    """
+
+    def __init__(self, access_tokens: List[str], page_owners: Dict[str, str] = None, **kwargs):
+        """
+        :param access_tokens: Access tokens of pool accounts
+        :param page_owners: Known page owners, path -> access token (e.g. restored by load_page_owners)
+        :param kwargs: Telegraph constructor arguments (session, rate_limiter, retry_policy, cache and others).
+            Session is shared by all accounts
+        """
+        if not access_tokens:
+            raise ValueError("At least one access token is required")
+        super().__init__(access_token=access_tokens[0], **kwargs)
+        self.accounts = [PoolAccount(access_token) for access_token in access_tokens]
+        self.page_owners: Dict[str, str] = dict(page_owners or {})
+
+    def get_account(self, access_token: str) -> Optional[PoolAccount]:
+        for account in self.accounts:
+            if account.access_token == access_token:
+                return account
+        return None
+
+    def add_account(self, access_token: str) -> PoolAccount:
+        """ Adds access token to the pool, if it is not there yet """
+        account = self.get_account(access_token)
+        if account is None:
+            account = PoolAccount(access_token)
+            self.accounts.append(account)
+        return account
+
+    def select_account(self, exclude: List[PoolAccount] = ()) -> PoolAccount:
+        """
+        :param exclude: Accounts, that were throttled during current request
+        :return: not throttled account with the least number of requests in flight
+            or account, which cooldown ends first, if all are throttled
+        """
+        candidates = [account for account in self.accounts if account not in exclude] or self.accounts
+        available = [account for account in candidates if not account.throttled]
+        if not available:
+            return min(candidates, key=lambda account: account.cooldown_until)
+        return min(available, key=lambda account: (account.in_flight, account.requests))
+
+    def owner_of(self, path: str) -> Optional[PoolAccount]:
+        """
+        :param path: Path to the Telegraph page
+        :return: Account, that owns the page, or None if owner is unknown
+        """
+        access_token = self.page_owners.get(path)
+        return self.add_account(access_token) if access_token else None
+
+    async def make_request(self, endpoint: str, params: dict = None, method: str = "get", model=None,
+                           use_token: bool = True, json=None, access_token: str = None, **extra_params):
+        """
+        Sends request with token of selected account. On FLOOD_WAIT error request is repeated with next account,
+        unless token of particular account is required: passed access_token, token of page owner for editPage
+        or access_token of the pool for ACCOUNT_ENDPOINTS. See Telegraph.make_request for arguments
+        """
+        if not use_token:
+            return await super().make_request(endpoint, params, method, model, use_token, json, access_token,
+                                              **extra_params)
+        name, _, path = endpoint_path(endpoint).partition("/")
+        if access_token:
+            pinned = self.get_account(access_token)
+            if pinned is None:
+                return await super().make_request(endpoint, params, method, model, use_token, json, access_token,
+                                                  **extra_params)
+        elif name in ACCOUNT_ENDPOINTS:
+            pinned = self.add_account(self.access_token)
+        elif name in OWNED_PATH_ENDPOINTS:
+            pinned = self.owner_of(path)
+        else:
+            pinned = None
+        throttled: List[PoolAccount] = []
+        while True:
+            account = pinned or self.select_account(throttled)
+            if account.throttled:
+                await asyncio.sleep(account.cooldown_until - time.monotonic())
+            account.in_flight += 1
+            account.requests += 1
+            try:
+                result = await super().make_request(endpoint, params, method, model, use_token, json,
+                                                    account.access_token, **extra_params)
+            except FloodWaitError as e:
+                account.cooldown(e.retry_after)
+                throttled.append(account)
+                if pinned is not None or len(throttled) >= len(self.accounts):
+                    raise
+                self.logger.debug(f"Account is throttled for {e.retry_after}s. Switching to next account")
+                continue
+            finally:
+                account.in_flight -= 1
+            self._remember_owners(name, result, account)
+            return result
+
+    def _remember_owners(self, name: str, result, account: PoolAccount):
+        if name in ("createPage", "editPage"):
+            pages = [result]
+        elif name == "getPageList":
+            pages = result["pages"] if isinstance(result, dict) else result.pages
+        else:
+            return
+        for page in pages:
+            path = page["path"] if isinstance(page, dict) else page.path
+            self.page_owners[path] = account.access_token
+
+    async def create_account(self, short_name: str, author_name: str = None, author_url: str = None,
+                             renew_token: bool = True):
+        """
+        Creates new account. If renew_token is set, its token is added to the pool instead of replacing current one
+        """
+        account = await super().create_account(short_name, author_name, author_url, renew_token=False)
+        if renew_token:
+            self.add_account(account.access_token)
+        return account
+
+    async def get_account_info(self, fields: List[str] = None, access_token: str = None):
+        """
+        :param fields: List of account fields to return. See Telegraph.get_account_info
+        :param access_token: Token of pool account. access_token of the pool by default
+        :return: an Account object
+        """
+        return await self.make_request("getAccountInfo", normalize_locals(locals(), "access_token"),
+                                       access_token=access_token)
+
+    async def edit_account_info(self, short_name: str = None, author_name: str = None, author_url: str = None,
+                                access_token: str = None) -> Account:
+        """
+        Updates information about one pool account. See Telegraph.edit_account_info for arguments
+
+        :param access_token: Token of pool account. access_token of the pool by default
+        """
+        return await self.make_request("editAccountInfo", params=normalize_locals(locals(), "access_token"),
+                                       access_token=access_token)
+
+    async def get_page_list(self, limit: int = 50, offset: int = 0, response_mode: str = None,
+                            access_token: str = None) -> Union[PagesList, dict]:
+        """
+        Returns pages of one pool account. See Telegraph.get_page_list for arguments
+
+        :param access_token: Token of pool account. access_token of the pool by default
+        """
+        return await self.make_request("getPageList",
+                                       params=normalize_locals(locals(), "response_mode", "access_token"),
+                                       model=PagesList, response_mode=response_mode, access_token=access_token)
+
+    async def iter_pages(self, limit: int = 200, offset: int = 0, concurrency: int = 1,
+                         access_token: str = None) -> AsyncIterator[Page]:
+        """
+        Iterates over pages of one account or, if access_token is not passed, over pages of every pool account
+        in turn. All windows of one account are fetched with its token. See Telegraph.iter_pages for arguments
+
+        :param offset: Sequential number of the first page of every account to be returned
+        :param access_token: Token of pool account, which pages are returned
+        """
+        access_tokens = [access_token] if access_token else [account.access_token for account in self.accounts]
+        for token in access_tokens:
+            get_page_list = functools.partial(self.get_page_list, access_token=token)
+            async for page in self._iter_pages(get_page_list, limit, offset, concurrency):
+                yield page
+
+    async def revoke_access_token(self, access_token: str = None) -> dict:
+        """
+        Revokes access token of one pool account. New token replaces revoked one in accounts and page owners
+
+        :param access_token: Token to revoke. Token of the first account by default
+        :return: Account object with access token field
+        """
+        old_token = access_token or self.access_token
+        account = self.get_account(old_token)
+        if account is None:
+            raise ValueError("Access token doesn't belong to the pool")
+        result: dict = await self.make_request("revokeAccessToken", access_token=old_token)
+        new_token = result["access_token"]
+        account.access_token = new_token
+        for path, owner in self.page_owners.items():
+            if owner == old_token:
+                self.page_owners[path] = new_token
+        if self.access_token == old_token:
+            self.access_token = new_token
+        self.logger.debug("Access token of pool account changed")
+        return result
+
+    def save_page_owners(self, file_path: str):
+        """
+        Writes known page owners into JSON file
+
+        :param file_path: Path to file. File contains access tokens, so keep it private
+        """
+        with open(file_path, "w") as file:
+            json.dump(self.page_owners, file)
+
+    def load_page_owners(self, file_path: str):
+        """
+        Restores page owners from JSON file, written by save_page_owners. Unknown tokens are added to the pool
+
+        :param file_path: Path to file
+        """
+        with open(file_path) as file:
+            self.page_owners.update(json.load(file))
+        for access_token in set(self.page_owners.values()):
+            self.add_account(access_token)
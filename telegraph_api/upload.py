@@ -0,0 +1,173 @@
+import asyncio
+import hashlib
+import mimetypes
+import os
+from typing import AsyncIterator, IO, List, Optional, Union
+
+import aiohttp
+
+from telegraph_api.exceptions import FileIsNotPresented, FileIsTooBig, InvalidFileExtension
+from telegraph_api.models.uploaded_file import ALLOWED_EXTENSIONS, MAX_FILE_SIZE
+
+CHUNK_SIZE = 64 * 1024
+""" Size of chunks, in which files are read from disk """
+
+UploadSource = Union[str, os.PathLike, IO]
+""" Path to file in local filesystem or opened binary stream """
+
+
+class UploadPart:
+    """ One file of multipart upload request """
+
+    def __init__(self, stream: IO, file_name: str, owned: bool):
+        """
+        :param stream: Binary stream with file contents
+        :param file_name: Name of the file, used for extension validation and content type guessing
+        :param owned: If true, stream was opened by library and will be closed after upload
+        """
+        self.stream = stream
+        self.file_name = file_name
+        self.owned = owned
+
+    @property
+    def content_type(self) -> str:
+        """ MIME type, guessed from file name """
+        return mimetypes.guess_type(self.file_name)[0] or "application/octet-stream"
+
+    async def read_chunks(self, chunk_size: int = CHUNK_SIZE) -> AsyncIterator[bytes]:
+        """
+        Reads stream in chunks in default executor, so event loop is never blocked by disk I/O
+
+        :param chunk_size: Size of one chunk in bytes
+        :return: async iterator of chunks
+        """
+        loop = asyncio.get_event_loop()
+        while True:
+            chunk = await loop.run_in_executor(None, self.stream.read, chunk_size)
+            if not chunk:
+                return
+            yield chunk
+
+    async def digest(self) -> Optional[str]:
+        """
+        Computes SHA-256 of file contents in default executor. File is read in chunks, so it is never loaded into
+        memory at once. Stream position is restored afterwards
+
+        :return: hex digest or None, if stream is not seekable
+        """
+        loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(None, _hash_stream, self.stream)
+
+    def close(self):
+        """ Closes stream, if it was opened by library """
+        if self.owned:
+            self.stream.close()
+
+
+def _hash_stream(stream: IO) -> Optional[str]:
+    try:
+        if not stream.seekable():
+            return None
+        position = stream.tell()
+    except (AttributeError, OSError, ValueError):
+        return None
+    digest = hashlib.sha256()
+    for chunk in iter(lambda: stream.read(CHUNK_SIZE), b""):
+        digest.update(chunk)
+    stream.seek(position)
+    return digest.hexdigest()
+
+
+def validate_upload(file_name: Optional[str], size: Optional[int]):
+    """
+    Checks file before any network I/O
+
+    :param file_name: Name of the file. Extension is not checked if name is unknown
+    :param size: Size of the file in bytes. Size is not checked if it is unknown
+    :raises InvalidFileExtension: If file extension is not supported by telegra.ph
+    :raises FileIsTooBig: If file is bigger, than telegra.ph allows
+    """
+    if file_name is not None and file_name.rsplit(".", 1)[-1].lower() not in ALLOWED_EXTENSIONS:
+        raise InvalidFileExtension
+    if size is not None and size > MAX_FILE_SIZE:
+        raise FileIsTooBig(size)
+
+
+def _stream_size(stream: IO) -> Optional[int]:
+    try:
+        return os.fstat(stream.fileno()).st_size - stream.tell()
+    except (AttributeError, OSError, ValueError):
+        pass
+    try:
+        position = stream.tell()
+        size = stream.seek(0, os.SEEK_END) - position
+        stream.seek(position)
+        return size
+    except (AttributeError, OSError, ValueError):
+        return None
+
+
+async def open_upload(source: UploadSource, file_name: str = None) -> UploadPart:
+    """
+    Validates and opens file for uploading. Files on disk are checked and opened in executor
+
+    :param source: Path to file in local filesystem or opened binary stream
+    :param file_name: Name of the file. Taken from path or stream name if not specified
+    :return: UploadPart object
+    :raises FileIsNotPresented: If no file was passed
+    :raises InvalidFileExtension: If file extension is not supported by telegra.ph
+    :raises FileIsTooBig: If file is bigger, than telegra.ph allows
+    """
+    if not source:
+        raise FileIsNotPresented
+    loop = asyncio.get_event_loop()
+    if isinstance(source, (str, os.PathLike)):
+        file_name = file_name or os.path.basename(source)
+        validate_upload(file_name, None)
+        size = (await loop.run_in_executor(None, os.stat, source)).st_size
+        validate_upload(file_name, size)
+        stream = await loop.run_in_executor(None, open, source, "rb")
+        return UploadPart(stream, file_name, owned=True)
+    stream_name = getattr(source, "name", None)
+    file_name = file_name or (os.path.basename(stream_name) if isinstance(stream_name, str) else None)
+    validate_upload(file_name, _stream_size(source))
+    return UploadPart(source, file_name or "file", owned=False)
+
+
+async def open_uploads(sources: List[UploadSource]) -> List[UploadPart]:
+    """
+    Opens several files for uploading. Already opened files are closed if one of files is invalid
+
+    :param sources: Paths to files or opened binary streams
+    :return: list of UploadPart objects
+    """
+    if not sources:
+        raise FileIsNotPresented
+    parts = []
+    try:
+        for source in sources:
+            parts.append(await open_upload(source))
+    except Exception:
+        close_uploads(parts)
+        raise
+    return parts
+
+
+def build_form(parts: List[UploadPart]) -> aiohttp.FormData:
+    """
+    Builds multipart body, where every file is streamed by chunks
+
+    :param parts: Opened files
+    :return: FormData object
+    """
+    form = aiohttp.FormData()
+    for index, part in enumerate(parts):
+        form.add_field(f"file{index}" if index else "file", part.read_chunks(), filename=part.file_name,
+                       content_type=part.content_type)
+    return form
+
+
+def close_uploads(parts: List[UploadPart]):
+    """ Closes all streams, that were opened by library """
+    for part in parts:
+        part.close()
@@ -0,0 +1,129 @@
+import asyncio
+import dbm
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from telegraph_api.cache import FetchAbandoned
+from telegraph_api.exceptions import TelegraphError
+
+
+class UploadCache:
+    """
+    Maps SHA-256 of uploaded files to their telegra.ph src, so identical files are uploaded only once.
+    Recently used entries are kept in memory, all entries can be persisted in dbm database.
+    Concurrent uploads of the same content are coalesced into one request
+    """
+
+    def __init__(self, max_size: int = 4096, path: str = None):
+        """
+        :param max_size: Maximal number of entries in memory. Least recently used entries are evicted first
+        :param path: Path to dbm database, that keeps entries between runs. Entries are kept only in memory if not set
+        """
+        self.max_size = max_size
+        self._entries: "OrderedDict[str, str]" = OrderedDict()
+        self._in_flight: Dict[str, asyncio.Future] = {}
+        self._db = dbm.open(path, "c") if path is not None else None
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, digest: str) -> Optional[str]:
+        """
+        :param digest: SHA-256 hex digest of file contents
+        :return: src of uploaded file or None
+        """
+        src = self._entries.get(digest)
+        if src is not None:
+            self._entries.move_to_end(digest)
+            return src
+        if self._db is not None:
+            stored = self._db.get(digest)
+            if stored is not None:
+                src = stored.decode()
+                self._remember(digest, src)
+        return src
+
+    def _remember(self, digest: str, src: str):
+        self._entries[digest] = src
+        self._entries.move_to_end(digest)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def set(self, digest: str, src: str):
+        """ Stores src of uploaded file """
+        self._remember(digest, src)
+        if self._db is not None:
+            self._db[digest] = src
+
+    async def get_or_upload(self, digests: List[str],
+                            upload: Callable[[List[int]], Awaitable[List[str]]]) -> List[str]:
+        """
+        Returns cached srcs and uploads files, that are not cached. Files, that are being uploaded by other call,
+        are awaited instead of uploading
+
+        :param digests: Digests of files
+        :param upload: Coroutine function, that uploads files by their indexes in one request and returns their srcs
+        :return: srcs of all files in the same order
+        """
+        results: List[Optional[str]] = [None] * len(digests)
+        waiting: Dict[int, asyncio.Future] = {}
+        missing: List[int] = []
+        for index, digest in enumerate(digests):
+            src = self.get(digest)
+            if src is not None:
+                self.hits += 1
+                results[index] = src
+            elif digest in self._in_flight:
+                self.hits += 1
+                waiting[index] = self._in_flight[digest]
+            else:
+                self.misses += 1
+                missing.append(index)
+                self._in_flight[digest] = asyncio.get_event_loop().create_future()
+
+        if missing:
+            try:
+                srcs = await upload(missing)
+                if len(srcs) != len(missing):
+                    raise TelegraphError(f"{len(missing)} files were uploaded, but {len(srcs)} srcs were returned")
+            except Exception as e:
+                self._fail(digests, missing, e)
+                raise
+            except BaseException:
+                self._fail(digests, missing, FetchAbandoned())
+                raise
+            for index, src in zip(missing, srcs):
+                self.set(digests[index], src)
+                results[index] = src
+                self._in_flight.pop(digests[index]).set_result(src)
+
+        abandoned = []
+        for index, future in waiting.items():
+            try:
+                results[index] = await asyncio.shield(future)
+            except FetchAbandoned:
+                abandoned.append(index)
+        if abandoned:
+            # Caller, that was uploading these files, was cancelled. They are uploaded again by one of waiters
+            async def upload_abandoned(indexes: List[int]) -> List[str]:
+                return await upload([abandoned[index] for index in indexes])
+
+            srcs = await self.get_or_upload([digests[index] for index in abandoned], upload_abandoned)
+            for index, src in zip(abandoned, srcs):
+                results[index] = src
+        return results
+
+    def _fail(self, digests: List[str], indexes: List[int], error: BaseException):
+        for index in indexes:
+            future = self._in_flight.pop(digests[index])
+            future.set_exception(error)
+            # Exception is re-raised by uploading caller, so it shouldn't be reported as never retrieved
+            future.exception()
+
+    def close(self):
+        """ Closes dbm database """
+        if self._db is not None:
+            self._db.close()
+            self._db = None
@@ -1,9 +1,10 @@
 from json import dumps
 from typing import List, Union
+from urllib.parse import urlparse
 
 from pydantic import BaseModel
 
-from telegraph_api.models import Node
+from telegraph_api.models import LightNode, Node
 
 
 def normalize_locals(_locals: dict, *unnecessary_parameters) -> dict:
@@ -30,9 +31,9 @@ def normalize_locals(_locals: dict, *unnecessary_parameters) -> dict:
     return result
 
 
-def serialize_nodes(nodes: List[Union[Node, str]]) -> List[Union[dict, str]]:
+def serialize_nodes(nodes: List[Union[Node, LightNode, dict, str]]) -> List[Union[dict, str]]:
     """
-    Converts list with Pydantic nodes into serializable list of dicts
+    Converts list with Pydantic nodes or LightNode objects into serializable list of dicts
     :param nodes:
     :return:
     """
@@ -41,7 +42,30 @@ def serialize_nodes(nodes: List[Union[Node, str]]) -> List[Union[dict, str]]:
         if type(element) == str:
             if element:
                 result_list.append(element)
+        elif type(element) == LightNode:
+            result_list.append(element.to_dict())
         elif type(element) == Node:
             result_list.append(element.dict())
+        elif type(element) == dict:
+            # Already serialized node, e.g. result of html2content
+            result_list.append(element)
 
     return result_list
+
+
+def endpoint_name(url: str) -> str:
+    """
+    Extracts API method name from endpoint url
+    :param url: Endpoint url, e.g. https://api.telegra.ph/getPage/Sample-Page-12-15
+    :return: method name, e.g. getPage
+    """
+    return endpoint_path(url).split("/")[0]
+
+
+def endpoint_path(url: str) -> str:
+    """
+    Extracts endpoint path without host from endpoint url
+    :param url: Endpoint url, e.g. https://api.telegra.ph/getPage/Sample-Page-12-15
+    :return: endpoint path, e.g. getPage/Sample-Page-12-15
+    """
+    return urlparse(url).path.strip("/")
@@ -0,0 +1,142 @@
+"""
+Measures throughput and latency percentiles of client methods against local fake telegra.ph server
+
+Usage: python -m tests.benchmarks.bench_client [--requests N] [--concurrency 1 10 50] [--latency 0.005]
+                                                [--output results.json] [--compare baseline.json]
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import statistics
+import tempfile
+import time
+from typing import Awaitable, Callable, Dict, List
+
+from telegraph_api import Telegraph
+from telegraph_api.endpoints import EndpointConfig
+from telegraph_api.html_transform import html2nodes
+from tests.benchmarks.bench_html2nodes import build_document
+from tests.benchmarks.fake_server import FakeTelegraphServer
+
+PAGE_HTML = build_document(16 * 1024)
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(fraction * (len(ordered) - 1))))
+    return ordered[index]
+
+
+async def run_scenario(operation: Callable[[int], Awaitable], requests: int, concurrency: int) -> Dict[str, float]:
+    """
+    Runs operation `requests` times with `concurrency` simultaneous workers
+
+    :return: throughput, latency percentiles in milliseconds and number of errors
+    """
+    latencies = []
+    errors = 0
+    counter = iter(range(requests))
+
+    async def worker():
+        nonlocal errors
+        for index in counter:
+            started = time.perf_counter()
+            try:
+                await operation(index)
+            except Exception:
+                errors += 1
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*[worker() for _ in range(concurrency)])
+    elapsed = time.perf_counter() - started
+    return {
+        "throughput": requests / elapsed,
+        "p50": percentile(latencies, 0.5) * 1000,
+        "p90": percentile(latencies, 0.9) * 1000,
+        "p99": percentile(latencies, 0.99) * 1000,
+        "mean": statistics.mean(latencies) * 1000,
+        "errors": errors,
+    }
+
+
+async def run_benchmarks(requests: int, concurrency_levels: List[int], server: FakeTelegraphServer) -> dict:
+    results = {}
+    image = os.path.join(tempfile.mkdtemp(), "image.png")
+    with open(image, "wb") as file:
+        file.write(b"\x89PNG" + os.urandom(64 * 1024))
+
+    async with Telegraph(endpoints=EndpointConfig(server.url, server.upload_url)) as telegraph:
+        await telegraph.create_account("benchmark", author_name="Benchmark")
+        page = await telegraph.create_page("Benchmark page", content_html=PAGE_HTML)
+
+        async def convert(index: int):
+            html2nodes(PAGE_HTML, light=True)
+
+        operations = {
+            "create_page": lambda index: telegraph.create_page(f"Page {index}", content_html=PAGE_HTML),
+            "get_page": lambda index: telegraph.get_page(page.path, return_content=True),
+            "upload_file": lambda index: telegraph.upload_file(image),
+            "html2nodes": convert,
+        }
+        for name, operation in operations.items():
+            for concurrency in concurrency_levels:
+                key = f"{name}@{concurrency}"
+                results[key] = await run_scenario(operation, requests, concurrency)
+                print(f"{key:>20}: {results[key]['throughput']:9.1f} req/s, p50 {results[key]['p50']:8.2f} ms, "
+                      f"p90 {results[key]['p90']:8.2f} ms, p99 {results[key]['p99']:8.2f} ms, "
+                      f"errors {results[key]['errors']}")
+    return results
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> List[str]:
+    """
+    :return: Descriptions of scenarios, which throughput dropped more than tolerance fraction
+    """
+    regressions = []
+    for key, result in results.items():
+        if key not in baseline:
+            continue
+        ratio = result["throughput"] / baseline[key]["throughput"]
+        print(f"{key:>20}: {ratio:6.2f}x of baseline throughput")
+        if ratio < 1 - tolerance:
+            regressions.append(f"{key}: {ratio:.2f}x")
+    return regressions
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 10, 50])
+    parser.add_argument("--latency", type=float, default=0.005, help="Fake server latency in seconds")
+    parser.add_argument("--error-rate", type=float, default=0)
+    parser.add_argument("--flood-wait-rate", type=float, default=0)
+    parser.add_argument("--output", help="Write results into JSON file")
+    parser.add_argument("--compare", help="Compare throughput with results from JSON file")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed throughput drop fraction")
+    args = parser.parse_args()
+
+    async with FakeTelegraphServer(latency=args.latency, error_rate=args.error_rate,
+                                   flood_wait_rate=args.flood_wait_rate, seed=0) as server:
+        results = await run_benchmarks(args.requests, args.concurrency, server)
+
+    report = {
+        "python": platform.python_version(),
+        "requests": args.requests,
+        "latency": args.latency,
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(report, file, indent=2)
+    if args.compare:
+        with open(args.compare) as file:
+            regressions = compare(results, json.load(file)["results"], args.tolerance)
+        if regressions:
+            raise SystemExit("Throughput regressions: " + ", ".join(regressions))
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
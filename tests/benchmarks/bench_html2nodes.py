@@ -0,0 +1,73 @@
+"""
+Compares single pass html2nodes with the previous BeautifulSoup based converter
+
+Usage: python -m tests.benchmarks.bench_html2nodes [size in kilobytes]
+"""
+import sys
+import time
+from typing import List
+
+from bs4 import BeautifulSoup
+
+from telegraph_api.html_transform import html2nodes
+from telegraph_api.html_transform_middlewares import remove_unsupported_tags, remove_unsupported_attrs
+from telegraph_api.models import Node
+
+ARTICLE_BLOCK = """
+<div class="section">
+    <h3>Chapter title</h3>
+    <p>Some <strong>bold</strong> and <em>emphasized</em> text with <a href="https://example.com">link</a>.</p>
+    <blockquote><p>Quote with <span>unsupported <b>nested</b> tags</span> inside</p></blockquote>
+    <ul><li>First item</li><li>Second <i>item</i></li></ul>
+    <figure><img src="/file/image.png"><figcaption>Image caption</figcaption></figure>
+    <pre>code = "example"
+print(code)</pre>
+</div>
+"""
+
+
+def bs4_html2nodes(html: str, use_middlewares: bool = True) -> List[Node]:
+    """ Converter, that was used before single pass parser. Kept here as a baseline """
+    result = []
+    if use_middlewares:
+        for middleware in (remove_unsupported_tags, remove_unsupported_attrs, str.strip):
+            html = middleware(html)
+    bs_object = BeautifulSoup(html, features="html.parser")
+    for child in bs_object.contents:
+        if child.name is None:
+            result.append(str(child.string).strip("\n"))
+        else:
+            result.append(Node(tag=child.name, attrs=child.attrs,
+                               children=bs4_html2nodes("".join(map(str, child.contents)), False)))
+    return result
+
+
+def build_document(size: int) -> str:
+    blocks = []
+    length = 0
+    while length < size:
+        blocks.append(ARTICLE_BLOCK)
+        length += len(ARTICLE_BLOCK)
+    return "".join(blocks)
+
+
+def measure(function, html: str) -> float:
+    started = time.perf_counter()
+    function(html)
+    return time.perf_counter() - started
+
+
+def main():
+    size = int(sys.argv[1]) * 1024 if len(sys.argv) > 1 else 1024 * 1024
+    html = build_document(size)
+    print(f"Document size: {len(html) / 1024:.0f} KB")
+    assert html2nodes(html) == bs4_html2nodes(html), "Converters output differs"
+    single_pass = measure(html2nodes, html)
+    print(f"single pass html2nodes: {single_pass:.3f}s")
+    baseline = measure(bs4_html2nodes, html)
+    print(f"BeautifulSoup html2nodes: {baseline:.3f}s")
+    print(f"Speedup: {baseline / single_pass:.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,74 @@
+"""
+Compares JSON backends on encoding and decoding of large page contents
+
+Usage: python -m tests.benchmarks.bench_json [number of paragraphs]
+"""
+import sys
+import time
+from json import dumps
+
+from pydantic import parse_obj_as
+
+from telegraph_api.json_backend import BACKENDS_PRIORITY, get_json_backend
+from telegraph_api.lazy import lazy_construct
+from telegraph_api.models import LightNode, Page
+from telegraph_api.utils import serialize_nodes
+
+ROUNDS = 5
+
+
+def build_content(paragraphs: int) -> list:
+    return [
+        LightNode("p", None, [f"Paragraph {index} with ", LightNode("a", {"href": f"/page-{index}"}, ["link"]),
+                              " and «unicode» text. " * 5])
+        for index in range(paragraphs)
+    ]
+
+
+def measure(function) -> float:
+    started = time.perf_counter()
+    for _ in range(ROUNDS):
+        function()
+    return (time.perf_counter() - started) / ROUNDS
+
+
+def main():
+    paragraphs = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    content = build_content(paragraphs)
+    response = dumps({"ok": True, "result": {
+        "path": "Page", "url": "https://telegra.ph/Page", "title": "Page", "description": "", "views": 0,
+        "content": serialize_nodes(content)
+    }}).encode()
+    print(f"{paragraphs} paragraphs, response size: {len(response) / 1024:.0f} KB")
+
+    # Content was encoded into string and then embedded into request body, that was encoded again
+    def double_encode():
+        dumps({"title": "Page", "content": dumps(serialize_nodes(content))})
+
+    print(f"{'double encoding (previous)':>28}: encode {measure(double_encode) * 1000:8.2f} ms")
+    for name in BACKENDS_PRIORITY:
+        try:
+            backend = get_json_backend(name)
+        except ImportError:
+            print(f"{name:>28}: not installed")
+            continue
+
+        def encode():
+            backend.dumps({"title": "Page", "content": serialize_nodes(content)})
+
+        def decode():
+            parse_obj_as(Page, backend.loads(response)["result"])
+
+        def decode_raw():
+            backend.loads(response)
+
+        def decode_lazy():
+            lazy_construct(Page, backend.loads(response)["result"])
+
+        print(f"{name:>28}: encode {measure(encode) * 1000:8.2f} ms, decode {measure(decode_raw) * 1000:8.2f} ms, "
+              f"decode + validation {measure(decode) * 1000:8.2f} ms, "
+              f"decode + lazy model {measure(decode_lazy) * 1000:8.2f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,227 @@
+"""
+Local in-memory stand-in for api.telegra.ph and telegra.ph/upload
+"""
+import asyncio
+import json
+import random
+import re
+import secrets
+from typing import Optional, Tuple, Union
+
+from aiohttp import web
+
+
+class FakeTelegraphServer:
+    """
+    aiohttp application, that implements telegra.ph API methods in memory. Latency, random errors
+    and FLOOD_WAIT responses can be configured to emulate real API behaviour
+    """
+
+    def __init__(self, latency: Union[float, Tuple[float, float]] = 0, error_rate: float = 0,
+                 flood_wait_rate: float = 0, flood_wait: int = 1, seed: Optional[int] = None):
+        """
+        :param latency: Delay of every response in seconds, or (min, max) range of random delay
+        :param error_rate: Probability of INTERNAL_ERROR response
+        :param flood_wait_rate: Probability of FLOOD_WAIT_<flood_wait> response
+        :param flood_wait: Wait time, returned in FLOOD_WAIT responses
+        :param seed: Seed for random generator, that decides about latency and errors
+        """
+        self.latency = latency
+        self.error_rate = error_rate
+        self.flood_wait_rate = flood_wait_rate
+        self.flood_wait = flood_wait
+        self.random = random.Random(seed)
+        self.accounts = {}
+        self.pages = {}
+        self.requests = 0
+        self.url = None
+        self.upload_url = None
+        self._runner = None
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.stop()
+
+    def make_app(self) -> web.Application:
+        app = web.Application(client_max_size=16 * 1024 * 1024)
+        app.router.add_post("/upload", self.upload)
+        app.router.add_route("*", "/{method}", self.dispatch)
+        app.router.add_route("*", "/{method}/{path}", self.dispatch)
+        return app
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0):
+        self._runner = web.AppRunner(self.make_app())
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+        port = self._runner.addresses[0][1]
+        self.url = f"http://{host}:{port}"
+        self.upload_url = f"{self.url}/upload"
+
+    async def stop(self):
+        await self._runner.cleanup()
+
+    async def _delay(self):
+        latency = self.latency
+        if isinstance(latency, tuple):
+            latency = self.random.uniform(*latency)
+        if latency:
+            await asyncio.sleep(latency)
+
+    def _injected_error(self) -> Optional[str]:
+        chance = self.random.random()
+        if chance < self.flood_wait_rate:
+            return f"FLOOD_WAIT_{self.flood_wait}"
+        if chance < self.flood_wait_rate + self.error_rate:
+            return "INTERNAL_ERROR"
+        return None
+
+    async def dispatch(self, request: web.Request) -> web.Response:
+        self.requests += 1
+        await self._delay()
+        params = dict(request.query)
+        if request.method == "POST" and request.can_read_body:
+            if request.content_type == "application/json":
+                params.update(json.loads(await request.read()))
+            else:
+                params.update(await request.post())
+        handler = getattr(self, f"handle_{request.match_info['method']}", None)
+        error = self._injected_error()
+        if handler is None:
+            error = "METHOD_NOT_FOUND"
+        if error is None:
+            try:
+                return web.json_response({"ok": True, "result": handler(params, request.match_info.get("path"))})
+            except LookupError as e:
+                error = e.args[0]
+        return web.json_response({"ok": False, "error": error})
+
+    def _account(self, params: dict) -> dict:
+        if params.get("access_token") not in self.accounts:
+            raise LookupError("ACCESS_TOKEN_INVALID")
+        return self.accounts[params["access_token"]]
+
+    def handle_createAccount(self, params: dict, path: Optional[str]) -> dict:
+        account = {
+            "short_name": params.get("short_name", ""),
+            "author_name": params.get("author_name", ""),
+            "author_url": params.get("author_url", ""),
+            "access_token": secrets.token_hex(16),
+            "pages": [],
+        }
+        self.accounts[account["access_token"]] = account
+        return self._account_info(account, ("short_name", "author_name", "author_url", "access_token"))
+
+    @staticmethod
+    def _account_info(account: dict, fields) -> dict:
+        info = {field: account[field] for field in fields if field in account}
+        if "page_count" in fields:
+            info["page_count"] = len(account["pages"])
+        return info
+
+    def handle_getAccountInfo(self, params: dict, path: Optional[str]) -> dict:
+        fields = json.loads(params["fields"]) if params.get("fields") else ["short_name", "author_name", "author_url"]
+        return self._account_info(self._account(params), fields)
+
+    def handle_editAccountInfo(self, params: dict, path: Optional[str]) -> dict:
+        account = self._account(params)
+        for field in ("short_name", "author_name", "author_url"):
+            if field in params:
+                account[field] = params[field]
+        return self._account_info(account, ("short_name", "author_name", "author_url"))
+
+    def handle_revokeAccessToken(self, params: dict, path: Optional[str]) -> dict:
+        account = self.accounts.pop(self._account(params)["access_token"])
+        account["access_token"] = secrets.token_hex(16)
+        self.accounts[account["access_token"]] = account
+        return self._account_info(account, ("access_token",))
+
+    @staticmethod
+    def _content(params: dict) -> list:
+        content = params.get("content")
+        if isinstance(content, str):
+            content = json.loads(content)
+        if not content:
+            raise LookupError("CONTENT_REQUIRED")
+        if len(json.dumps(content, ensure_ascii=False).encode()) > 64 * 1024:
+            raise LookupError("CONTENT_TOO_BIG")
+        return content
+
+    def _page(self, page: dict, params: dict, can_edit: bool = None) -> dict:
+        result = {key: value for key, value in page.items() if key not in ("content", "owner")}
+        if params.get("return_content") in ("true", True):
+            result["content"] = page["content"]
+        if can_edit is not None:
+            result["can_edit"] = can_edit
+        return result
+
+    def handle_createPage(self, params: dict, path: Optional[str]) -> dict:
+        account = self._account(params)
+        if not params.get("title"):
+            raise LookupError("TITLE_REQUIRED")
+        slug = re.sub(r"[^A-Za-z0-9]+", "-", params["title"]).strip("-") or "Page"
+        path = f"{slug}-{len(self.pages) + 1}"
+        page = {
+            "path": path,
+            "url": f"https://telegra.ph/{path}",
+            "title": params["title"],
+            "description": "",
+            "author_name": params.get("author_name", account["author_name"]),
+            "author_url": params.get("author_url", account["author_url"]),
+            "views": 0,
+            "content": self._content(params),
+            "owner": account["access_token"],
+        }
+        self.pages[path] = page
+        account["pages"].insert(0, path)
+        return self._page(page, params, can_edit=True)
+
+    def handle_editPage(self, params: dict, path: Optional[str]) -> dict:
+        account = self._account(params)
+        if path not in self.pages:
+            raise LookupError("PAGE_NOT_FOUND")
+        page = self.pages[path]
+        if path not in account["pages"]:
+            raise LookupError("PAGE_ACCESS_DENIED")
+        page["title"] = params.get("title", page["title"])
+        page["content"] = self._content(params)
+        for field in ("author_name", "author_url"):
+            if field in params:
+                page[field] = params[field]
+        return self._page(page, params, can_edit=True)
+
+    def handle_getPage(self, params: dict, path: Optional[str]) -> dict:
+        if path not in self.pages:
+            raise LookupError("PAGE_NOT_FOUND")
+        page = self.pages[path]
+        page["views"] += 1
+        return self._page(page, params)
+
+    def handle_getPageList(self, params: dict, path: Optional[str]) -> dict:
+        account = self._account(params)
+        offset, limit = int(params.get("offset", 0)), min(int(params.get("limit", 50)), 200)
+        paths = account["pages"][offset:offset + limit]
+        return {"total_count": len(account["pages"]),
+                "pages": [self._page(self.pages[path], {}, can_edit=True) for path in paths]}
+
+    def handle_getViews(self, params: dict, path: Optional[str]) -> dict:
+        if path not in self.pages:
+            raise LookupError("PAGE_NOT_FOUND")
+        return {"views": self.pages[path]["views"]}
+
+    async def upload(self, request: web.Request) -> web.Response:
+        self.requests += 1
+        await self._delay()
+        error = self._injected_error()
+        if error is not None:
+            return web.json_response({"error": error})
+        result = []
+        reader = await request.multipart()
+        async for part in reader:
+            await part.read()
+            extension = (part.filename or "file").rsplit(".", 1)[-1]
+            result.append({"src": f"/file/{secrets.token_hex(8)}.{extension}"})
+        return web.json_response(result)
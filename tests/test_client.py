@@ -0,0 +1,1171 @@
+import asyncio
+import json
+import os
+import tempfile
+import threading
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from io import BytesIO
+from urllib.parse import urlsplit
+
+import aiohttp
+from aiohttp import web
+
+from tests.benchmarks.fake_server import FakeTelegraphServer
+from telegraph_api import ContentTooBig, FloodWaitError, RateLimiter, RetryPolicy, SyncTelegraph, Telegraph, \
+    TelegraphError, TelegraphPool
+from telegraph_api.exceptions import FileIsTooBig, ForbiddenMediaHost, InvalidFileExtension
+from telegraph_api.json_backend import BACKENDS_PRIORITY, JSONBackend, RawJSON, get_json_backend
+from telegraph_api.lazy import LazyContent
+from telegraph_api.analytics import ViewsAnalytics, period_range
+from telegraph_api.archive import PageArchive
+from telegraph_api.bulk import run_bulk
+from telegraph_api.cache import ResponseCache
+from telegraph_api.upload_cache import UploadCache
+from telegraph_api.offload import html2content
+from telegraph_api.rehost import MediaRehoster
+from telegraph_api.content_diff import ContentChange, ContentTracker, diff_content
+from telegraph_api.instrumentation import Instrumentation, MetricsSink
+from telegraph_api.endpoints import EndpointConfig
+from telegraph_api.models import Node, Page, PagesList
+from telegraph_api.pipeline import Pipeline
+
+
+def run_async(future):
+    if asyncio.get_event_loop().is_closed():
+        loop = asyncio.new_event_loop()
+        return loop.run_until_complete(future)
+    else:
+        current_loop = asyncio.get_event_loop()
+        return current_loop.run_until_complete(future)
+
+
+class LocalServer:
+    """ Tiny local HTTP server, answering with queued responses or with ok telegra.ph-like response """
+
+    def __init__(self):
+        self.peers = set()
+        self.responses = []
+        self.requests = 0
+        self.bodies = []
+        self.delay = 0
+        self.status = 200
+        self.chunked = False
+        self.runner = None
+        self.url = None
+
+    async def handle(self, request: web.Request):
+        self.peers.add(request.transport.get_extra_info("peername"))
+        self.requests += 1
+        self.bodies.append(await request.read())
+        await asyncio.sleep(self.delay)
+        if self.status != 200:
+            return web.Response(status=self.status, text="Bad gateway")
+        response = web.json_response(self.responses.pop(0) if self.responses
+                                     else {"ok": True, "result": {"path": request.path}})
+        if self.chunked:
+            response.enable_chunked_encoding()
+        return response
+
+    async def start(self):
+        app = web.Application()
+        app.router.add_route("*", "/{tail:.*}", self.handle)
+        self.runner = web.AppRunner(app)
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, "127.0.0.1", 0)
+        await site.start()
+        port = self.runner.addresses[0][1]
+        self.url = f"http://127.0.0.1:{port}"
+
+    async def stop(self):
+        await self.runner.cleanup()
+
+
+class SessionTestCases(unittest.TestCase):
+    def setUp(self):
+        self.server = LocalServer()
+        run_async(self.server.start())
+
+    def tearDown(self):
+        run_async(self.server.stop())
+
+    def test_session_is_reused(self):
+        async def scenario():
+            async with Telegraph(connection_limit=1) as telegraph:
+                session = telegraph.session
+                for _ in range(5):
+                    await telegraph.get(f"{self.server.url}/getPage/test")
+                self.assertIs(session, telegraph.session)
+            self.assertTrue(session.closed)
+
+        run_async(scenario())
+        self.assertEqual(1, len(self.server.peers))
+
+    def test_shared_session_is_not_closed(self):
+        async def scenario():
+            async with aiohttp.ClientSession() as session:
+                first, second = Telegraph(session=session), Telegraph(session=session)
+                await first.get(f"{self.server.url}/getPage/first")
+                await second.post(f"{self.server.url}/createPage", params=None)
+                await first.close()
+                self.assertFalse(session.closed)
+                self.assertIs(session, second.session)
+
+        run_async(scenario())
+
+    def test_several_event_loops(self):
+        server_loop = asyncio.new_event_loop()
+        thread = threading.Thread(target=server_loop.run_forever, daemon=True)
+        thread.start()
+        server = FakeTelegraphServer()
+        asyncio.run_coroutine_threadsafe(server.start(), server_loop).result()
+        try:
+            telegraph = Telegraph(endpoints=EndpointConfig(server.url, server.upload_url))
+            asyncio.run(telegraph.create_account("fake"))
+            page_list = asyncio.run(telegraph.get_page_list())
+            asyncio.run(telegraph.close())
+        finally:
+            asyncio.run_coroutine_threadsafe(server.stop(), server_loop).result()
+            server_loop.call_soon_threadsafe(server_loop.stop)
+            thread.join()
+            server_loop.close()
+            # asyncio.run unsets event loop, that is used by run_async in other tests
+            asyncio.set_event_loop(asyncio.new_event_loop())
+        self.assertEqual(0, page_list.total_count)
+        self.assertEqual(2, server.requests)
+
+
+class FakeServerTestCases(unittest.TestCase):
+    def setUp(self):
+        self.server = FakeTelegraphServer()
+        run_async(self.server.start())
+        self.endpoints = EndpointConfig(self.server.url, self.server.upload_url)
+
+    def tearDown(self):
+        run_async(self.server.stop())
+
+    def test_page_lifecycle(self):
+        async def scenario():
+            async with Telegraph(endpoints=self.endpoints) as telegraph:
+                await telegraph.create_account("fake", author_name="Bot")
+                page = await telegraph.create_page("Fake page", content_html="<p>Hello <b>world</b></p>")
+                await telegraph.edit_page(page.path, "Edited page", content=[Node(tag="p", children=["Edited"])])
+                edited = await telegraph.get_page(page.path, return_content=True)
+                page_list = await telegraph.get_page_list()
+                views = await telegraph.get_views(page.path)
+                return edited, page_list, views
+
+        edited, page_list, views = run_async(scenario())
+        self.assertEqual("Edited page", edited.title)
+        self.assertEqual([Node(tag="p", children=["Edited"])], edited.content)
+        self.assertEqual([edited.path], [page.path for page in page_list.pages])
+        self.assertEqual(1, views)
+
+    def test_conversion_in_executor(self):
+        async def scenario():
+            with ThreadPoolExecutor(1) as executor:
+                async with Telegraph(endpoints=self.endpoints, conversion_executor=executor) as telegraph:
+                    await telegraph.create_account("fake")
+                    page = await telegraph.create_page("Page", content_html="<p>Hello <b>world</b></p>",
+                                                       return_content=True)
+                    return page
+
+        page = run_async(scenario())
+        self.assertEqual([Node(tag="p", children=["Hello ", Node(tag="b", children=["world"])])], page.content)
+
+    def test_markdown_content(self):
+        async def scenario():
+            async with Telegraph(endpoints=self.endpoints) as telegraph:
+                await telegraph.create_account("fake")
+                page = await telegraph.create_page("Page", content_markdown="# Title\n\nHello **world**")
+                return await telegraph.edit_page(page.path, "Page", content_markdown="Bye", return_content=True)
+
+        page = run_async(scenario())
+        self.assertEqual([Node(tag="p", children=["Bye"])], page.content)
+
+
+class RecordingSink(MetricsSink):
+    def __init__(self):
+        self.spans = []
+
+    def span_finished(self, span):
+        self.spans.append((span.name, span.tags.get("endpoint"), span.error))
+
+
+class SyncTelegraphTestCases(unittest.TestCase):
+    def test_blocking_calls(self):
+        server = FakeTelegraphServer()
+        with SyncTelegraph() as telegraph:
+            # Server is served by the same background loop
+            asyncio.run_coroutine_threadsafe(server.start(), telegraph._loop).result()
+            telegraph.client.endpoints = EndpointConfig(server.url, server.upload_url)
+            telegraph.create_account("sync")
+            page = telegraph.create_page("Page", content_html="<p>Text</p>")
+            futures = telegraph.submit_many("get_views", [page.path] * 5 + ["Missing-page"])
+            views = telegraph.gather(futures, return_exceptions=True)
+            paths = [item.path for item in telegraph.iter_pages()]
+            session = telegraph.session
+            telegraph.get_page(page.path)
+            self.assertIs(session, telegraph.session)
+            asyncio.run_coroutine_threadsafe(server.stop(), telegraph._loop).result()
+
+        self.assertEqual(5, sum(1 for item in views if isinstance(item, int)))
+        self.assertIsInstance(views[-1], TelegraphError)
+        self.assertEqual([page.path], paths)
+        self.assertTrue(session.closed)
+
+
+class InstrumentationTestCases(unittest.TestCase):
+    def test_metrics_and_hooks(self):
+        sink = RecordingSink()
+        instrumentation = Instrumentation(sinks=[sink])
+        started = []
+        instrumentation.before_request.append(lambda span: started.append(span.tags["endpoint"]))
+
+        async def scenario():
+            async with FakeTelegraphServer() as server:
+                async with Telegraph(endpoints=EndpointConfig(server.url, server.upload_url),
+                                     instrumentation=instrumentation) as telegraph:
+                    account = await telegraph.create_account("fake")
+                    page = await telegraph.create_page("Page", content_html="<p>Text</p>")
+                    with self.assertRaises(TelegraphError):
+                        await telegraph.get_page("Missing-page")
+                    await telegraph.get_page(page.path)
+                    return account.access_token
+
+        with self.assertLogs("Telegraph", level="DEBUG") as logs:
+            access_token = run_async(scenario())
+        snapshot = instrumentation.snapshot()
+        counters = snapshot["counters"]
+        self.assertEqual(2, counters["requests{endpoint=getPage}"])
+        self.assertEqual(1, counters["errors{code=PAGE_NOT_FOUND,endpoint=getPage}"])
+        self.assertGreater(counters["bytes_sent{endpoint=createPage}"], 0)
+        self.assertGreater(counters["bytes_received{endpoint=getPage}"], 0)
+        self.assertEqual(2, snapshot["histograms"]["request.duration{endpoint=getPage}"]["count"])
+        self.assertEqual(1, snapshot["histograms"]["html2nodes.duration"]["count"])
+        self.assertIn(("request", "getPage", "PAGE_NOT_FOUND"), sink.spans)
+        self.assertEqual(["createAccount", "createPage", "getPage", "getPage"], started)
+        self.assertFalse(any(access_token in line for line in logs.output))
+
+    def test_bytes_of_chunked_response(self):
+        server = LocalServer()
+        server.chunked = True
+        instrumentation = Instrumentation()
+
+        async def scenario():
+            await server.start()
+            try:
+                async with Telegraph(endpoints=EndpointConfig(server.url), instrumentation=instrumentation) as telegraph:
+                    return await telegraph.make_request("getPage/Page")
+            finally:
+                await server.stop()
+
+        self.assertEqual({"path": "/getPage/Page"}, run_async(scenario()))
+        self.assertEqual(len(json.dumps({"ok": True, "result": {"path": "/getPage/Page"}}).encode()),
+                         instrumentation.snapshot()["counters"]["bytes_received{endpoint=getPage}"])
+
+
+class ContentSizeTestCases(unittest.TestCase):
+    def setUp(self):
+        self.server = FakeTelegraphServer()
+        run_async(self.server.start())
+        self.endpoints = EndpointConfig(self.server.url, self.server.upload_url)
+        self.paragraphs = [Node(tag="p", children=[f"Paragraph {index} " + "text " * 200]) for index in range(100)]
+
+    def tearDown(self):
+        run_async(self.server.stop())
+
+    def test_big_content_is_rejected_before_sending(self):
+        async def scenario():
+            async with Telegraph(endpoints=self.endpoints) as telegraph:
+                await telegraph.create_account("fake")
+                requests = self.server.requests
+                with self.assertRaises(ContentTooBig) as context:
+                    await telegraph.create_page("Page", content=self.paragraphs)
+                return context.exception, self.server.requests - requests
+
+        error, requests = run_async(scenario())
+        self.assertEqual(0, requests)
+        self.assertGreater(error.size, error.limit)
+
+    def test_linked_pages(self):
+        async def scenario():
+            async with Telegraph(endpoints=self.endpoints) as telegraph:
+                await telegraph.create_account("fake")
+                return await telegraph.create_linked_pages("Long", content=self.paragraphs)
+
+        pages = run_async(scenario())
+        self.assertGreater(len(pages), 1)
+        self.assertEqual([f"Long ({index}/{len(pages)})" for index in range(1, len(pages) + 1)],
+                         [page.title for page in pages])
+        contents = [self.server.pages[page.path]["content"] for page in pages]
+        self.assertEqual(100, sum(len(content) - 1 for content in contents))
+        self.assertEqual(pages[1].url, contents[0][-1]["children"][0]["attrs"]["href"])
+        self.assertEqual(pages[0].url, contents[1][-1]["children"][0]["attrs"]["href"])
+        self.assertEqual("Paragraph 0 ", contents[0][0]["children"][0][:12])
+
+
+class UpdatePageTestCases(unittest.TestCase):
+    def setUp(self):
+        self.server = FakeTelegraphServer()
+        run_async(self.server.start())
+        self.endpoints = EndpointConfig(self.server.url, self.server.upload_url)
+
+    def tearDown(self):
+        run_async(self.server.stop())
+
+    def test_unchanged_page_is_skipped(self):
+        async def scenario():
+            async with Telegraph(endpoints=self.endpoints, content_tracker=ContentTracker()) as telegraph:
+                await telegraph.create_account("fake")
+                page = await telegraph.create_page("Page", content_html="<p>Hello <b>world</b></p>")
+                requests = self.server.requests
+                skipped = await telegraph.update_page(page.path, "Page",
+                                                      content=[Node(tag="p", children=["Hello ", Node(
+                                                          tag="b", children=["world"])])])
+                skipped_requests = self.server.requests - requests
+                edited = await telegraph.update_page(page.path, "Page", content_html="<p>Hello <b>all</b></p>")
+                return skipped, skipped_requests, edited
+
+        skipped, skipped_requests, edited = run_async(scenario())
+        self.assertIsNone(skipped)
+        self.assertEqual(0, skipped_requests)
+        self.assertEqual("Page", edited.title)
+
+    def test_unknown_page_is_fetched(self):
+        async def scenario():
+            async with Telegraph(endpoints=self.endpoints) as telegraph:
+                await telegraph.create_account("fake")
+                page = await telegraph.create_page("Page", content_html="<p>Text</p>")
+                # Pages are not tracked without content_tracker, so update_page fetches page first
+                self.assertIsNone(telegraph.content_tracker)
+                requests = self.server.requests
+                skipped = await telegraph.update_page(page.path, "Page", content_html="<p>Text</p>")
+                skipped_requests = self.server.requests - requests
+                renamed = await telegraph.update_page(page.path, "Renamed", content_html="<p>Text</p>")
+                skipped_again = await telegraph.update_page(page.path, "Renamed", content_html="<p>Text</p>")
+                return skipped, skipped_requests, renamed, skipped_again
+
+        skipped, skipped_requests, renamed, skipped_again = run_async(scenario())
+        self.assertIsNone(skipped)
+        self.assertEqual(1, skipped_requests)
+        self.assertEqual("Renamed", renamed.title)
+        self.assertIsNone(skipped_again)
+
+    def test_diff_content(self):
+        old = [{"tag": "p", "children": ["Hello ", {"tag": "b", "children": ["world"]}]}, "tail"]
+        new = [{"tag": "p", "children": ["Hello ", {"tag": "b", "children": ["all"]}]}]
+        self.assertEqual([ContentChange((0, 1, 0), "world", "all"), ContentChange((1,), "tail", None)],
+                         diff_content(old, new))
+        self.assertEqual([], diff_content(old, old))
+
+
+class TokenPoolTestCases(unittest.TestCase):
+    def setUp(self):
+        self.server = FakeTelegraphServer()
+        run_async(self.server.start())
+        self.endpoints = EndpointConfig(self.server.url, self.server.upload_url)
+
+    def tearDown(self):
+        run_async(self.server.stop())
+
+    async def create_tokens(self, count: int):
+        async with Telegraph(endpoints=self.endpoints) as telegraph:
+            return [(await telegraph.create_account(f"account{index}")).access_token for index in range(count)]
+
+    def test_pages_are_spread_and_edited_by_owner(self):
+        owners_file = os.path.join(tempfile.mkdtemp(), "owners.json")
+
+        async def scenario():
+            tokens = await self.create_tokens(2)
+            async with TelegraphPool(tokens, endpoints=self.endpoints) as pool:
+                pages = await asyncio.gather(*[pool.create_page(f"Page {index}", content_html="<p>Text</p>")
+                                               for index in range(4)])
+                pool.save_page_owners(owners_file)
+            async with TelegraphPool(tokens[::-1], endpoints=self.endpoints) as pool:
+                pool.load_page_owners(owners_file)
+                edited = await asyncio.gather(*[pool.edit_page(page.path, "Edited", content_html="<p>New</p>")
+                                                for page in pages])
+            return pages, edited
+
+        pages, edited = run_async(scenario())
+        owners = [self.server.pages[page.path]["owner"] for page in pages]
+        self.assertEqual(2, len(set(owners)))
+        self.assertEqual(["Edited"] * 4, [page.title for page in edited])
+
+    def test_throttled_account_is_skipped(self):
+        async def scenario():
+            tokens = await self.create_tokens(2)
+            async with TelegraphPool(tokens, endpoints=self.endpoints) as pool:
+                pool.accounts[0].cooldown(60)
+                page = await pool.create_page("Page", content_html="<p>Text</p>")
+                return tokens, pool.page_owners[page.path], self.server.pages[page.path]["owner"]
+
+        tokens, remembered_owner, owner = run_async(scenario())
+        self.assertEqual(tokens[1], owner)
+        self.assertEqual(owner, remembered_owner)
+
+    def test_account_methods_use_one_account(self):
+        async def scenario():
+            tokens = await self.create_tokens(2)
+            paths = []
+            for token in tokens:
+                async with Telegraph(access_token=token, endpoints=self.endpoints) as telegraph:
+                    paths.append([(await telegraph.create_page(f"Page {index}", content_html="<p>Text</p>")).path
+                                  for index in range(5)][::-1])
+            async with TelegraphPool(tokens, endpoints=self.endpoints) as pool:
+                listed = [page.path async for page in pool.iter_pages(limit=2, concurrency=2)]
+                second = [page.path async for page in pool.iter_pages(limit=2, access_token=tokens[1])]
+                infos = await asyncio.gather(*[pool.get_account_info() for _ in range(4)])
+                await pool.edit_account_info(short_name="Renamed", access_token=tokens[1])
+                renamed = await pool.get_account_info(access_token=tokens[1])
+                first = await pool.get_account_info()
+            return paths, listed, second, infos, renamed, first
+
+        paths, listed, second, infos, renamed, first = run_async(scenario())
+        self.assertEqual(paths[0] + paths[1], listed)
+        self.assertEqual(paths[1], second)
+        self.assertEqual(["account0"] * 4, [info["short_name"] for info in infos])
+        self.assertEqual(("Renamed", "account0"), (renamed["short_name"], first["short_name"]))
+
+    def test_revoke_access_token(self):
+        async def scenario():
+            tokens = await self.create_tokens(2)
+            async with TelegraphPool(tokens, endpoints=self.endpoints) as pool:
+                pool.accounts[0].cooldown(60)
+                page = await pool.create_page("Page", content_html="<p>Text</p>")
+                account = await pool.revoke_access_token(tokens[1])
+                edited = await pool.edit_page(page.path, "Edited", content_html="<p>New</p>")
+                return tokens, account["access_token"], pool, page.path, edited
+
+        tokens, new_token, pool, path, edited = run_async(scenario())
+        self.assertNotEqual(tokens[1], new_token)
+        self.assertEqual([tokens[0], new_token], [account.access_token for account in pool.accounts])
+        self.assertEqual({path: new_token}, pool.page_owners)
+        self.assertEqual(tokens[0], pool.access_token)
+        self.assertEqual("Edited", edited.title)
+
+    def test_request_body_is_not_modified(self):
+        async def scenario():
+            tokens = await self.create_tokens(1)
+            body = {"title": "Page", "content": ["Text"]}
+            async with TelegraphPool(tokens, endpoints=self.endpoints) as pool:
+                await pool.make_request("createPage", json=body, method="post")
+            return body
+
+        self.assertEqual({"title": "Page", "content": ["Text"]}, run_async(scenario()))
+
+
+class ResponseModeTestCases(unittest.TestCase):
+    def test_lazy_and_raw_responses(self):
+        async def scenario():
+            async with FakeTelegraphServer() as server:
+                endpoints = EndpointConfig(server.url, server.upload_url)
+                async with Telegraph(endpoints=endpoints) as telegraph:
+                    await telegraph.create_account("fake")
+                    created = await telegraph.create_page("Page", content_html="<p>Hello <b>world</b></p>")
+                    validated = await telegraph.get_page(created.path, return_content=True)
+                async with Telegraph(access_token=telegraph.access_token, endpoints=endpoints,
+                                     response_mode="lazy") as telegraph:
+                    lazy = await telegraph.get_page(created.path, return_content=True)
+                    raw = await telegraph.get_page(created.path, return_content=True, response_mode="raw")
+                    page_list = await telegraph.get_page_list()
+                return validated, lazy, raw, page_list
+
+        validated, lazy, raw, page_list = run_async(scenario())
+        self.assertIsInstance(lazy.content, LazyContent)
+        self.assertFalse(lazy.content.materialized)
+        self.assertEqual(validated.content, list(lazy.content))
+        self.assertEqual(validated.title, lazy.title)
+        self.assertIsInstance(raw, dict)
+        self.assertEqual(raw["content"], lazy.content.raw)
+        self.assertEqual([validated.path], [page.path for page in page_list.pages])
+        self.assertIsNone(page_list.pages[0].content)
+        self.assertEqual(raw["content"], lazy.dict()["content"])
+        self.assertEqual(raw["content"], json.loads(lazy.json())["content"])
+        self.assertEqual(validated.dict(exclude={"content", "views"}), lazy.dict(exclude={"content", "views"}))
+        self.assertIsNone(page_list.dict()["pages"][0]["content"])
+
+
+class ArchiveTestCases(unittest.TestCase):
+    def test_incremental_sync(self):
+        database = os.path.join(tempfile.mkdtemp(), "archive.sqlite")
+
+        async def scenario():
+            async with FakeTelegraphServer() as server:
+                async with Telegraph(endpoints=EndpointConfig(server.url, server.upload_url),
+                                     response_mode="lazy") as telegraph:
+                    await telegraph.create_account("fake", author_name="Bot")
+                    pages = [await telegraph.create_page(f"Page {index}", content_html=f"<p>Text {index}</p>")
+                             for index in range(3)]
+                    archive = PageArchive(database)
+                    first = await archive.sync(telegraph, concurrency=2, page_list_limit=2)
+                    await telegraph.edit_page(pages[0].path, "Renamed", content_html="<p>New</p>")
+                    await telegraph.create_page("Another", content_html="<p>Another</p>", author_name="Human")
+                    requests = server.requests
+                    second = await archive.sync(telegraph, page_list_limit=2)
+                    archive.close()
+                    return pages, first, second, server.requests - requests
+
+        pages, first, second, requests = run_async(scenario())
+        self.assertEqual(sorted(page.path for page in pages), sorted(first.new))
+        self.assertEqual(([pages[0].path], 2), (second.changed, second.unchanged))
+        self.assertEqual(1, len(second.new))
+        # Two windows of page list and content of two pages
+        self.assertEqual(4, requests)
+
+        archive = PageArchive(database)
+        self.assertEqual(4, len(archive))
+        renamed = archive.get(pages[0].path)
+        self.assertEqual("Renamed", renamed.title)
+        self.assertEqual([Node(tag="p", children=["New"])], list(renamed.content))
+        self.assertEqual(["Page 1", "Page 2"], [page.title for page in archive.find(title="page ")])
+        self.assertEqual(["Another"], [page.title for page in archive.find(author_name="Human")])
+        archive.close()
+
+
+class ViewsAnalyticsTestCases(unittest.TestCase):
+    def setUp(self):
+        self.telegraph = Telegraph()
+        self.calls = []
+
+        async def get_views(path: str, year: int = None, month: int = None, day: int = None, hour: int = None):
+            self.calls.append((path, year, month, day, hour))
+            if path == "Broken":
+                raise TelegraphError("PAGE_NOT_FOUND")
+            return (day or 0) + (hour or 0)
+
+        self.telegraph.get_views = get_views
+
+    def test_past_periods_are_cached(self):
+        analytics = ViewsAnalytics(self.telegraph, concurrency=3)
+        start, end = datetime(2021, 7, 30), datetime(2021, 8, 1, 12)
+        series = run_async(analytics.get_views(["A", "B", "Broken"], start, end))
+        self.assertEqual([datetime(2021, 7, 30), datetime(2021, 7, 31), datetime(2021, 8, 1)], series.periods)
+        self.assertEqual([30, 31, 1], series.views["A"])
+        self.assertEqual(62, series.total("B"))
+        self.assertEqual([None] * 3, series.views["Broken"])
+        self.assertEqual(9, len(self.calls))
+
+        self.calls.clear()
+        cached = run_async(analytics.get_views(["A", "B"], start, end))
+        self.assertEqual([], self.calls)
+        self.assertEqual(series.views["A"], cached.views["A"])
+
+    def test_current_period_is_refetched(self):
+        analytics = ViewsAnalytics(self.telegraph, settle_time=timedelta(0))
+        now = datetime.utcnow()
+        start, end = now - timedelta(hours=2), now + timedelta(hours=3)
+        for _ in range(2):
+            series = run_async(analytics.get_views(["A"], start, end, granularity="hour"))
+        self.assertEqual(6, len(series.periods))
+        self.assertEqual([0, 0, 0], series.views["A"][3:])
+        # Finished hours are requested once, current hour - every time
+        self.assertEqual(4, len(self.calls))
+
+    def test_period_range(self):
+        self.assertEqual([datetime(2020, 11, 1), datetime(2020, 12, 1), datetime(2021, 1, 1)],
+                         period_range(datetime(2020, 11, 15), datetime(2021, 1, 1), "month"))
+
+
+class MirrorTestCases(unittest.TestCase):
+    def setUp(self):
+        self.server = LocalServer()
+        run_async(self.server.start())
+
+    def tearDown(self):
+        run_async(self.server.stop())
+
+    def test_failover_to_healthy_mirror(self):
+        endpoints = EndpointConfig("http://127.0.0.1:9", mirrors=[self.server.url])
+
+        async def scenario():
+            async with Telegraph(endpoints=endpoints) as telegraph:
+                first = await telegraph.make_request("getPage/Mirrored-Page")
+                second = await telegraph.make_request("getViews/Mirrored-Page")
+                return first, second
+
+        self.assertEqual(({"path": "/getPage/Mirrored-Page"}, {"path": "/getViews/Mirrored-Page"}),
+                         run_async(scenario()))
+        self.assertEqual(2, self.server.requests)
+        primary, mirror = endpoints.mirrors
+        self.assertFalse(primary.healthy)
+        self.assertEqual(1, primary.failures)
+        self.assertIsNotNone(mirror.latency)
+
+    def test_post_is_not_resent_after_timeout(self):
+        async def scenario():
+            mirror = LocalServer()
+            await mirror.start()
+            self.server.delay = 0.5
+            endpoints = EndpointConfig(self.server.url, mirrors=[mirror.url])
+            try:
+                async with Telegraph(endpoints=endpoints) as telegraph:
+                    with self.assertRaises(asyncio.TimeoutError):
+                        await telegraph.make_request("createPage", method="post", json={"title": "Page"},
+                                                     timeout=aiohttp.ClientTimeout(total=0.1))
+                    self.assertEqual({"path": "/getPage/Page"}, await telegraph.make_request("getPage/Page"))
+            finally:
+                await mirror.stop()
+            return mirror.requests
+
+        # Only getPage reaches mirror
+        self.assertEqual(1, run_async(scenario()))
+        self.assertEqual(1, self.server.requests)
+
+    def test_token_is_not_logged(self):
+        async def scenario():
+            broken = LocalServer()
+            await broken.start()
+            broken.status = 502
+            policy = RetryPolicy(base_delay=0.01, retry_on=(aiohttp.ClientResponseError,))
+            try:
+                async with Telegraph(access_token="secret-token", retry_policy=policy,
+                                     endpoints=EndpointConfig(broken.url, mirrors=[self.server.url])) as telegraph:
+                    await telegraph.make_request("getPageList")
+                async with Telegraph(access_token="secret-token", retry_policy=policy,
+                                     endpoints=EndpointConfig(broken.url)) as telegraph:
+                    with self.assertRaises(aiohttp.ClientResponseError):
+                        await telegraph.make_request("getPageList")
+            finally:
+                await broken.stop()
+
+        with self.assertLogs("Telegraph", level="DEBUG") as logs:
+            run_async(scenario())
+        self.assertTrue(any("Falling over" in line for line in logs.output))
+        self.assertTrue(any("Retrying" in line for line in logs.output))
+        self.assertFalse([line for line in logs.output if "secret-token" in line])
+
+    def test_fastest_mirror_is_selected(self):
+        endpoints = EndpointConfig("http://first", mirrors=["http://second", "http://third"])
+        first, second, third = endpoints.mirrors
+        endpoints.report_success(first, 0.3)
+        endpoints.report_success(second, 0.1)
+        endpoints.report_success(third, 0.2)
+        self.assertIs(second, endpoints.select())
+        endpoints.report_failure(second)
+        self.assertIs(third, endpoints.select())
+        self.assertIs(first, endpoints.select(exclude=[third]))
+
+
+class RetryTestCases(unittest.TestCase):
+    def setUp(self):
+        self.server = LocalServer()
+        run_async(self.server.start())
+
+    def tearDown(self):
+        run_async(self.server.stop())
+
+    def test_flood_wait_is_typed(self):
+        self.server.responses.append({"ok": False, "error": "FLOOD_WAIT_7"})
+
+        async def scenario():
+            async with Telegraph() as telegraph:
+                await telegraph.make_request(f"{self.server.url}/createPage")
+
+        with self.assertRaises(FloodWaitError) as context:
+            run_async(scenario())
+        self.assertEqual(7, context.exception.retry_after)
+
+    def test_flood_wait_is_retried(self):
+        self.server.responses.append({"ok": False, "error": "FLOOD_WAIT_0"})
+        self.server.responses.append({"ok": False, "error": "FLOOD_WAIT_0"})
+
+        async def scenario():
+            policy = RetryPolicy(max_attempts=3, base_delay=0.01)
+            async with Telegraph(retry_policy=policy, rate_limiter=RateLimiter(rate=100)) as telegraph:
+                return await telegraph.make_request(f"{self.server.url}/createPage")
+
+        self.assertEqual({"path": "/createPage"}, run_async(scenario()))
+        self.assertEqual(3, self.server.requests)
+
+    def test_other_errors_are_not_retried(self):
+        self.server.responses.append({"ok": False, "error": "PAGE_NOT_FOUND"})
+
+        async def scenario():
+            async with Telegraph(retry_policy=RetryPolicy(base_delay=0.01)) as telegraph:
+                await telegraph.make_request(f"{self.server.url}/getPage/missing")
+
+        with self.assertRaises(TelegraphError):
+            run_async(scenario())
+        self.assertEqual(1, self.server.requests)
+
+    def test_non_idempotent_methods_are_not_retried_on_timeout(self):
+        policy = RetryPolicy()
+        self.assertTrue(policy.should_retry(asyncio.TimeoutError(), 1, "getPage"))
+        self.assertTrue(policy.should_retry(asyncio.TimeoutError(), 1, "editPage"))
+        self.assertFalse(policy.should_retry(asyncio.TimeoutError(), 1, "createPage"))
+        self.assertFalse(policy.should_retry(aiohttp.ServerDisconnectedError(), 1, "createAccount"))
+        self.assertTrue(policy.should_retry(FloodWaitError("FLOOD_WAIT_1", 1), 1, "createPage"))
+
+    def test_rate_limiter(self):
+        limiter = RateLimiter(rate=20, capacity=1)
+
+        async def scenario():
+            started = asyncio.get_event_loop().time()
+            for _ in range(5):
+                await limiter.acquire("token", "createPage")
+            await limiter.acquire("token", "getPage")
+            return asyncio.get_event_loop().time() - started
+
+        self.assertGreaterEqual(run_async(scenario()), 0.19)
+
+
+class CacheTestCases(unittest.TestCase):
+    def setUp(self):
+        self.server = LocalServer()
+        run_async(self.server.start())
+
+    def tearDown(self):
+        run_async(self.server.stop())
+
+    def test_cached_and_coalesced(self):
+        self.server.delay = 0.05
+
+        async def scenario():
+            async with Telegraph(access_token="token", cache=ResponseCache()) as telegraph:
+                url = f"{self.server.url}/getPage/Hot-Page"
+                results = await asyncio.gather(*[telegraph.make_request(url, {"return_content": "true"})
+                                                 for _ in range(10)])
+                results.append(await telegraph.make_request(url, {"return_content": "true"}))
+                await telegraph.make_request(url, {"return_content": "false"})
+                return results
+
+        results = run_async(scenario())
+        self.assertEqual([{"path": "/getPage/Hot-Page"}] * 11, results)
+        self.assertEqual(2, self.server.requests)
+
+    def test_cancelled_fetch_is_taken_over(self):
+        cache = ResponseCache()
+        calls = []
+
+        async def fetch():
+            calls.append(len(calls))
+            await asyncio.sleep(0.05)
+            return len(calls)
+
+        async def scenario():
+            first = asyncio.ensure_future(cache.get_or_fetch("key", 60, fetch))
+            waiters = [asyncio.ensure_future(cache.get_or_fetch("key", 60, fetch)) for _ in range(3)]
+            await asyncio.sleep(0.01)
+            first.cancel()
+            return await asyncio.gather(first, *waiters, return_exceptions=True)
+
+        results = run_async(scenario())
+        self.assertIsInstance(results[0], asyncio.CancelledError)
+        self.assertEqual([2, 2, 2], results[1:])
+        self.assertEqual(2, len(calls))
+
+    def test_invalidated_by_edit_page(self):
+        async def scenario():
+            async with Telegraph(cache=ResponseCache()) as telegraph:
+                await telegraph.make_request(f"{self.server.url}/getPage/Edited-Page")
+                await telegraph.make_request(f"{self.server.url}/getPage/Other-Page")
+                await telegraph.make_request(f"{self.server.url}/editPage/Edited-Page", method="post", json={})
+                await telegraph.make_request(f"{self.server.url}/getPage/Edited-Page")
+                await telegraph.make_request(f"{self.server.url}/getPage/Other-Page")
+
+        run_async(scenario())
+        self.assertEqual(4, self.server.requests)
+
+    def test_lru_eviction(self):
+        cache = ResponseCache(max_size=2)
+        cache.set("a", 1, 60)
+        cache.set("b", 2, 60)
+        cache.get("a")
+        cache.set("c", 3, 60)
+        self.assertEqual(1, cache.get("a"))
+        self.assertRaises(KeyError, cache.get, "b")
+        cache.set("d", 4, -1)
+        self.assertRaises(KeyError, cache.get, "d")
+
+
+class JSONBackendTestCases(unittest.TestCase):
+    def setUp(self):
+        self.server = LocalServer()
+        run_async(self.server.start())
+
+    def tearDown(self):
+        run_async(self.server.stop())
+
+    def test_content_is_encoded_once(self):
+        self.server.responses.append({"ok": True, "result": {"path": "Page", "url": "https://telegra.ph/Page",
+                                                             "title": "Page", "description": "", "views": 0}})
+
+        encoded = []
+
+        def dumps(obj):
+            encoded.append(obj)
+            return json.dumps(obj, ensure_ascii=False, separators=(",", ":"))
+
+        async def scenario():
+            async with Telegraph(access_token="token", json_backend=JSONBackend("counting", dumps, json.loads),
+                                 endpoints=EndpointConfig(self.server.url)) as telegraph:
+                return await telegraph.create_page("Page", content_html="<p>Hello «world»</p>")
+
+        page = run_async(scenario())
+        self.assertEqual("Page", page.path)
+        self.assertEqual(1, sum(1 for obj in encoded if isinstance(obj, list)))
+        self.assertEqual({"title": "Page", "return_content": "false", "access_token": "token",
+                          "content": [{"tag": "p", "children": ["Hello «world»"]}]},
+                         json.loads(self.server.bodies[0]))
+
+    def test_custom_pipeline(self):
+        self.server.responses.append({"ok": True, "result": {"path": "Page", "url": "https://telegra.ph/Page",
+                                                             "title": "Page", "description": "", "views": 0}})
+
+        async def scenario():
+            async with Telegraph(access_token="token", pipeline=Pipeline([]),
+                                 endpoints=EndpointConfig(self.server.url)) as telegraph:
+                await telegraph.create_page("Page", content_html='<div id="a">x</div>')
+
+        run_async(scenario())
+        self.assertEqual([{"tag": "div", "attrs": {"id": "a"}, "children": ["x"]}],
+                         json.loads(self.server.bodies[0])["content"])
+
+    def test_backends(self):
+        for name in BACKENDS_PRIORITY:
+            try:
+                backend = get_json_backend(name)
+            except ImportError:
+                continue
+            self.assertEqual({"a": ["«b»", 1]}, backend.loads(backend.dumps({"a": ["«b»", 1]})))
+        self.assertIn(get_json_backend().name, BACKENDS_PRIORITY)
+
+    def test_encode_body(self):
+        backend = get_json_backend("json")
+        self.assertEqual({"a": 1, "content": [{"tag": "p"}]},
+                         json.loads(backend.encode_body({"a": 1, "content": RawJSON('[{"tag":"p"}]')})))
+        self.assertEqual({"content": []}, json.loads(backend.encode_body({"content": RawJSON("[]")})))
+
+
+class UploadTestCases(unittest.TestCase):
+    def setUp(self):
+        self.server = LocalServer()
+        run_async(self.server.start())
+        self.endpoints = EndpointConfig(upload_uri=f"{self.server.url}/upload")
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.directory.cleanup()
+        run_async(self.server.stop())
+
+    def make_file(self, name: str, size: int) -> str:
+        path = os.path.join(self.directory.name, name)
+        with open(path, "wb") as file:
+            file.write(b"\x89PNG" + b"0" * (size - 4))
+        return path
+
+    def test_upload_files_in_one_request(self):
+        self.server.responses.append([{"src": "/file/first.png"}, {"src": "/file/second.jpg"}])
+        image = self.make_file("image.png", 200 * 1024)
+
+        async def scenario():
+            async with Telegraph(endpoints=self.endpoints) as telegraph:
+                stream = BytesIO(b"text")
+                stream.name = "notes.txt"
+                return await telegraph.upload_files([image, stream])
+
+        with self.assertRaises(InvalidFileExtension):
+            run_async(scenario())
+        self.assertEqual(0, self.server.requests)
+
+        async def scenario():
+            async with Telegraph(endpoints=self.endpoints) as telegraph:
+                stream = BytesIO(b"\xff\xd8jpeg")
+                stream.name = "photo.jpg"
+                return await telegraph.upload_files([image, stream])
+
+        uploaded = run_async(scenario())
+        self.assertEqual(["/file/first.png", "/file/second.jpg"], [file.src for file in uploaded])
+        self.assertEqual(1, self.server.requests)
+        self.assertIn(b'filename="photo.jpg"', self.server.bodies[0])
+        self.assertGreater(len(self.server.bodies[0]), 200 * 1024)
+
+    def test_too_big_file(self):
+        big_file = self.make_file("big.png", 6 * 1024 * 1024)
+
+        async def scenario():
+            async with Telegraph(endpoints=self.endpoints) as telegraph:
+                await telegraph.upload_file(big_file)
+
+        self.assertRaises(FileIsTooBig, run_async, scenario())
+        self.assertEqual(0, self.server.requests)
+
+    def test_upload_error(self):
+        self.server.responses.append({"error": "File type invalid"})
+
+        async def scenario():
+            async with Telegraph(endpoints=self.endpoints) as telegraph:
+                await telegraph.upload_file(self.make_file("image.gif", 10))
+
+        self.assertRaises(TelegraphError, run_async, scenario())
+
+    def test_upload_cache(self):
+        first = self.make_file("first.png", 100 * 1024)
+        copy = self.make_file("copy.png", 100 * 1024)
+        other = self.make_file("other.png", 50 * 1024)
+        database = os.path.join(self.directory.name, "uploads")
+
+        async def scenario(cache: UploadCache):
+            async with FakeTelegraphServer(latency=0.05) as server:
+                endpoints = EndpointConfig(server.url, server.upload_url)
+                async with Telegraph(endpoints=endpoints, upload_cache=cache) as telegraph:
+                    uploaded = await asyncio.gather(telegraph.upload_file(first), telegraph.upload_file(copy),
+                                                    telegraph.upload_files([first, other]))
+                    return uploaded, server.requests
+
+        cache = UploadCache(path=database)
+        (file, copied, files), requests = run_async(scenario(cache))
+        cache.close()
+        self.assertEqual(2, requests)
+        self.assertEqual(file.src, copied.src)
+        self.assertEqual(file.src, files[0].src)
+        self.assertNotEqual(file.src, files[1].src)
+
+        cache = UploadCache(max_size=1, path=database)
+        (file_again, _, files_again), requests = run_async(scenario(cache))
+        cache.close()
+        self.assertEqual(0, requests)
+        self.assertEqual(file.src, file_again.src)
+        self.assertEqual(files[1].src, files_again[1].src)
+
+
+class UploadCacheTestCases(unittest.TestCase):
+    def test_cancelled_upload_is_taken_over(self):
+        cache = UploadCache()
+        uploads = []
+
+        async def upload(indexes):
+            uploads.append(indexes)
+            await asyncio.sleep(0.05)
+            return [f"/file/{len(uploads)}.png" for _ in indexes]
+
+        async def scenario():
+            first = asyncio.ensure_future(cache.get_or_upload(["a"], upload))
+            await asyncio.sleep(0.01)
+            waiter = asyncio.ensure_future(cache.get_or_upload(["a", "b"], upload))
+            await asyncio.sleep(0.01)
+            first.cancel()
+            return await asyncio.gather(first, waiter, return_exceptions=True)
+
+        cancelled, srcs = run_async(scenario())
+        self.assertIsInstance(cancelled, asyncio.CancelledError)
+        self.assertEqual(["/file/3.png", "/file/2.png"], srcs)
+        self.assertEqual([[0], [1], [0]], uploads)
+
+    def test_missing_srcs_fail_waiters(self):
+        cache = UploadCache()
+
+        async def upload(indexes):
+            await asyncio.sleep(0.01)
+            return ["/file/1.png"]
+
+        async def scenario():
+            return await asyncio.wait_for(asyncio.gather(cache.get_or_upload(["a", "b"], upload),
+                                                         cache.get_or_upload(["b"], upload),
+                                                         return_exceptions=True), 1)
+
+        first, second = run_async(scenario())
+        self.assertIsInstance(first, TelegraphError)
+        self.assertIsInstance(second, TelegraphError)
+        self.assertIsNone(cache.get("a"))
+
+
+class RehostTestCases(unittest.TestCase):
+    def setUp(self):
+        self.downloads = []
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    async def serve_media(self, request: web.Request) -> web.Response:
+        self.downloads.append(request.path)
+        await asyncio.sleep(0.02)
+        if request.path == "/moved":
+            raise web.HTTPFound("/secret")
+        if request.path == "/big.jpg":
+            return web.Response(body=b"\xff" * 4096, content_type="image/jpeg")
+        return web.Response(body=b"\x89PNG" + b"0" * 100, content_type="image/png")
+
+    def test_rehost_external_media(self):
+        async def scenario(rehoster: MediaRehoster, html: str):
+            app = web.Application()
+            app.router.add_get("/{name}", self.serve_media)
+            runner = web.AppRunner(app)
+            await runner.setup()
+            site = web.TCPSite(runner, "127.0.0.1", 0)
+            await site.start()
+            media_url = f"http://127.0.0.1:{runner.addresses[0][1]}"
+            try:
+                async with FakeTelegraphServer() as server:
+                    endpoints = EndpointConfig(server.url, server.upload_url)
+                    async with Telegraph(endpoints=endpoints, media_rehoster=rehoster) as telegraph:
+                        await telegraph.create_account("Rehost")
+                        pages = await asyncio.gather(*[
+                            telegraph.create_page("Page", content_html=html.format(media_url))
+                            for _ in range(2)
+                        ])
+                    return [server.pages[page.path]["content"] for page in pages], server.requests, media_url
+            finally:
+                await runner.cleanup()
+
+        html = '<p><img src="{0}/photo"/><img src="/file/local.png"/></p>' \
+               '<figure><img src="{0}/photo"/><img src="{0}/big.jpg"/></figure>'
+        rehoster = MediaRehoster(max_file_size=1024, allow_private_hosts=True)
+        contents, requests, media_url = run_async(scenario(rehoster, html))
+        self.assertEqual(contents[0], contents[1])
+        images = [contents[0][0]["children"][0], contents[0][0]["children"][1],
+                  contents[0][1]["children"][0], contents[0][1]["children"][1]]
+        self.assertTrue(images[0]["attrs"]["src"].startswith("/file/"))
+        self.assertTrue(images[0]["attrs"]["src"].endswith(".png"))
+        self.assertEqual(images[0], images[2])
+        self.assertEqual("/file/local.png", images[1]["attrs"]["src"])
+        self.assertEqual(f"{media_url}/big.jpg", images[3]["attrs"]["src"])
+        # Second page waits for downloads of the first one
+        self.assertEqual(["/photo", "/big.jpg"], self.downloads)
+        # createAccount, two createPage and one upload
+        self.assertEqual(4, requests)
+        self.assertIsInstance(rehoster.errors[f"{media_url}/big.jpg"], FileIsTooBig)
+
+        cache_file = os.path.join(self.directory.name, "media.json")
+        rehoster.save_cache(cache_file)
+        restored = MediaRehoster()
+        restored.load_cache(cache_file)
+        self.downloads.clear()
+        html = '<img src="{0}/photo"/>'.replace("{0}", media_url)
+        self.assertEqual([{"tag": "img", "attrs": {"src": images[0]["attrs"]["src"]}}],
+                         html2content(html, restored.install()))
+        self.assertEqual([], self.downloads)
+
+
+    def test_private_hosts_are_not_downloaded(self):
+        rehoster = MediaRehoster()
+        for url in ("http://127.0.0.1/a.png", "http://169.254.169.254/latest", "http://10.0.0.1/a.png",
+                    "http://[::1]/a.png", "http://[::ffff:192.168.0.1]/a.png", "http://localhost/a.png",
+                    "file:///etc/passwd"):
+            with self.assertRaises(ForbiddenMediaHost):
+                run_async(rehoster._check_host(url))
+        run_async(rehoster._check_host("https://93.184.216.34/a.png"))
+
+        checked = []
+
+        async def check_host(url: str):
+            checked.append(urlsplit(url).path)
+            if url.endswith("/secret"):
+                raise ForbiddenMediaHost(url)
+
+        async def scenario():
+            app = web.Application()
+            app.router.add_get("/{name}", self.serve_media)
+            runner = web.AppRunner(app)
+            await runner.setup()
+            site = web.TCPSite(runner, "127.0.0.1", 0)
+            await site.start()
+            try:
+                async with aiohttp.ClientSession() as session:
+                    await rehoster._download(session, f"http://127.0.0.1:{runner.addresses[0][1]}/moved")
+            finally:
+                await runner.cleanup()
+
+        rehoster._check_host = check_host
+        with self.assertRaises(ForbiddenMediaHost):
+            run_async(scenario())
+        self.assertEqual(["/moved", "/secret"], checked)
+        self.assertEqual(["/moved"], self.downloads)
+
+
+class BulkTestCases(unittest.TestCase):
+    def test_bounded_concurrency_and_failures(self):
+        state = {"running": 0, "max_running": 0}
+
+        async def work(spec: int):
+            state["running"] += 1
+            state["max_running"] = max(state["max_running"], state["running"])
+            await asyncio.sleep(0.01 * (spec % 3))
+            state["running"] -= 1
+            if spec == 5:
+                raise ValueError(spec)
+            return spec * 2
+
+        async def scenario():
+            return [result async for result in run_bulk(work, range(20), concurrency=4, ordered=True)]
+
+        results = run_async(scenario())
+        self.assertEqual(4, state["max_running"])
+        self.assertEqual(list(range(20)), [result.index for result in results])
+        self.assertIsInstance(results[5].error, ValueError)
+        self.assertEqual([spec * 2 for spec in range(20) if spec != 5], [result.result for result in results if result.ok])
+
+    def test_slow_first_spec_holds_back_ordered_results(self):
+        started = []
+
+        async def work(spec: int):
+            started.append(spec)
+            await asyncio.sleep(0.05 if spec == 0 else 0)
+            return spec
+
+        async def scenario():
+            results = run_bulk(work, range(100), concurrency=4, ordered=True)
+            first = await results.__anext__()
+            started_before_first = len(started)
+            rest = [result.index async for result in results]
+            return first.index, started_before_first, rest
+
+        first, started_before_first, rest = run_async(scenario())
+        self.assertEqual(0, first)
+        self.assertLessEqual(started_before_first, 4)
+        self.assertEqual(list(range(1, 100)), rest)
+
+    def test_create_pages_from_async_iterator(self):
+        telegraph = Telegraph()
+
+        async def create_page(title, author_name=None):
+            await asyncio.sleep(0)
+            return f"{title} by {author_name}"
+
+        async def specs():
+            for index in range(3):
+                yield {"title": f"Page {index}", "author_name": "Bot"}
+
+        async def scenario():
+            return [result async for result in telegraph.create_pages(specs(), concurrency=2)]
+
+        telegraph.create_page = create_page
+        results = run_async(scenario())
+        self.assertEqual({"Page 0 by Bot", "Page 1 by Bot", "Page 2 by Bot"}, {result.result for result in results})
+
+
+class PaginationTestCases(unittest.TestCase):
+    def test_iter_pages(self):
+        telegraph = Telegraph()
+        offsets = []
+        total_count = 23
+
+        async def get_page_list(limit: int = 50, offset: int = 0):
+            offsets.append(offset)
+            await asyncio.sleep(0.001 * (offset % 3))
+            pages = [Page(path=f"Page-{index}", url=f"https://telegra.ph/Page-{index}", title=str(index),
+                          description="", views=0) for index in range(offset, min(offset + limit, total_count))]
+            return PagesList(total_count=total_count, pages=pages)
+
+        async def scenario():
+            return [page.path async for page in telegraph.iter_pages(limit=5, offset=2, concurrency=3)]
+
+        telegraph.get_page_list = get_page_list
+        self.assertEqual([f"Page-{index}" for index in range(2, total_count)], run_async(scenario()))
+        self.assertEqual([2, 7, 12, 17, 22], sorted(offsets))
+
+    def test_iter_pages_limit_is_checked(self):
+        async def scenario(limit: int):
+            return [page async for page in Telegraph().iter_pages(limit=limit)]
+
+        for limit in (0, 201):
+            with self.assertRaises(ValueError):
+                run_async(scenario(limit))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,253 @@
+import asyncio
+import unittest
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from telegraph_api import html_transform
+from telegraph_api.html_render import RenderCache, iter_html, nodes2html
+from telegraph_api.html_transform import html2nodes
+from telegraph_api.html_transform_middlewares import remove_unsupported_tags
+from telegraph_api.lazy import LazyContent
+from telegraph_api.markdown_transform import markdown2content, markdown2nodes
+from telegraph_api.models import LightNode, Node
+from telegraph_api.offload import html2content, html2content_batch, html2nodes_async
+from telegraph_api.pipeline import Pipeline, Stage, UnsupportedTagsStage
+from telegraph_api.utils import serialize_nodes
+
+
+class HTML2NodesTestCases(unittest.TestCase):
+    def test_paragraphs(self):
+        source_html = """
+            <p>This is first paragraph</p>
+            <p>This is second paragraph with <strong>Bold</strong> text</p>
+            <p>And this Paragraph contains <blink>restricted</blink> tag</p>
+        """
+        self.assertEqual([
+            Node(tag="p", attrs={}, children=["This is first paragraph"]),
+            "",
+            Node(tag="p", attrs={}, children=["This is second paragraph with ",
+                                              Node(tag="strong", attrs={}, children=["Bold"]), " text"]),
+            "",
+            Node(tag="p", attrs={}, children=["And this Paragraph contains restricted tag"])
+        ], html2nodes(source_html))
+
+    def test_unsupported_attrs_and_tags(self):
+        nodes = html2nodes('<div class="x"><a href="/page" class="link" id="a">link</a><img src="/a.png" alt="a"></div>')
+        self.assertEqual([
+            Node(tag="a", attrs={"href": "/page"}, children=["link"]),
+            Node(tag="img", attrs={"src": "/a.png"}, children=[])
+        ], nodes)
+
+    def test_unclosed_tags(self):
+        self.assertEqual([
+            Node(tag="b", attrs={}, children=[Node(tag="i", attrs={}, children=["x"])]),
+            "y"
+        ], html2nodes("<b><i>x</b>y</i>"))
+        self.assertEqual([Node(tag="p", attrs={}, children=["a", Node(tag="br", attrs={}, children=[]), "b"])],
+                         html2nodes("<p>a<br>b"))
+
+    def test_entities(self):
+        self.assertEqual([Node(tag="p", attrs={}, children=["1 < 2 & 3"])], html2nodes("<p>1 &lt; 2 &amp; 3</p>"))
+
+    def test_whitespace(self):
+        self.assertEqual(["text"], html2nodes("<div>\n  text  </div>"))
+        self.assertEqual([Node(tag="pre", attrs={}, children=["  a\n  b"])], html2nodes("<pre>  a\n  b</pre>"))
+
+    def test_youtube_iframe(self):
+        nodes = html2nodes('<iframe src="https://www.youtube.com/embed/dQw4w9WgXcQ" width="100"></iframe>')
+        self.assertEqual([
+            Node(tag="figure", attrs={}, children=[
+                Node(tag="iframe", attrs={"src": "/embed/youtube?url=https://youtube.com/watch?v=dQw4w9WgXcQ"},
+                     children=[]),
+                Node(tag="figcaption", attrs={}, children=[])
+            ])
+        ], nodes)
+
+    def test_without_middlewares(self):
+        self.assertEqual([Node(tag="div", attrs={"id": "a"}, children=["x"])],
+                         html2nodes('<div id="a">x</div>', use_middlewares=False))
+
+    def test_custom_middleware(self):
+        def replace_bold(html: str) -> str:
+            return html.replace("<b>", "<strong>").replace("</b>", "</strong>")
+
+        html_transform.middlewares.append(replace_bold)
+        try:
+            self.assertEqual([Node(tag="strong", attrs={}, children=["x"])], html2nodes("<b>x</b>"))
+        finally:
+            html_transform.middlewares.remove(replace_bold)
+
+    def test_builtin_middleware_removal(self):
+        html_transform.middlewares.remove(remove_unsupported_tags)
+        try:
+            self.assertEqual([Node(tag="div", attrs={}, children=[Node(tag="span", attrs={}, children=["x"])])],
+                             html2nodes("<div><span>x</span></div>"))
+        finally:
+            html_transform.middlewares.insert(1, remove_unsupported_tags)
+        self.assertEqual(["x"], html2nodes("<div><span>x</span></div>"))
+
+
+def run_in_new_loop(future):
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(future)
+    finally:
+        loop.close()
+
+
+class RenameBoldStage(Stage):
+    tags = frozenset(["b"])
+
+    def __init__(self):
+        self.seen = []
+
+    def start(self, element):
+        self.seen.append(element.tag)
+        element.tag = "strong"
+
+
+class DropImagesStage(Stage):
+    tags = frozenset(["img"])
+
+    def end(self, node, element, parent, parser):
+        return None
+
+
+class PipelineTestCases(unittest.TestCase):
+    def test_custom_stages(self):
+        rename_bold = RenameBoldStage()
+        pipeline = Pipeline()
+        pipeline.register(rename_bold)
+        pipeline.register(DropImagesStage())
+        nodes = html2nodes('<p><b>x</b><i>y</i><img src="/a.png"></p>', pipeline=pipeline)
+        self.assertEqual([Node(tag="p", attrs={}, children=[Node(tag="strong", attrs={}, children=["x"]),
+                                                            Node(tag="i", attrs={}, children=["y"])])], nodes)
+        self.assertEqual(["b"], rename_bold.seen)
+        # Stages of custom pipeline don't affect default conversion
+        self.assertEqual([Node(tag="b", attrs={}, children=["x"])], html2nodes("<b>x</b>"))
+
+    def test_unregister(self):
+        pipeline = Pipeline()
+        pipeline.unregister(UnsupportedTagsStage)
+        self.assertEqual([Node(tag="div", attrs={}, children=["x"])],
+                         html2nodes('<div class="a">x</div>', pipeline=pipeline))
+
+    def test_timings(self):
+        pipeline = Pipeline(timings=True)
+        html2nodes('<p>a<iframe src="/x"></iframe></p>', pipeline=pipeline)
+        self.assertEqual(2, pipeline.stats["UnsupportedTagsStage"].calls)
+        # start and end hooks of iframe
+        self.assertEqual(2, pipeline.stats["YouTubeEmbedStage"].calls)
+
+
+class OffloadTestCases(unittest.TestCase):
+    documents = [f"<p>Document <b>{index}</b></p><div>text</div>" for index in range(20)]
+
+    def test_html2nodes_async(self):
+        with ThreadPoolExecutor(2) as executor:
+            nodes = run_in_new_loop(html2nodes_async(self.documents[0], executor))
+        self.assertEqual(html2nodes(self.documents[0], light=True), nodes)
+
+    def test_batch_in_processes(self):
+        with ProcessPoolExecutor(2) as executor:
+            contents = run_in_new_loop(html2content_batch(self.documents, executor, chunk_size=3))
+        self.assertEqual([html2content(html) for html in self.documents], contents)
+        self.assertEqual([{"tag": "p", "children": ["Document ", {"tag": "b", "children": ["0"]}]}, "text"],
+                         contents[0])
+
+
+class LightNodeTestCases(unittest.TestCase):
+    source_html = '<p>Text with <a href="/link">link</a></p><hr><figure><img src="/a.png"></figure>'
+
+    def test_html2nodes_light(self):
+        light_nodes = html2nodes(self.source_html, light=True)
+        self.assertEqual([
+            LightNode("p", {}, ["Text with ", LightNode("a", {"href": "/link"}, ["link"])]),
+            LightNode("hr", {}, []),
+            LightNode("figure", {}, [LightNode("img", {"src": "/a.png"}, [])])
+        ], light_nodes)
+        self.assertEqual(html2nodes(self.source_html), [node.to_node() for node in light_nodes])
+
+    def test_conversion(self):
+        node = Node(tag="p", attrs={"id": "a"}, children=["text", Node(tag="b", children=["bold"])])
+        self.assertEqual(node, LightNode.from_node(node).to_node())
+        self.assertEqual(LightNode.from_node(node), LightNode.from_dict(LightNode.from_node(node).to_dict()))
+
+    def test_serialization(self):
+        self.assertEqual([
+            {"tag": "p", "children": ["Text with ", {"tag": "a", "attrs": {"href": "/link"}, "children": ["link"]}]},
+            {"tag": "hr"},
+            {"tag": "figure", "children": [{"tag": "img", "attrs": {"src": "/a.png"}}]}
+        ], serialize_nodes(html2nodes(self.source_html, light=True)))
+
+
+if __name__ == '__main__':
+    unittest.main()
+
+
+class Nodes2HTMLTestCases(unittest.TestCase):
+    def test_round_trip(self):
+        source_html = '<p>Text with <a href="/page?a=1&amp;b=&quot;2&quot;">link</a> &lt;tag&gt;<br/></p>' \
+                      '<figure><img src="/file/a.png"/><figcaption>Caption</figcaption></figure>' \
+                      '<pre>line 1\n  line 2</pre>'
+        for content in (html2nodes(source_html), html2nodes(source_html, light=True), html2content(source_html)):
+            self.assertEqual(source_html.replace("<br/>", "<br>").replace('.png"/>', '.png">'),
+                             nodes2html(content))
+        self.assertEqual(html2content(source_html), html2content(nodes2html(html2content(source_html))))
+
+    def test_escaping(self):
+        self.assertEqual('<p title="&quot;&lt;&amp;">&lt;script&gt; &amp; "quotes"</p>',
+                         nodes2html([{"tag": "p", "attrs": {"title": '"<&'}, "children": ['<script> & "quotes"']}]))
+        self.assertRaises(ValueError, nodes2html, [{"tag": "p onclick=alert(1)"}])
+        self.assertRaises(ValueError, nodes2html, [{"tag": "p", "attrs": {"a b": "c"}}])
+
+    def test_deep_nesting_and_chunks(self):
+        content = ["text"]
+        for _ in range(5000):
+            content = [{"tag": "b", "children": content}]
+        chunks = list(iter_html(content, chunk_size=1024))
+        self.assertGreater(len(chunks), 10)
+        self.assertEqual("<b>" * 5000 + "text" + "</b>" * 5000, "".join(chunks))
+
+    def test_render_cache(self):
+        cache = RenderCache(max_size=1)
+        content = html2content("<p>Hello</p>")
+        self.assertEqual("<p>Hello</p>", cache.render("Page", content))
+        self.assertEqual("<p>Hello</p>", cache.render("Page", LazyContent(content)))
+        self.assertEqual((1, 1), (cache.hits, cache.misses))
+        self.assertEqual("<p>Bye</p>", cache.render("Page", html2nodes("<p>Bye</p>")))
+        self.assertEqual(1, len(cache))
+
+
+class Markdown2NodesTestCases(unittest.TestCase):
+    def test_blocks(self):
+        source = "# Title\n\n### Section\n\nFirst line\nsecond line\n\n```python\nif a < b:\n    pass\n```\n\n" \
+                 "![Cat](/file/cat.png \"A cat\")\n\n> Quote\n\n- one\n- two\n  1. nested\n\n---"
+        self.assertEqual([
+            {"tag": "h3", "children": ["Title"]},
+            {"tag": "h4", "children": ["Section"]},
+            {"tag": "p", "children": ["First line\nsecond line"]},
+            {"tag": "pre", "children": ["if a < b:\n    pass"]},
+            {"tag": "figure", "children": [{"tag": "img", "attrs": {"src": "/file/cat.png"}},
+                                           {"tag": "figcaption", "children": ["A cat"]}]},
+            {"tag": "blockquote", "children": ["Quote"]},
+            {"tag": "ul", "children": [
+                {"tag": "li", "children": ["one"]},
+                {"tag": "li", "children": ["two", {"tag": "ol", "children": [{"tag": "li", "children": ["nested"]}]}]},
+            ]},
+            {"tag": "hr"},
+        ], markdown2content(source))
+
+    def test_inline(self):
+        self.assertEqual([{"tag": "p", "children": [
+            {"tag": "strong", "children": ["bold ", {"tag": "em", "children": ["em"]}]}, " ",
+            {"tag": "code", "children": ["a*b*"]}, " ",
+            {"tag": "a", "attrs": {"href": "https://telegra.ph"}, "children": ["link"]}, " *escaped* snake_case ",
+            {"tag": "s", "children": ["old"]}, {"tag": "br"}, "next",
+        ]}], markdown2content("**bold *em*** `a*b*` [link](https://telegra.ph) \\*escaped\\* snake_case ~~old~~  \nnext"))
+
+    def test_nodes(self):
+        nodes = markdown2nodes("Hello *world*")
+        self.assertEqual([Node(tag="p", attrs={}, children=["Hello ", Node(tag="em", attrs={}, children=["world"])])],
+                         nodes)
+        self.assertEqual([LightNode("p", {}, ["Hello ", LightNode("em", {}, ["world"])])],
+                         markdown2nodes("Hello *world*", light=True))